@@ -1,6 +1,7 @@
 import math
 import numpy
-import  pyximport; pyximport.install()
+# Вычислительные ядра (заранее собранные, если есть, иначе на NumPy)
+import GeometryKernels
 
 
 class Vector:
@@ -29,6 +30,8 @@ class Vector:
         to_rotate_vector(self, axis_of_rotation, angle_of_rotation) - вычисляет вектор, равный повернотому моделируемому
             вектору вокруг оси axis_of_rotation (заданной вектором) на угол angle_of_rotation
     """
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x, y, z):
         self.x = x
         self.y = y
@@ -118,18 +121,10 @@ class Vector:
         :return: вектор (объект Vector), равный моделируемому вектору, повернутому вокруг оси, заданной вектором
             axis_of_rotation, на угол angle_of_rotation
         """
-        # Создание матрицы поворота вокруг вектора rotating_vector на угол angle_of_rotation
-        rotation_matrix = RotationMatrix(axis_of_rotation, angle_of_rotation)
-        # Вычисление координат повернутого вектора
-        rotated_vector_x = rotation_matrix.rotation_matrix[0][0] * self.x +\
-            rotation_matrix.rotation_matrix[0][1] * self.y +\
-            rotation_matrix.rotation_matrix[0][2] * self.z
-        rotated_vector_y = rotation_matrix.rotation_matrix[1][0] * self.x +\
-            rotation_matrix.rotation_matrix[1][1] * self.y +\
-            rotation_matrix.rotation_matrix[1][2] * self.z
-        rotated_vector_z = rotation_matrix.rotation_matrix[2][0] * self.x +\
-            rotation_matrix.rotation_matrix[2][1] * self.y +\
-            rotation_matrix.rotation_matrix[2][2] * self.z
+        # Коэффициенты матрицы поворота (формула Родрига, как и в RotationMatrix) вычисляются в виде чисел без создания
+        #   объекта RotationMatrix и массива numpy
+        rotated_vector_x, rotated_vector_y, rotated_vector_z = GeometryKernels.to_rotate_vector(
+            self.x, self.y, self.z, axis_of_rotation.x, axis_of_rotation.y, axis_of_rotation.z, angle_of_rotation)
         return Vector(rotated_vector_x, rotated_vector_y, rotated_vector_z)
 
 
@@ -341,6 +336,26 @@ class RotationMatrix:
                                             [matrix_coef31, matrix_coef32, matrix_coef33]])
 
 
+def to_rotate_vectors(vectors, axes_of_rotation, angles_of_rotation, out=None):
+    """
+    @Описание
+        Метод вычисляет векторы, равные векторам vectors, повернутым вокруг осей axes_of_rotation на углы
+            angles_of_rotation по формуле Родрига (то же, что и метод Vector.to_rotate_vector, но сразу для массивов
+            векторов, осей и углов).
+    :param vectors: массив numpy поворачиваемых векторов размера (N, 3)
+    :param axes_of_rotation: массив numpy векторов, задающих оси вращения, размера (N, 3) (нормировать не обязательно)
+    :param angles_of_rotation: массив numpy углов поворота размера N (передаются в синус и косинус без перевода, как и в
+        Vector.to_rotate_vector)
+    :param out: массив numpy размера (N, 3), в который записываются повернутые векторы. Допустимо None (по умолчанию) -
+        тогда создается новый массив. Может совпадать с axes_of_rotation, но не с vectors
+    :return: массив numpy повернутых векторов размера (N, 3) (out, если он задан)
+    """
+    if out is None:
+        out = numpy.empty(vectors.shape)
+    return GeometryKernels.to_rotate_vectors(vectors, axes_of_rotation, numpy.asarray(angles_of_rotation, dtype=float),
+                                             out)
+
+
 def solution_of_quadratic_equation(a, b, c):
     """
     @Описание
@@ -452,6 +467,27 @@ def to_found_point_of_intersection_of_line_and_canonical_ellipsoid_nearest_to_st
         return point_of_intersection_2
 
 
+def to_found_points_of_intersections_of_lines_and_canonical_ellipsoid_nearest_to_starting_points(points_on_lines,
+                                                                                                directing_vectors,
+                                                                                                ellipsoid):
+    """
+    @Описание
+        Метод сразу для N прямых, заданных массивами точек отсчета и направляющих векторов, возвращает ближайшие к
+            точкам отсчета точки пересечения прямых с каноническим эллипсоидом (то же, что и метод
+            to_found_point_of_intersection_of_line_and_canonical_ellipsoid_nearest_to_stating_point_of_line, но для
+            массивов, без создания объектов Line и Vector). Квадратные уравнения решаются сразу для всех прямых.
+    :param points_on_lines: массив numpy точек отсчета прямых (радиус-векторов) размера (N, 3)
+    :param directing_vectors: массив numpy направляющих векторов прямых размера (N, 3)
+    :param ellipsoid: эллипсоид, заданный объектом CanonicalEllipsoid, точки пересечения которого с прямыми вычисляются
+    :return: массив numpy размера (N, 3) ближайших к точкам отсчета точек пересечения прямых и эллипсоида ellipsoid. Для
+        прямых, не пересекающих эллипсоид, координаты точек - nan
+    """
+    return GeometryKernels.to_intersect_lines_and_canonical_ellipsoid(points_on_lines, directing_vectors,
+                                                                      ellipsoid.axis_a, ellipsoid.axis_b,
+                                                                      ellipsoid.axis_c,
+                                                                      numpy.empty(points_on_lines.shape))
+
+
 def plane_touched_canonical_ellipsoid(point, ellipsoid):
     """
     @Описание
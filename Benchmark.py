@@ -0,0 +1,307 @@
+import sys
+import json
+import time
+import types
+import platform
+import tracemalloc
+import numpy
+from datetime import datetime
+import AnalyticGeometry
+import Coordinates
+import GeometryKernels
+from EarthEllipsoid import EarthEllipsoid
+from SatellitesGroup import SatelliteCoordinateSet
+
+
+# Количество объектов каждого класса значений, создаваемых при сравнении классов со слотами и без них
+COUNT_OF_VALUE_OBJECTS = 86400
+# Зерно генератора случайных чисел для синтетических входных данных (одинаковых при каждом запуске)
+SEED = 0
+# Количество наборов входных данных для операций над отдельными объектами
+COUNT_OF_SCALAR_INPUTS = 1000
+# Количество элементов массивов для операций над массивами
+COUNT_OF_BATCH_ELEMENTS = 1000
+# Наименьшее время измерения одной операции (секунды)
+MIN_MEASUREMENT_TIME = 0.2
+# Адрес файла результатов по умолчанию
+DEFAULT_OUTPUT_ADDRESS = 'benchmark_results.json'
+
+
+def to_make_twin_with_dict(value_type):
+    """
+    @Описание:
+        Метод создает класс с теми же методами, что и value_type, но без __slots__, то есть хранящий поля в словаре
+            __dict__, как до перевода классов значений на слоты. Используется для сравнения.
+    :param value_type: класс со слотами.
+    :return: класс без слотов
+    """
+    namespace = {}
+    for name, value in vars(value_type).items():
+        if name in ('__slots__', '__dict__', '__weakref__') or isinstance(value, types.MemberDescriptorType):
+            continue
+        namespace[name] = value
+    return type("".join([value_type.__name__, 'WithDict']), (), namespace)
+
+
+def to_measure_creation(make_object, count_of_objects):
+    """
+    @Описание:
+        Метод создает count_of_objects объектов функцией make_object и измеряет время создания одного объекта и память,
+            занимаемую одним объектом (с помощью tracemalloc).
+    :param make_object: функция без аргументов, создающая один объект.
+    :param count_of_objects: количество создаваемых объектов (int).
+    :return: время создания одного объекта (нс), память на один объект (байт) и количество выделений памяти на один
+        объект
+    """
+    start = time.perf_counter()
+    objects = [make_object() for _ in range(count_of_objects)]
+    creation_time = (time.perf_counter() - start) / count_of_objects * 1e9
+    del objects
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    objects = [make_object() for _ in range(count_of_objects)]
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    statistics = snapshot_after.compare_to(snapshot_before, 'filename')
+    memory = sum(statistic.size_diff for statistic in statistics) / count_of_objects
+    count_of_allocations = sum(statistic.count_diff for statistic in statistics) / count_of_objects
+    del objects
+    return creation_time, memory, count_of_allocations
+
+
+def to_benchmark_value_types(count_of_objects=COUNT_OF_VALUE_OBJECTS):
+    """
+    @Описание:
+        Метод сравнивает классы значений со слотами (Vector, GeoCoordinates, CartesianCoordinates,
+            SatelliteCoordinateSet) с такими же классами без слотов: для каждого создается count_of_objects объектов
+            и измеряются время создания и память. Моделирование при этом не выполняется.
+    :param count_of_objects: количество создаваемых объектов каждого класса (int).
+    :return: словарь, ключи которого - названия классов, значения - словари с временем создания одного объекта (нс),
+        памятью на один объект (байт) и количеством выделений памяти на один объект для классов со слотами и без них
+    """
+    earth_ellipsoid = EarthEllipsoid()
+    utc_time = datetime(2008, 9, 21)
+    cartesian_coordinates = Coordinates.CartesianCoordinates(4000.0, 3000.0, 4500.0)
+    geo_coordinates = cartesian_coordinates.to_geo_coordinates(utc_time, earth_ellipsoid)
+    velocity_vector = AnalyticGeometry.Vector(-5.0, 4.0, 3.0)
+    subsatellite_cartesian_coordinates = Coordinates.GeoCoordinates(geo_coordinates.long, geo_coordinates.lat, 0). \
+        to_cartesian_coordinates(utc_time, earth_ellipsoid)
+    arguments = {
+        AnalyticGeometry.Vector: (1.0, 2.0, 3.0),
+        Coordinates.GeoCoordinates: (37.6, 55.7, 0.2),
+        Coordinates.CartesianCoordinates: (4000.0, 3000.0, 4500.0),
+        SatelliteCoordinateSet: (cartesian_coordinates, velocity_vector, utc_time, earth_ellipsoid, geo_coordinates,
+                                 subsatellite_cartesian_coordinates)
+    }
+    results = {}
+    for value_type, value_arguments in arguments.items():
+        twin_type = to_make_twin_with_dict(value_type)
+        results[value_type.__name__] = {}
+        for name, measured_type in (('slots', value_type), ('dict', twin_type)):
+            creation_time, memory, count_of_allocations = \
+                to_measure_creation(lambda: measured_type(*value_arguments), count_of_objects)
+            results[value_type.__name__][name] = {'ns_per_object': creation_time, 'bytes_per_object': memory,
+                                                  'allocations_per_object': count_of_allocations}
+    return results
+
+
+def to_measure_operation(operation, inputs, count_of_elements_per_call=1):
+    """
+    @Описание:
+        Метод измеряет время и выделения памяти одной операции. Функция operation вызывается для каждого набора входных
+            данных из inputs по кругу, пока время измерения не превысит MIN_MEASUREMENT_TIME, и берется лучшее из трех
+            измерений. Выделения памяти измеряются с помощью tracemalloc за один проход по inputs: результаты вызовов
+            сохраняются, поэтому учитываются блоки памяти, оставшиеся после операции (результаты), а наибольший объем
+            временной памяти учитывается через пиковое значение.
+    :param operation: функция одного аргумента - набора входных данных.
+    :param inputs: список наборов входных данных.
+    :param count_of_elements_per_call: количество элементов (операций), обрабатываемых одним вызовом (для операций над
+        массивами - размер массивов).
+    :return: словарь с временем одной операции (нс), количеством оставшихся блоков памяти и их объемом (байт) на одну
+        операцию и пиковым объемом памяти на одну операцию (байт)
+    """
+    # Исходное количество наборов входных данных (inputs удваивается, пока время измерения слишком мало)
+    count_of_inputs = len(inputs)
+    count_of_calls = count_of_inputs
+    while True:
+        start = time.perf_counter()
+        for arguments in inputs:
+            operation(arguments)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_MEASUREMENT_TIME / 3 or count_of_calls >= 100 * count_of_inputs:
+            break
+        inputs = inputs * 2
+        count_of_calls = len(inputs)
+    best_time = elapsed
+    for _ in range(2):
+        start = time.perf_counter()
+        for arguments in inputs:
+            operation(arguments)
+        best_time = min(best_time, time.perf_counter() - start)
+    count_of_operations = count_of_calls * count_of_elements_per_call
+    single_pass_inputs = inputs[:len(inputs) if len(inputs) < COUNT_OF_SCALAR_INPUTS else COUNT_OF_SCALAR_INPUTS]
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    results = [operation(arguments) for arguments in single_pass_inputs]
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    statistics = snapshot_after.compare_to(snapshot_before, 'filename')
+    count_of_measured_operations = len(single_pass_inputs) * count_of_elements_per_call
+    del results
+    return {'ns_per_op': best_time / count_of_operations * 1e9,
+            'allocations_per_op': sum(statistic.count_diff for statistic in statistics) / count_of_measured_operations,
+            'bytes_per_op': sum(statistic.size_diff for statistic in statistics) / count_of_measured_operations,
+            'peak_bytes_per_op': peak / count_of_measured_operations}
+
+
+def to_make_inputs():
+    """
+    @Описание:
+        Метод составляет синтетические входные данные для измерений генератором случайных чисел с зерном SEED: векторы,
+            оси и углы поворота, прямые, направленные от орбиты к Земле, точки на орбите и на поверхности Земли.
+    :return: словарь массивов numpy входных данных
+    """
+    generator = numpy.random.default_rng(SEED)
+    count = max(COUNT_OF_SCALAR_INPUTS, COUNT_OF_BATCH_ELEMENTS)
+    directions = generator.normal(size=(count, 3))
+    directions /= numpy.linalg.norm(directions, axis=1)[:, numpy.newaxis]
+    orbit_points = directions * generator.uniform(6700, 7200, count)[:, numpy.newaxis]
+    return {'vectors': generator.normal(size=(count, 3)) * 7000,
+            'axes': generator.normal(size=(count, 3)),
+            'angles': generator.uniform(-numpy.pi, numpy.pi, count),
+            'orbit_points': orbit_points,
+            'directions_to_earth': -orbit_points + generator.normal(size=(count, 3)) * 300,
+            'longs': generator.uniform(-180, 180, count),
+            'lats': generator.uniform(-90, 90, count),
+            'alts': generator.uniform(0, 800, count)}
+
+
+def to_benchmark_kernels():
+    """
+    @Описание:
+        Метод измеряет время и выделения памяти основных геометрических операций AnalyticGeometry, Coordinates и
+            EarthEllipsoid над отдельными объектами (scalar) и над массивами из COUNT_OF_BATCH_ELEMENTS элементов
+            (batched, время и память - в пересчете на один элемент).
+    :return: словарь, ключи которого - названия операций, значения - результаты метода to_measure_operation
+    """
+    earth_ellipsoid = EarthEllipsoid()
+    canon_ellipsoid = AnalyticGeometry.CanonicalEllipsoid(earth_ellipsoid.semi_major_axis,
+                                                          earth_ellipsoid.semi_major_axis,
+                                                          earth_ellipsoid.semi_minor_axis)
+    utc_time = datetime(2008, 9, 21)
+    data = to_make_inputs()
+    count = COUNT_OF_SCALAR_INPUTS
+    vectors = [AnalyticGeometry.Vector(*vector) for vector in data['vectors'][:count].tolist()]
+    axes = [AnalyticGeometry.Vector(*axis) for axis in data['axes'][:count].tolist()]
+    angles = data['angles'][:count].tolist()
+    lines = [AnalyticGeometry.Line(AnalyticGeometry.Vector(*point), AnalyticGeometry.Vector(*direction))
+             for point, direction in zip(data['orbit_points'][:count].tolist(),
+                                         data['directions_to_earth'][:count].tolist())]
+    cartesian_coordinates = [Coordinates.CartesianCoordinates(*point)
+                             for point in data['orbit_points'][:count].tolist()]
+    geo_coordinates = [Coordinates.GeoCoordinates(long, lat, alt) for long, lat, alt in
+                       zip(data['longs'][:count].tolist(), data['lats'][:count].tolist(),
+                           data['alts'][:count].tolist())]
+    vector_pairs = list(zip(vectors, axes))
+    vector_pairs_and_angles = list(zip(vectors, axes, angles))
+    geo_coordinates_pairs = list(zip(geo_coordinates, geo_coordinates[1:] + geo_coordinates[:1]))
+    scalar_operations = {
+        'Vector.__add__': (lambda pair: pair[0] + pair[1], vector_pairs),
+        'Vector.__mul__': (lambda pair: pair[0] * pair[1], vector_pairs),
+        'Vector.scalar_product': (lambda pair: pair[0].scalar_product(pair[1]), vector_pairs),
+        'Vector.get_normalized_vector': (lambda vector: vector.get_normalized_vector(), vectors),
+        'Vector.to_rotate_vector': (lambda arguments: arguments[0].to_rotate_vector(arguments[1], arguments[2]),
+                                    vector_pairs_and_angles),
+        'RotationMatrix': (lambda arguments: AnalyticGeometry.RotationMatrix(arguments[1], arguments[2]),
+                           vector_pairs_and_angles),
+        'line_ellipsoid_intersection': (
+            lambda line: AnalyticGeometry.
+            to_found_point_of_intersection_of_line_and_canonical_ellipsoid_nearest_to_stating_point_of_line(
+                line, canon_ellipsoid), lines),
+        'CartesianCoordinates.to_geo_coordinates': (
+            lambda coordinates: coordinates.to_geo_coordinates(utc_time, earth_ellipsoid), cartesian_coordinates),
+        'GeoCoordinates.to_cartesian_coordinates': (
+            lambda coordinates: coordinates.to_cartesian_coordinates(utc_time, earth_ellipsoid), geo_coordinates),
+        'EarthEllipsoid.dist_between_geo_coordinates': (
+            lambda pair: earth_ellipsoid.dist_between_geo_coordinates(pair[0], pair[1]), geo_coordinates_pairs)
+    }
+    batch = COUNT_OF_BATCH_ELEMENTS
+    batch_data = {name: numpy.ascontiguousarray(array[:batch]) for name, array in data.items()}
+    shifted_longs = numpy.roll(batch_data['longs'], 1)
+    shifted_lats = numpy.roll(batch_data['lats'], 1)
+    batched_operations = {
+        'to_rotate_vectors': (
+            lambda arguments: AnalyticGeometry.to_rotate_vectors(batch_data['vectors'], batch_data['axes'],
+                                                                 batch_data['angles']), [None]),
+        'line_ellipsoid_intersections': (
+            lambda arguments: AnalyticGeometry.
+            to_found_points_of_intersections_of_lines_and_canonical_ellipsoid_nearest_to_starting_points(
+                batch_data['orbit_points'], batch_data['directions_to_earth'], canon_ellipsoid), [None]),
+        'to_geo_coordinates_of_arrays': (
+            lambda arguments: Coordinates.to_geo_coordinates_of_arrays(
+                batch_data['orbit_points'][:, 0], batch_data['orbit_points'][:, 1], batch_data['orbit_points'][:, 2],
+                utc_time, earth_ellipsoid), [None]),
+        'to_cartesian_coordinates_of_arrays': (
+            lambda arguments: Coordinates.to_cartesian_coordinates_of_arrays(
+                batch_data['longs'], batch_data['lats'], batch_data['alts'], utc_time, earth_ellipsoid), [None]),
+        'to_calculate_dists_between_geo_coordinates_of_arrays': (
+            lambda arguments: earth_ellipsoid.to_calculate_dists_between_geo_coordinates_of_arrays(
+                batch_data['longs'], batch_data['lats'], shifted_longs, shifted_lats), [None])
+    }
+    results = {'scalar': {}, 'batched': {}}
+    for name, (operation, inputs) in scalar_operations.items():
+        results['scalar'][name] = to_measure_operation(operation, inputs)
+    for name, (operation, inputs) in batched_operations.items():
+        results['batched'][name] = to_measure_operation(operation, inputs, batch)
+    return results
+
+
+def to_save_results(results, output_address):
+    """
+    @Описание:
+        Метод сохраняет результаты измерений в файл JSON вместе с описанием окружения (версии Python и numpy, наличие
+            заранее собранных ядер GeometryKernelsAccelerated), чтобы сравнивать результаты до и после оптимизации.
+    :param results: словарь результатов измерений.
+    :param output_address: адрес файла JSON (String).
+    :return: записывает файл output_address
+    """
+    report = {'environment': {'python': platform.python_version(), 'numpy': numpy.__version__,
+                              'machine': platform.machine(), 'accelerated_kernels': GeometryKernels.IS_ACCELERATED,
+                              'seed': SEED, 'count_of_scalar_inputs': COUNT_OF_SCALAR_INPUTS,
+                              'count_of_batch_elements': COUNT_OF_BATCH_ELEMENTS,
+                              'date': datetime.now().isoformat(timespec='seconds')},
+              'results': results}
+    with open(output_address, 'w') as output_file:
+        json.dump(report, output_file, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    # Адрес файла результатов можно задать первым аргументом командной строки
+    output_address = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OUTPUT_ADDRESS
+    kernels_results = to_benchmark_kernels()
+    for kind, kind_results in kernels_results.items():
+        print("".join(["Операции (", kind, "):"]))
+        for name, result in kind_results.items():
+            print("".join(['\t', name, ': ', str(round(result['ns_per_op'], 1)), ' нс, ',
+                           str(round(result['allocations_per_op'], 2)), ' блоков памяти (',
+                           str(round(result['bytes_per_op'], 1)), ' байт), пик ',
+                           str(round(result['peak_bytes_per_op'], 1)), ' байт на операцию']))
+    value_types_results = to_benchmark_value_types()
+    print("".join(["Классы значений: ", str(COUNT_OF_VALUE_OBJECTS), " объектов каждого класса"]))
+    for type_name, type_results in value_types_results.items():
+        slots = type_results['slots']
+        with_dict = type_results['dict']
+        print("".join([type_name, ':\n',
+                       '\tсо слотами: ', str(round(slots['ns_per_object'])), ' нс, ',
+                       str(round(slots['bytes_per_object'])), ' байт, ',
+                       str(round(slots['allocations_per_object'], 2)), ' выделений памяти на объект\n',
+                       '\tбез слотов: ', str(round(with_dict['ns_per_object'])), ' нс, ',
+                       str(round(with_dict['bytes_per_object'])), ' байт, ',
+                       str(round(with_dict['allocations_per_object'], 2)), ' выделений памяти на объект\n',
+                       '\tпамять на ', str(COUNT_OF_VALUE_OBJECTS), ' объектов: ',
+                       str(round(slots['bytes_per_object'] * COUNT_OF_VALUE_OBJECTS / 2 ** 20, 1)), ' МБ вместо ',
+                       str(round(with_dict['bytes_per_object'] * COUNT_OF_VALUE_OBJECTS / 2 ** 20, 1)), ' МБ']))
+    to_save_results({'kernels': kernels_results, 'value_types': value_types_results}, output_address)
+    print("".join(["Результаты сохранены в ", output_address]))
@@ -0,0 +1,10 @@
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+
+# Сборка модуля GeometryKernelsAccelerated заранее (требуются Cython и компилятор C):
+#   python BuildGeometryKernels.py build_ext --inplace
+# Собранный модуль подключается модулем GeometryKernels автоматически. Без него используются реализации на NumPy.
+if __name__ == '__main__':
+    setup(name='GeometryKernelsAccelerated',
+          ext_modules=cythonize([Extension('GeometryKernelsAccelerated', ['GeometryKernelsAccelerated.pyx'])]))
@@ -0,0 +1,321 @@
+import numpy
+
+
+class ConstellationPropagator:
+    """
+    @Описание:
+        Класс моделирует движение сразу всех спутников спутниковой группировки по модели SGP4 (околоземная часть
+            модели SGDP4, та же, что и в библиотеке pyorbital). Элементы орбит всех спутников хранятся в массивах numpy,
+            поэтому координаты и векторы скорости всех спутников во все заданные моменты времени вычисляются за одно
+            выполнение формул модели над массивами размера (количество моментов времени, количество спутников).
+            Предусматривается возможность сравнения результатов с pyorbital.
+
+    @Аргументы:
+        tle_list - список объектов Tle из pyorbital, содержащих данные TLE спутников группировки в порядке их номеров в
+            группировке.
+
+    @Константы:
+        CK2, CK4, XJ3, XKE, QOMS2T, S0 - постоянные модели SGP4 (в единицах модели - радиусах Земли и минутах).
+        XKMPER - радиус Земли модели SGP4 (км).
+        XMNPDA - количество минут в сутках.
+        AE - единица расстояния модели (радиус Земли).
+        ECC_EPS, ECC_LIMIT_HIGH - нижняя и верхняя границы, которыми ограничивается эксцентриситет при вычислениях.
+        ECC_ALL - эксцентриситет, начиная с которого учитываются члены, деленные на эксцентриситет.
+        EPS_COS - наименьшее по модулю значение 1 + cos(i), на которое производится деление.
+        NR_EPS - точность решения уравнения Кеплера методом Ньютона.
+        DEEP_SPACE_PERIOD - период обращения (минуты), начиная с которого нужна модель SDP4 для дальнего космоса,
+            которая не поддерживается (как и в pyorbital).
+        SIMPLIFIED_PERIGEE - высота перигея (км), ниже которой используются упрощенные формулы модели.
+        COUNT_OF_ELEMENTS_IN_CHUNK - наибольшее количество пар (момент времени, спутник), для которых формулы модели
+            выполняются за один раз. Большие массивы моментов времени делятся на части, чтобы промежуточные массивы
+            помещались в кэш процессора.
+
+    @Поля:
+        count_of_satellites - количество спутников (int).
+        epochs - массив numpy.datetime64 эпох TLE спутников.
+        Остальные поля - массивы numpy размера count_of_satellites, содержащие элементы орбит спутников и коэффициенты
+            модели SGP4, вычисленные по ним при инициализации (названия совпадают с принятыми в описании модели
+            SGP4 и в pyorbital).
+
+    @Методы:
+        to_calculate_coefficients(self) - вычисляет коэффициенты модели, не зависящие от времени.
+        to_calculate_positions_and_velocities(self, utc_times) - вычисляет координаты и векторы скорости всех спутников
+            во все заданные моменты времени.
+        to_calculate_chunk(self, utc_times) - выполняет формулы модели сразу для всех спутников и моментов времени.
+        to_calculate_max_deviations(self, orbits, utc_times) - вычисляет наибольшие отклонения координат и векторов
+            скорости от вычисленных с помощью pyorbital.
+    """
+    CK2 = 5.413080e-4
+    CK4 = 0.62098875e-6
+    XJ3 = -0.253881e-5
+    XKE = 0.743669161e-1
+    QOMS2T = 1.88027916e-9
+    S0 = 78.0
+    XKMPER = 6378.135
+    XMNPDA = 1440.0
+    AE = 1.0
+    ECC_EPS = 1.0e-6
+    ECC_LIMIT_HIGH = 1.0 - ECC_EPS
+    ECC_ALL = 1.0e-4
+    EPS_COS = 1.5e-12
+    NR_EPS = 1.0e-12
+    DEEP_SPACE_PERIOD = 225
+    SIMPLIFIED_PERIGEE = 220
+    COUNT_OF_ELEMENTS_IN_CHUNK = 8192
+
+    def __init__(self, tle_list):
+        self.count_of_satellites = len(tle_list)
+        self.epochs = numpy.array([tle.epoch for tle in tle_list], dtype='datetime64[us]')
+        # Элементы орбит в единицах модели (радианы, радианы в минуту)
+        self.eo = numpy.array([tle.eccentricity for tle in tle_list], dtype=float)
+        self.xincl = numpy.deg2rad([tle.inclination for tle in tle_list])
+        self.xnodeo = numpy.deg2rad([tle.right_ascension for tle in tle_list])
+        self.omegao = numpy.deg2rad([tle.arg_perigee for tle in tle_list])
+        self.xmo = numpy.deg2rad([tle.mean_anomaly for tle in tle_list])
+        self.xn_0 = numpy.array([tle.mean_motion for tle in tle_list], dtype=float) * (2 * numpy.pi / self.XMNPDA)
+        self.bstar = numpy.array([tle.bstar for tle in tle_list], dtype=float) * self.AE
+        self.to_calculate_coefficients()
+
+    def to_calculate_coefficients(self):
+        """
+        @Описание:
+            Метод вычисляет коэффициенты модели SGP4, не зависящие от времени, сразу для всех спутников (так же, как и
+                при инициализации объектов Orbital в pyorbital).
+        :return: коэффициенты записываются в поля объекта
+        """
+        ae = self.AE
+        ck2 = self.CK2
+        a3ovk2 = (-self.XJ3 / ck2) * ae ** 3
+        eo = self.eo
+        self.cosIO = numpy.cos(self.xincl)
+        self.sinIO = numpy.sin(self.xincl)
+        theta2 = self.cosIO ** 2
+        self.x3thm1 = 3.0 * theta2 - 1.0
+        self.x1mth2 = 1.0 - theta2
+        self.x7thm1 = 7.0 * theta2 - 1.0
+        # Восстановление исходных среднего движения и большой полуоси
+        a1 = (self.XKE / self.xn_0) ** (2. / 3)
+        betao2 = 1.0 - eo ** 2
+        betao = numpy.sqrt(betao2)
+        temp0 = 1.5 * ck2 * self.x3thm1 / (betao * betao2)
+        del1 = temp0 / (a1 ** 2)
+        a0 = a1 * (1.0 - del1 * (1.0 / 3.0 + del1 * (1.0 + del1 * 134.0 / 81.0)))
+        del0 = temp0 / (a0 ** 2)
+        self.xnodp = self.xn_0 / (1.0 + del0)
+        self.aodp = a0 / (1.0 - del0)
+        perigee = (self.aodp * (1.0 - eo) - ae) * self.XKMPER
+        period = (2 * numpy.pi * 1440.0 / self.XMNPDA) / self.xnodp
+        if numpy.any(period >= self.DEEP_SPACE_PERIOD):
+            raise NotImplementedError("Модель SDP4 для дальнего космоса не поддерживается")
+        self.is_simplified = perigee < self.SIMPLIFIED_PERIGEE
+        is_normal = ~self.is_simplified
+        # Параметры плотности атмосферы для низких перигеев
+        s4 = numpy.full(self.count_of_satellites, ae * (1.0 + self.S0 / self.XKMPER))
+        qoms24 = numpy.full(self.count_of_satellites, self.QOMS2T)
+        is_low = perigee < 156
+        low_s4 = numpy.maximum(perigee - 78, 20)
+        qoms24 = numpy.where(is_low, ((120 - low_s4) * (ae / self.XKMPER)) ** 4, qoms24)
+        s4 = numpy.where(is_low, low_s4 / self.XKMPER + ae, s4)
+        tsi = 1.0 / (self.aodp - s4)
+        self.eta = self.aodp * eo * tsi
+        eeta = eo * self.eta
+        coef = qoms24 * tsi ** 4
+        # Коэффициенты C1-C5
+        etasq = self.eta ** 2
+        psisq = numpy.abs(1.0 - etasq)
+        coef_1 = coef / psisq ** 3.5
+        c2 = coef_1 * self.xnodp * (self.aodp * (1.0 + 1.5 * etasq + eeta * (4.0 + etasq)) +
+                                    (0.75 * ck2) * tsi / psisq * self.x3thm1 * (8.0 + 3.0 * etasq * (8.0 + etasq)))
+        self.c1 = self.bstar * c2
+        self.c4 = 2.0 * self.xnodp * coef_1 * self.aodp * betao2 * (
+            self.eta * (2.0 + 0.5 * etasq) + eo * (0.5 + 2.0 * etasq) - (2.0 * ck2) * tsi /
+            (self.aodp * psisq) * (-3.0 * self.x3thm1 * (1.0 - 2.0 * eeta + etasq * (1.5 - 0.5 * eeta)) +
+                                   0.75 * self.x1mth2 * (2.0 * etasq - eeta * (1.0 + etasq)) *
+                                   numpy.cos(2.0 * self.omegao)))
+        is_eccentric = eo > self.ECC_ALL
+        safe_eo = numpy.where(is_eccentric, eo, 1.0)
+        safe_eeta = numpy.where(is_eccentric, eeta, 1.0)
+        self.c5 = numpy.where(is_normal, 2.0 * coef_1 * self.aodp * betao2 * (1.0 + 2.75 * (etasq + eeta) +
+                                                                             eeta * etasq), 0.0)
+        c3 = numpy.where(is_normal & is_eccentric, coef * tsi * a3ovk2 * self.xnodp * ae * self.sinIO / safe_eo, 0.0)
+        self.omgcof = self.bstar * c3 * numpy.cos(self.omegao)
+        # Вековые изменения среднего движения, аргумента перигея и долготы восходящего узла
+        pinvsq = 1.0 / (self.aodp ** 2 * betao2 ** 2)
+        temp1 = 3.0 * ck2 * pinvsq * self.xnodp
+        temp2 = temp1 * ck2 * pinvsq
+        temp3 = 1.25 * self.CK4 * pinvsq ** 2 * self.xnodp
+        theta4 = theta2 ** 2
+        self.xmdot = self.xnodp + (0.5 * temp1 * betao * self.x3thm1 + 0.0625 * temp2 * betao *
+                                   (13.0 - 78.0 * theta2 + 137.0 * theta4))
+        x1m5th = 1.0 - 5.0 * theta2
+        self.omgdot = -0.5 * temp1 * x1m5th + 0.0625 * temp2 * (7.0 - 114.0 * theta2 + 395.0 * theta4) + \
+            temp3 * (3.0 - 36.0 * theta2 + 49.0 * theta4)
+        xhdot1 = -temp1 * self.cosIO
+        self.xnodot = xhdot1 + (0.5 * temp2 * (4.0 - 19.0 * theta2) + 2.0 * temp3 * (3.0 - 7.0 * theta2)) * self.cosIO
+        self.xmcof = numpy.where(is_eccentric, (-(2. / 3) * ae) * coef * self.bstar / safe_eeta, 0.0)
+        self.xnodcf = 3.5 * betao2 * xhdot1 * self.c1
+        self.t2cof = 1.5 * self.c1
+        temp0 = 1.0 + self.cosIO
+        temp0 = numpy.where(numpy.abs(temp0) < self.EPS_COS, numpy.sign(temp0) * self.EPS_COS, temp0)
+        self.xlcof = 0.125 * a3ovk2 * self.sinIO * (3.0 + 5.0 * self.cosIO) / temp0
+        self.aycof = 0.25 * a3ovk2 * self.sinIO
+        self.sinXMO = numpy.sin(self.xmo)
+        self.delmo = (1.0 + self.eta * numpy.cos(self.xmo)) ** 3
+        # Коэффициенты D2-D4 (только для полных формул модели)
+        c1sq = self.c1 ** 2
+        d2 = 4.0 * self.aodp * tsi * c1sq
+        temp0 = d2 * tsi * self.c1 / 3.0
+        d3 = (17.0 * self.aodp + s4) * temp0
+        d4 = 0.5 * temp0 * self.aodp * tsi * (221.0 * self.aodp + 31.0 * s4) * self.c1
+        self.d2 = numpy.where(is_normal, d2, 0.0)
+        self.d3 = numpy.where(is_normal, d3, 0.0)
+        self.d4 = numpy.where(is_normal, d4, 0.0)
+        self.t3cof = numpy.where(is_normal, d2 + 2.0 * c1sq, 0.0)
+        self.t4cof = numpy.where(is_normal, 0.25 * (3.0 * d3 + self.c1 * (12.0 * d2 + 10.0 * c1sq)), 0.0)
+        self.t5cof = numpy.where(is_normal, 0.2 * (3.0 * d4 + 12.0 * self.c1 * d3 + 6.0 * d2 ** 2 +
+                                                   15.0 * c1sq * (2.0 * d2 + c1sq)), 0.0)
+
+    def to_calculate_positions_and_velocities(self, utc_times):
+        """
+        @Описание:
+            Метод вычисляет координаты и векторы скорости всех спутников в геоцентрической прямоугольной экваториальной
+                системе координат во все моменты времени utc_times по модели SGP4. Формулы выполняются над массивами
+                сразу для всех спутников и частей массива utc_times из не более чем COUNT_OF_ELEMENTS_IN_CHUNK пар
+                (момент времени, спутник).
+        :param utc_times: массив numpy.datetime64 моментов времени в формате UTC.
+        :return: массивы numpy координат (км) и векторов скорости (км/с) размера (len(utc_times),
+            self.count_of_satellites, 3)
+        """
+        utc_times = numpy.asarray(utc_times, dtype='datetime64[us]')
+        positions = numpy.empty((len(utc_times), self.count_of_satellites, 3))
+        velocities = numpy.empty((len(utc_times), self.count_of_satellites, 3))
+        count_of_times_in_chunk = max(1, self.COUNT_OF_ELEMENTS_IN_CHUNK // max(1, self.count_of_satellites))
+        for i in range(0, len(utc_times), count_of_times_in_chunk):
+            positions[i:i + count_of_times_in_chunk], velocities[i:i + count_of_times_in_chunk] = \
+                self.to_calculate_chunk(utc_times[i:i + count_of_times_in_chunk])
+        return positions, velocities
+
+    def to_calculate_chunk(self, utc_times):
+        """
+        @Описание:
+            Метод выполняет формулы модели SGP4 над массивами сразу для всех спутников и всех моментов времени
+                utc_times.
+        :param utc_times: массив numpy.datetime64[us] моментов времени в формате UTC.
+        :return: массивы numpy координат (км) и векторов скорости (км/с) размера (len(utc_times),
+            self.count_of_satellites, 3)
+        """
+        ae = self.AE
+        ck2 = self.CK2
+        # Время от эпохи TLE каждого спутника в минутах, размер (количество моментов времени, количество спутников)
+        ts = (utc_times[:, numpy.newaxis] - self.epochs[numpy.newaxis, :]) / numpy.timedelta64(1, 'm')
+        # Вековые возмущения от гравитации и сопротивления атмосферы
+        xmp = self.xmo + self.xmdot * ts
+        xnode = self.xnodeo + ts * (self.xnodot + ts * self.xnodcf)
+        delm = self.xmcof * ((1.0 + self.eta * numpy.cos(xmp)) ** 3 - self.delmo)
+        temp0 = ts * self.omgcof + delm
+        xmp = xmp + temp0
+        omega = self.omegao + self.omgdot * ts - temp0
+        tempe = numpy.where(self.is_simplified, self.bstar * ts * self.c4,
+                            self.bstar * (self.c4 * ts + self.c5 * (numpy.sin(xmp) - self.sinXMO)))
+        templ = ts * ts * (self.t2cof + ts * (self.t3cof + ts * (self.t4cof + ts * self.t5cof)))
+        tempa = 1.0 - (ts * (self.c1 + ts * (self.d2 + ts * (self.d3 + ts * self.d4))))
+        a = self.aodp * tempa ** 2
+        if numpy.any(a < 1):
+            raise ValueError("Спутник упал на Землю: большая полуось орбиты меньше радиуса Земли")
+        e = self.eo - tempe
+        e = numpy.clip(e, self.ECC_EPS, self.ECC_LIMIT_HIGH)
+        # Долгопериодические возмущения
+        beta2 = 1.0 - e ** 2
+        temp0 = 1.0 / (a * beta2)
+        axn = e * numpy.cos(omega)
+        ayn = e * numpy.sin(omega) + temp0 * self.aycof
+        elsq = axn ** 2 + ayn ** 2
+        ecc = numpy.sqrt(elsq)
+        xl = xmp + omega + xnode + self.xnodp * templ
+        xlt = xl + temp0 * self.xlcof * axn
+        # Решение уравнения Кеплера методом Ньютона
+        epw = numpy.fmod(xlt - xnode, 2 * numpy.pi)
+        capu = numpy.array(epw)
+        for i in range(10):
+            sin_epw = numpy.sin(epw)
+            cos_epw = numpy.cos(epw)
+            ecos_e = axn * cos_epw + ayn * sin_epw
+            esin_e = axn * sin_epw - ayn * cos_epw
+            f = capu - epw + esin_e
+            if numpy.all(numpy.abs(f) < self.NR_EPS):
+                break
+            df = 1.0 - ecos_e
+            nr = f / df
+            if i == 0:
+                nr = numpy.where(numpy.abs(nr) > 1.25 * ecc, numpy.sign(nr) * ecc, f / (df + 0.5 * esin_e * nr))
+            else:
+                nr = f / (df + 0.5 * esin_e * nr)
+            epw = epw + nr
+        # Короткопериодические возмущения
+        temp0 = 1.0 - elsq
+        betal = numpy.sqrt(temp0)
+        pl = a * temp0
+        r = a * (1.0 - ecos_e)
+        inv_r = 1.0 / r
+        temp2 = a * inv_r
+        temp3 = 1.0 / (1.0 + betal)
+        cosu = temp2 * (cos_epw - axn + ayn * esin_e * temp3)
+        sinu = temp2 * (sin_epw - ayn - axn * esin_e * temp3)
+        u = numpy.arctan2(sinu, cosu)
+        sin2u = 2.0 * sinu * cosu
+        cos2u = 2.0 * cosu ** 2 - 1.0
+        temp0 = 1.0 / pl
+        temp1 = ck2 * temp0
+        temp2 = temp1 * temp0
+        rk = r * (1.0 - 1.5 * temp2 * betal * self.x3thm1) + 0.5 * temp1 * self.x1mth2 * cos2u
+        if numpy.any(rk < 1):
+            raise ValueError("Спутник упал на Землю: расстояние до центра Земли меньше ее радиуса")
+        uk = u - 0.25 * temp2 * self.x7thm1 * sin2u
+        xnodek = xnode + 1.5 * temp2 * self.cosIO * sin2u
+        xinc = self.xincl + 1.5 * temp2 * self.cosIO * self.sinIO * cos2u
+        sqrt_a = numpy.sqrt(a)
+        temp2 = self.XKE / (a * sqrt_a)
+        velocity_unit = self.XKMPER / ae * self.XMNPDA / 86400.0
+        rdotk = (self.XKE * sqrt_a * esin_e * inv_r - temp2 * temp1 * self.x1mth2 * sin2u) * velocity_unit
+        rfdotk = (self.XKE * numpy.sqrt(pl) * inv_r + temp2 * temp1 * (self.x1mth2 * cos2u + 1.5 * self.x3thm1)) * \
+            velocity_unit
+        # Перевод в прямоугольные координаты
+        radius = rk * self.XKMPER / ae
+        sin_t = numpy.sin(uk)
+        cos_t = numpy.cos(uk)
+        sin_i = numpy.sin(xinc)
+        cos_i = numpy.cos(xinc)
+        sin_s = numpy.sin(xnodek)
+        cos_s = numpy.cos(xnodek)
+        xmx = -sin_s * cos_i
+        xmy = cos_s * cos_i
+        ux = xmx * sin_t + cos_s * cos_t
+        uy = xmy * sin_t + sin_s * cos_t
+        uz = sin_i * sin_t
+        vx = xmx * cos_t - cos_s * sin_t
+        vy = xmy * cos_t - sin_s * sin_t
+        vz = sin_i * cos_t
+        positions = numpy.stack((radius * ux, radius * uy, radius * uz), axis=-1)
+        velocities = numpy.stack((rdotk * ux + rfdotk * vx, rdotk * uy + rfdotk * vy, rdotk * uz + rfdotk * vz),
+                                 axis=-1)
+        return positions, velocities
+
+    def to_calculate_max_deviations(self, orbits, utc_times):
+        """
+        @Описание:
+            Метод вычисляет наибольшие по всем спутникам и моментам времени отклонения координат и векторов скорости,
+                вычисленных объектом, от вычисленных с помощью объектов Orbital из pyorbital.
+        :param orbits: список объектов Orbital из pyorbital для тех же спутников в том же порядке.
+        :param utc_times: массив numpy.datetime64 моментов времени в формате UTC.
+        :return: наибольшее отклонение координат (км) и наибольшее отклонение векторов скорости (км/с)
+        """
+        positions, velocities = self.to_calculate_positions_and_velocities(utc_times)
+        max_position_deviation = 0
+        max_velocity_deviation = 0
+        for i in range(0, len(orbits)):
+            position, velocity = orbits[i].get_position(utc_times, normalize=False)
+            max_position_deviation = max(max_position_deviation, float(numpy.max(
+                numpy.linalg.norm(positions[:, i, :] - numpy.transpose(position), axis=1))))
+            max_velocity_deviation = max(max_velocity_deviation, float(numpy.max(
+                numpy.linalg.norm(velocities[:, i, :] - numpy.transpose(velocity), axis=1))))
+        return max_position_deviation, max_velocity_deviation
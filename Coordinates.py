@@ -1,7 +1,13 @@
 from shapely.geometry import Point
 from pyorbital import astronomy
 import numpy
-import math
+import GeometryKernels
+
+
+# Количество итераций уточнения геодезической широты при переводе из прямоугольной системы координат в географическую.
+#   Погрешность широты уменьшается за итерацию примерно в 1 / e^2 ~ 150 раз, поэтому после 5 итераций, начиная с
+#   геоцентрической широты, она меньше 1e-12 радиан для точек от поверхности Земли до высоты в несколько тысяч км
+COUNT_OF_LATITUDE_ITERATIONS = 5
 
 
 class GeoCoordinates:
@@ -21,6 +27,7 @@ class GeoCoordinates:
         lat - географическая широта (градусы). При инициализации присваивается значение аргумента lat
         alt - высота над поверхностью Земли (м). При инициализации присваивается значение аргумента alt
     """
+    __slots__ = ('long', 'lat', 'alt')
 
     def __init__(self, long, lat, alt):
         self.long = long
@@ -61,26 +68,8 @@ class GeoCoordinates:
         :return: объект CartesianCoordinates - координаты (self.long, self.lat, self.alt), переведенные в географическую
             систему координат
         """
-        # a - большая полуось данного эллипсоид (в плоскости экватора)
-        a = earth_ellipsoid.semi_major_axis
-        # b - малая полуось данного эллипсоид (вдоль оси z)
-        b = earth_ellipsoid.semi_minor_axis
-        # Проверка того, задано ли время
-        if utc_time is not None:
-            # Если время задано, то определяется угол поворота Земли в данный момент времени
-            earth_turn = astronomy.gmst(utc_time)
-        else:
-            earth_turn = 0
-        # Перевод долготы и широты из градусов в радианы и из подвижной системы в неподвижную
-        long = numpy.deg2rad(self.long) + earth_turn
-        lat = numpy.deg2rad(self.lat)
-        alt = self.alt
-        # p вычисляется для удобства вычислений
-        p = a ** 2 / math.sqrt(a ** 2 * math.cos(lat) ** 2 + b ** 2 * math.sin(lat) ** 2)
-        # Вычисление прямоугольных координат
-        x = (p + alt) * math.cos(lat) * math.cos(long)
-        y = (p + alt) * math.cos(lat) * math.sin(long)
-        z = ((b ** 2 / a ** 2) * p + alt) * math.sin(lat)
+        # Перевод выполняется той же функцией, что и для массивов координат
+        x, y, z = to_cartesian_coordinates_of_arrays(self.long, self.lat, self.alt, utc_time, earth_ellipsoid)
         # Возвращает объет CartesianCoordinates с переведенными координатами
         return CartesianCoordinates(x, y, z)
 
@@ -109,6 +98,8 @@ class CartesianCoordinates:
         to_geo_coordinates(self, utc_time, earth_ellipsoid) - переводит кординаты из геоцентрической прямоугольной
             экваториальной системы, записаные в этом объекте, в географическую с учетом формы Земли и времени
     """
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x, y, z):
         self.x = x
         self.y = y
@@ -125,38 +116,10 @@ class CartesianCoordinates:
         :return: объект GeoCoordinates - координаты (self.x, self.y, self.z), переведенные в географическую систему
             координат
         """
-        f = earth_ellipsoid.f
-        a = earth_ellipsoid.semi_major_axis
-        # Проверка того, задано ли время
-        if utc_time is not None:
-            # Если время задано, то определяется угол поворота Земли в данный момент времени
-            earth_turn = astronomy.gmst(utc_time)
-        else:
-            earth_turn = 0
-        # Вычисление долготы (в радианах) с учетом поворота Земли (в подвижной системе координат)
-        long = ((numpy.arctan2(self.y, self.x) - earth_turn) % (2 * numpy.pi))
-        # Проверка того, не выходит ли долгота за пределы диапазона (-pi, pi]
-        long = numpy.where(long > math.pi, long - math.pi * 2, long)
-        long = numpy.where(long <= -math.pi, long + math.pi * 2, long)
-        # Расстояние до координат из начала отсчета в плоскости экватора
-        r = math.sqrt(self.x ** 2 + self.y ** 2)
-        # Вычисление широты в сферической системе
-        lat = numpy.arctan2(self.z, r)
-        # Вычисление эксцентриситета эллипсоида Земли в квадрате
-        e2 = f * (2 - f)
-        # Вычисление долготы (в радианах) в геодезической системе координат (нормальная проекция координаты на заданный
-        #   эллипсоид) с точностью до 1e-10 км
-        while True:
-            lat_in_last_iter = lat
-            sin_lat_in_last_iter = math.sin(lat_in_last_iter)
-            c = 1 / (math.sqrt(1 - e2 * (sin_lat_in_last_iter ** 2)))
-            lat = numpy.arctan2(self.z / a + c * e2 * sin_lat_in_last_iter, r / a)
-            if numpy.all(abs(lat - lat_in_last_iter) < 1e-10):
-                break
-        # Вычисление наименьшенго расстояния до поверхности заданного эллипсоида Земли
-        alt = r / math.cos(lat) - c * a
-        # Возвращает объет GeoCoordinate с переведенными координатами, долгота и широта при этом переводится в градусы
-        return GeoCoordinates(numpy.rad2deg(long), numpy.rad2deg(lat), alt)
+        # Перевод выполняется той же функцией, что и для массивов координат
+        long, lat, alt = to_geo_coordinates_of_arrays(self.x, self.y, self.z, utc_time, earth_ellipsoid)
+        # Возвращает объет GeoCoordinate с переведенными координатами в градусах
+        return GeoCoordinates(long, lat, alt)
 
 
 class GeoCoordinatesAndPointSet:
@@ -172,8 +135,177 @@ class GeoCoordinatesAndPointSet:
     @Поля:
         geo_coordinates - содержит объект GeoCoordinates, который создаётся при инициализации с аргументами
             long, lat, alt
-        point - содержит объект shapely.geometry.Point, который создаётся при инициализации с аргументами long, lat
+        point - содержит объект shapely.geometry.Point с координатами long, lat. Создается только при первом обращении,
+            так как объекты GeoCoordinatesAndPointSet создаются для каждого сегмента полигонов (миллионы объектов), а
+            при съемке используются сами долгота и широта.
+        point_cache - созданный объект shapely.geometry.Point. При инициализации - None.
     """
+    __slots__ = ('geo_coordinates', 'point_cache')
+
     def __init__(self, long, lat, alt):
         self.geo_coordinates = GeoCoordinates(long, lat, alt)
-        self.point = Point(long, lat)
+        self.point_cache = None
+
+    @property
+    def point(self):
+        """
+        @Описание:
+            Метод возвращает объект shapely.geometry.Point с координатами self.geo_coordinates, создавая его при первом
+                обращении.
+        :return: объект shapely.geometry.Point
+        """
+        if self.point_cache is None:
+            self.point_cache = Point(self.geo_coordinates.long, self.geo_coordinates.lat)
+        return self.point_cache
+
+
+class EarthRotationCache:
+    """
+    @Описание:
+        Класс моделирует хранилище углов поворота Земли (гринвичского среднего звездного времени, GMST), вычисленных
+            для моментов модельного времени. В течение одного шага модельного времени переводы координат всех
+            спутников, подспутниковых точек и углов полос захвата выполняются для одного и того же времени, поэтому угол
+            поворота вычисляется один раз и берется из хранилища. Предусматривается возможность заранее заполнить
+            хранилище для сетки модельного времени.
+
+    @Константы:
+        MAX_SIZE - наибольшее количество моментов времени в хранилище. При превышении удаляются записи, добавленные
+            раньше других.
+
+    @Поля:
+        earth_turns - словарь, ключи которого - моменты времени в формате UTC (datetime), значения - углы поворота
+            Земли (радианы). При инициализации - пустой словарь.
+
+    @Методы:
+        to_get_earth_turn(self, utc_time) - возвращает угол поворота Земли в заданное время.
+        to_fill(self, utc_times) - вычисляет углы поворота Земли сразу для массива моментов времени и записывает их в
+            хранилище.
+        to_add(self, utc_time, earth_turn) - записывает угол поворота Земли в хранилище.
+        to_clear(self) - очищает хранилище.
+    """
+    MAX_SIZE = 10000
+
+    def __init__(self):
+        self.earth_turns = {}
+
+    def to_get_earth_turn(self, utc_time):
+        """
+        @Описание:
+            Метод возвращает угол поворота Земли (GMST) в момент времени utc_time. Для отдельного момента времени угол
+                берется из хранилища, а если его там нет, то вычисляется с помощью pyorbital и записывается в
+                хранилище. Для массива моментов времени углы вычисляются без хранилища.
+        :param utc_time: время в формате UTC (datetime) или массив numpy.datetime64. Допустимо None - тогда вращение
+            Земли не учитывается.
+        :return: угол поворота Земли (радианы) или массив numpy углов
+        """
+        if utc_time is None:
+            return 0
+        if isinstance(utc_time, numpy.ndarray):
+            return astronomy.gmst(utc_time)
+        earth_turn = self.earth_turns.get(utc_time)
+        if earth_turn is None:
+            earth_turn = astronomy.gmst(utc_time)
+            self.to_add(utc_time, earth_turn)
+        return earth_turn
+
+    def to_fill(self, utc_times):
+        """
+        @Описание:
+            Метод вычисляет углы поворота Земли сразу для всех моментов времени utc_times (например, для сетки блока
+                эфемерид) одним вызовом pyorbital и записывает их в хранилище.
+        :param utc_times: массив numpy.datetime64 моментов времени в формате UTC.
+        :return: дополняет словарь self.earth_turns
+        """
+        earth_turns = astronomy.gmst(utc_times)
+        utc_times = numpy.asarray(utc_times, dtype='datetime64[us]').tolist()
+        for utc_time, earth_turn in zip(utc_times, earth_turns.tolist()):
+            self.to_add(utc_time, earth_turn)
+
+    def to_add(self, utc_time, earth_turn):
+        """
+        @Описание:
+            Метод записывает угол поворота Земли earth_turn для момента времени utc_time в хранилище. Если хранилище
+                заполнено, то из него удаляется запись, добавленная раньше других.
+        :param utc_time: время в формате UTC (datetime).
+        :param earth_turn: угол поворота Земли (радианы).
+        :return: дополняет словарь self.earth_turns
+        """
+        if len(self.earth_turns) >= self.MAX_SIZE:
+            del self.earth_turns[next(iter(self.earth_turns))]
+        self.earth_turns[utc_time] = earth_turn
+
+    def to_clear(self):
+        """
+        @Описание:
+            Метод очищает хранилище углов поворота Земли.
+        :return: очищает словарь self.earth_turns
+        """
+        self.earth_turns = {}
+
+
+# Общее хранилище углов поворота Земли для всех переводов координат
+earth_rotation_cache = EarthRotationCache()
+
+
+def to_geo_coordinates_of_arrays(x, y, z, utc_time, earth_ellipsoid):
+    """
+    @Описание:
+        Метод переводит массивы кординат из геоцентрической прямоугольной экваториальной системы в географическую с
+            учетом эллипсоида Земли earth_ellipsoid и времени в формате UTC utc_time сразу для всех элементов массивов.
+            Формула взята из библиотеки pyorbital
+            (https://github.com/pytroll/pyorbital/blob/master/pyorbital/orbital.py), геодезическая широта уточняется
+            фиксированное количество раз (COUNT_OF_LATITUDE_ITERATIONS) без проверки сходимости. Вычисления выполняются
+            ядром GeometryKernels.to_geo_coordinates. Используется и методом CartesianCoordinates.to_geo_coordinates для
+            отдельных координат.
+    :param x: одномерный массив numpy координат x (км) или число.
+    :param y: одномерный массив numpy координат y (км) или число.
+    :param z: одномерный массив numpy координат z (км) или число.
+    :param utc_time: время в формате UTC (или массив numpy.datetime64 того же размера), показывающее, как повернута
+        Земля. Если его значение None, то вращение Земли не учитывается
+    :param earth_ellipsoid: эллипсоид Земли. Его форма учитывается при переводе
+    :return: массивы numpy долгот (градусы), широт (градусы) и высот над поверхностью Земли (км)
+    """
+    # Угол поворота Земли берется из общего хранилища
+    earth_turn = earth_rotation_cache.to_get_earth_turn(utc_time)
+    # Ядро принимает одномерные массивы одного размера (отдельные координаты переводятся в массивы из одного элемента)
+    x = numpy.asarray(x, dtype=float)
+    is_scalar = x.ndim == 0
+    x = numpy.atleast_1d(x)
+    y = numpy.atleast_1d(numpy.asarray(y, dtype=float))
+    z = numpy.atleast_1d(numpy.asarray(z, dtype=float))
+    earth_turn = numpy.broadcast_to(numpy.asarray(earth_turn, dtype=float), x.shape)
+    long, lat, alt = GeometryKernels.to_geo_coordinates(x, y, z, earth_turn, earth_ellipsoid.semi_major_axis,
+                                                        earth_ellipsoid.f, COUNT_OF_LATITUDE_ITERATIONS)
+    if is_scalar:
+        return long[0], lat[0], alt[0]
+    return long, lat, alt
+
+
+def to_cartesian_coordinates_of_arrays(long, lat, alt, utc_time, earth_ellipsoid):
+    """
+    @Описание:
+        Метод переводит массивы кординат из географической системы координат в геоцентрическую прямоугольную
+            экваториальную систему с учетом эллипсоида Земли earth_ellipsoid и времени в формате UTC utc_time сразу для
+            всех элементов массивов. Формула взята из лекций
+            http://lnfm1.sai.msu.ru/grav/russian/lecture/tfe/node3.html. Используется и методом
+            GeoCoordinates.to_cartesian_coordinates для отдельных координат.
+    :param long: массив numpy долгот (градусы) или число.
+    :param lat: массив numpy широт (градусы) или число.
+    :param alt: массив numpy высот над поверхностью Земли (км) или число.
+    :param utc_time: время в формате UTC (или массив numpy.datetime64 того же размера), показывающее, как повернута
+        Земля. Если его значение None, то вращение Земли не учитывается
+    :param earth_ellipsoid: эллипсоид Земли. Его форма учитывается при переводе
+    :return: массивы numpy координат x, y, z (км)
+    """
+    a = earth_ellipsoid.semi_major_axis
+    b = earth_ellipsoid.semi_minor_axis
+    earth_turn = earth_rotation_cache.to_get_earth_turn(utc_time)
+    long = numpy.deg2rad(long) + earth_turn
+    lat = numpy.deg2rad(lat)
+    cos_lat = numpy.cos(lat)
+    sin_lat = numpy.sin(lat)
+    p = a ** 2 / numpy.sqrt(a ** 2 * cos_lat ** 2 + b ** 2 * sin_lat ** 2)
+    x = (p + alt) * cos_lat * numpy.cos(long)
+    y = (p + alt) * cos_lat * numpy.sin(long)
+    z = ((b ** 2 / a ** 2) * p + alt) * sin_lat
+    return x, y, z
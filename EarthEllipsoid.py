@@ -1,4 +1,5 @@
 import math
+import numpy
 
 
 class EarthEllipsoid:
@@ -17,6 +18,8 @@ class EarthEllipsoid:
     @Константы
         SEMI_MAJOR_AXIS_WGS_84 - большая полуось модели эллипсоида Земли из WGS-84
         F_WGS_84 - сжатие модели эллипсоида Земли из WGS-84
+        GM_WGS_84 - геоцентрическая гравитационная постоянная из WGS-84 (км^3/с^2)
+        ANGULAR_VELOCITY_WGS_84 - угловая скорость вращения Земли из WGS-84 (рад/с)
 
     @Поля класса:
         semi_major_axis - большая полуось модели земного эллипсоида (км). Полю присваивается значение аргумента
@@ -30,10 +33,14 @@ class EarthEllipsoid:
 
     @Методы класса:
         dist_between_geo_coordinates - вычисляет расстояние по кратчайшей дуге между двумя географическими координатами
+        to_calculate_dists_between_geo_coordinates_of_arrays - вычисляет расстояния по кратчайшей дуге между
+            географическими координатами, заданными массивами
     """
 
     SEMI_MAJOR_AXIS_WGS_84 = 6378.137
     F_WGS_84 = 1 / 298.257223563
+    GM_WGS_84 = 398600.4418
+    ANGULAR_VELOCITY_WGS_84 = 7.292115e-5
 
     def __init__(self, semi_major_axis=None, f=None):
         # Производится проверка, заданы ли аргументы
@@ -80,6 +87,37 @@ class EarthEllipsoid:
 
         return delta_small_angle * self.semi_major_axis
 
+    def to_calculate_dists_between_geo_coordinates_of_arrays(self, long_1, lat_1, long_2, lat_2):
+        """
+        @Описание:
+            Метод вычисляет расстояния по кратчайшей дуге между географическими координатами, заданными массивами
+                долгот и широт. Вычисление то же, что и в методе dist_between_geo_coordinates, но выполняется сразу для
+                всех элементов массивов (массивы могут иметь разные размеры, если их можно согласовать по правилам
+                numpy).
+        :param long_1: массив numpy долгот первых точек (градусы)
+        :param lat_1: массив numpy широт первых точек (градусы)
+        :param long_2: массив numpy долгот вторых точек (градусы)
+        :param lat_2: массив numpy широт вторых точек (градусы)
+        :return: массив numpy расстояний между точками по кратчайшей дуге в километрах
+        """
+        lat1 = math.pi * numpy.asarray(lat_1) / 180
+        lat2 = math.pi * numpy.asarray(lat_2) / 180
+        delta_long = math.pi * numpy.subtract(long_1, long_2) / 180
+        sin_lat1 = numpy.sin(lat1)
+        cos_lat1 = numpy.cos(lat1)
+        sin_lat2 = numpy.sin(lat2)
+        cos_lat2 = numpy.cos(lat2)
+        sin_delta_long = numpy.sin(delta_long)
+        cos_delta_long = numpy.cos(delta_long)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            delta_small_angle = numpy.arctan((((cos_lat2 * sin_delta_long) ** 2 +
+                                               (cos_lat1 * sin_lat2 - sin_lat1 * cos_lat2 * cos_delta_long) ** 2) **
+                                              0.5) /
+                                             (sin_lat1 * sin_lat2 + cos_lat1 * cos_lat2 * cos_delta_long))
+        # Приведение углов delta_small_angle к положительному значению
+        delta_small_angle = numpy.where(delta_small_angle < 0, delta_small_angle + math.pi, delta_small_angle)
+        return delta_small_angle * self.semi_major_axis
+
     def to_str(self, count_of_numerals_after_point_in_semi_major_axis=3, count_of_numerals_after_point_in_f=8):
         """
         @Описание:
@@ -0,0 +1,224 @@
+import os
+import hashlib
+import numpy
+from datetime import timedelta
+
+
+class Ephemeris:
+    """
+    @Описание:
+        Класс содержит эфемериды всех спутников некоторой спутниковой группировки - координаты и векторы скорости в
+            геоцентрической прямоугольной экваториальной системе координат, вычисленные для блока модельного времени
+            с постоянным шагом. Предусматривается возможность определения номера момента времени в блоке и получения
+            координат и вектора скорости некоторого спутника в этот момент времени.
+
+    @Аргументы:
+        initial_time - время в формате UTC, с которого начинается блок модельного времени (datetime).
+        step - шаг модельного времени в блоке (секунды).
+        positions - массив numpy размера (count_of_steps, count_of_satellites, 3), содержащий координаты спутников
+            группировки в каждый момент времени блока (км).
+        velocities - массив numpy размера (count_of_steps, count_of_satellites, 3), содержащий векторы скорости
+            спутников группировки в каждый момент времени блока (км/с).
+
+    @Поля:
+        initial_time - время в формате UTC, с которого начинается блок модельного времени (datetime). Задается
+            аргументом initial_time при инициализации.
+        step - шаг модельного времени в блоке (секунды). Задается аргументом step при инициализации.
+        count_of_steps - количество моментов времени в блоке. Вычисляется при инициализации по размеру positions.
+        final_time - время в формате UTC последнего момента времени в блоке (datetime). Вычисляется при
+            инициализации.
+        positions - массив координат спутников группировки (км). Задается аргументом positions при инициализации.
+        velocities - массив векторов скорости спутников группировки (км/с). Задается аргументом velocities при
+            инициализации.
+
+    @Методы:
+        to_get_index(self, time) - определяет номер момента времени time в блоке. Если время time не входит в блок
+            или не попадает на его сетку, возвращается None.
+        to_get_position_and_velocity(self, index_of_time, index_of_satellite) - возвращает координаты и вектор
+            скорости спутника с номером index_of_satellite в момент времени с номером index_of_time.
+    """
+    # Допустимое отклонение времени от сетки блока (секунды)
+    TIME_TOLERANCE = 1e-6
+
+    def __init__(self, initial_time, step, positions, velocities):
+        self.initial_time = initial_time
+        self.step = step
+        self.count_of_steps = positions.shape[0]
+        self.final_time = initial_time + timedelta(seconds=step * (self.count_of_steps - 1))
+        self.positions = positions
+        self.velocities = velocities
+
+    def to_get_index(self, time):
+        """
+        @Описание:
+            Метод определяет номер момента времени time в моделируемом блоке модельного времени.
+        :param time: время в формате UTC (datetime).
+        :return: номер момента времени time в блоке (int). Если время time не входит в блок или не попадает на сетку
+            блока с шагом self.step, то None.
+        """
+        if time < self.initial_time or time > self.final_time:
+            return None
+        seconds_from_initial_time = (time - self.initial_time).total_seconds()
+        index_of_time = int(round(seconds_from_initial_time / self.step))
+        if abs(index_of_time * self.step - seconds_from_initial_time) > self.TIME_TOLERANCE:
+            return None
+        return index_of_time
+
+    def to_get_position_and_velocity(self, index_of_time, index_of_satellite):
+        """
+        @Описание:
+            Метод возвращает координаты и вектор скорости спутника с номером index_of_satellite в момент времени с
+                номером index_of_time.
+        :param index_of_time: номер момента времени в блоке (int).
+        :param index_of_satellite: номер спутника в группировке (int).
+        :return: координаты спутника (x, y, z) (км) и вектор его скорости (vx, vy, vz) (км/с) в виде двух списков
+        """
+        return self.positions[index_of_time, index_of_satellite].tolist(), \
+            self.velocities[index_of_time, index_of_satellite].tolist()
+
+
+class EphemerisCache:
+    """
+    @Описание:
+        Класс моделирует хранилище блоков эфемерид на диске. Каждый блок сохраняется в виде двух файлов .npy
+            (координаты и векторы скорости) под ключом - хэшем строк TLE всех спутников группировки, шага, начального и
+            конечного времени блока и параметров эллипсоида Земли. При повторном моделировании на том же интервале
+            времени блок загружается с диска в режиме memory-map вместо повторного вычисления SGP4.
+
+    @Аргументы:
+        directory - адрес директории, в которой хранятся блоки эфемерид (String). Если директории нет, она создается.
+
+    @Поля:
+        directory - адрес директории, в которой хранятся блоки эфемерид. Задается аргументом directory при
+            инициализации.
+
+    @Методы:
+        to_make_key(tle_lines, initial_time, step, count_of_steps, earth_ellipsoid, interpolation_step=None) -
+            статический метод. Вычисляет ключ блока эфемерид.
+        to_load(self, key, initial_time, step) - загружает блок эфемерид с ключом key, если он сохранен.
+        to_save(self, key, ephemeris) - сохраняет блок эфемерид под ключом key.
+        to_get_addresses(self, key) - возвращает адреса файлов блока эфемерид с ключом key.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    @staticmethod
+    def to_make_key(tle_lines, initial_time, step, count_of_steps, earth_ellipsoid, interpolation_step=None):
+        """
+        @Описание:
+            Метод вычисляет ключ блока эфемерид - хэш SHA-256 строк TLE всех спутников группировки, шага, начального и
+                конечного времени блока, параметров эллипсоида Земли и шага узлов интерполяции (если блок получен
+                интерполяцией).
+        :param tle_lines: список строк TLE спутников группировки в порядке их номеров в группировке (String).
+        :param initial_time: первый момент времени блока (datetime).
+        :param step: шаг времени в блоке (секунды).
+        :param count_of_steps: количество моментов времени в блоке (int).
+        :param earth_ellipsoid: объект EarthEllipsoid, вокруг которого движутся спутники группировки.
+        :param interpolation_step: шаг узлов интерполяции (секунды). Допустимо None - блок вычислен без интерполяции.
+        :return: ключ блока эфемерид (String)
+        """
+        final_time = initial_time + timedelta(seconds=step * (count_of_steps - 1))
+        key_parts = list(tle_lines) + [initial_time.isoformat(), final_time.isoformat(), repr(float(step)),
+                                       str(count_of_steps), repr(earth_ellipsoid.semi_major_axis),
+                                       repr(earth_ellipsoid.f)]
+        # Ключи блоков без интерполяции остаются прежними
+        if interpolation_step is not None:
+            key_parts.append("".join(["hermite ", repr(float(interpolation_step))]))
+        key_data = "\n".join(key_parts)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def to_load(self, key, initial_time, step):
+        """
+        @Описание:
+            Метод загружает блок эфемерид с ключом key в режиме memory-map, если он сохранен в self.directory.
+        :param key: ключ блока эфемерид (String).
+        :param initial_time: первый момент времени блока (datetime).
+        :param step: шаг времени в блоке (секунды).
+        :return: объект Ephemeris, если блок сохранен, если нет, то None
+        """
+        positions_address, velocities_address = self.to_get_addresses(key)
+        if not (os.path.exists(positions_address) and os.path.exists(velocities_address)):
+            return None
+        positions = numpy.load(positions_address, mmap_mode='r')
+        velocities = numpy.load(velocities_address, mmap_mode='r')
+        return Ephemeris(initial_time, step, positions, velocities)
+
+    def to_save(self, key, ephemeris):
+        """
+        @Описание:
+            Метод сохраняет блок эфемерид ephemeris под ключом key в self.directory. Файлы сначала записываются под
+                временными именами, а затем переименовываются, чтобы прерванная запись не оставляла испорченного блока.
+        :param key: ключ блока эфемерид (String).
+        :param ephemeris: сохраняемый объект Ephemeris.
+        :return: в self.directory записываются два файла .npy
+        """
+        for address, array in zip(self.to_get_addresses(key), (ephemeris.positions, ephemeris.velocities)):
+            temporary_address = "".join([address[:-len('.npy')], '.tmp.npy'])
+            numpy.save(temporary_address, array)
+            os.replace(temporary_address, address)
+
+    def to_get_addresses(self, key):
+        """
+        @Описание:
+            Метод возвращает адреса файлов, в которых хранятся координаты и векторы скорости блока с ключом key.
+        :param key: ключ блока эфемерид (String).
+        :return: адрес файла координат и адрес файла векторов скорости (String)
+        """
+        return os.path.join(self.directory, "".join([key, '_positions.npy'])), \
+            os.path.join(self.directory, "".join([key, '_velocities.npy']))
+
+
+def to_make_time_grid(initial_time, step, count_of_steps):
+    """
+    @Описание:
+        Метод составляет массив моментов времени с постоянным шагом в формате numpy.datetime64, который может быть
+            передан в pyorbital для вычисления координат спутника сразу во все эти моменты.
+    :param initial_time: первый момент времени (datetime).
+    :param step: шаг времени (секунды).
+    :param count_of_steps: количество моментов времени (int).
+    :return: массив numpy.datetime64 длиной count_of_steps
+    """
+    step_in_microseconds = int(round(step * 1e6))
+    return numpy.datetime64(initial_time, 'us') + \
+        numpy.arange(count_of_steps) * numpy.timedelta64(step_in_microseconds, 'us')
+
+
+def to_interpolate_hermite(node_step, node_positions, node_velocities, seconds):
+    """
+    @Описание:
+        Метод вычисляет координаты и векторы скорости всех спутников в заданные моменты времени кубической
+            интерполяцией Эрмита по координатам и векторам скорости в узлах с постоянным шагом node_step. На каждом
+            интервале между соседними узлами координаты - кубический многочлен, совпадающий в узлах с координатами и
+            векторами скорости, векторы скорости - его производная.
+    :param node_step: шаг узлов интерполяции (секунды).
+    :param node_positions: массив numpy размера (count_of_nodes, count_of_satellites, 3) координат спутников в узлах
+        (км). Узел с номером j соответствует моменту времени j * node_step секунд от первого узла.
+    :param node_velocities: массив numpy того же размера векторов скорости спутников в узлах (км/с).
+    :param seconds: массив numpy моментов времени в секундах от первого узла. Все моменты должны лежать между первым и
+        последним узлами.
+    :return: массивы numpy координат (км) и векторов скорости (км/с) размера (len(seconds), count_of_satellites, 3)
+    """
+    seconds = numpy.asarray(seconds, dtype=float)
+    # Номер интервала между узлами и положение момента времени на нем (от 0 до 1)
+    indexes = numpy.clip(numpy.floor(seconds / node_step).astype(int), 0, node_positions.shape[0] - 2)
+    tau = (seconds - indexes * node_step) / node_step
+    tau = tau[:, numpy.newaxis, numpy.newaxis]
+    tau_2 = tau * tau
+    tau_3 = tau_2 * tau
+    p_0 = node_positions[indexes]
+    p_1 = node_positions[indexes + 1]
+    v_0 = node_velocities[indexes]
+    v_1 = node_velocities[indexes + 1]
+    # Базисные многочлены Эрмита и их производные по tau
+    h_00 = 2 * tau_3 - 3 * tau_2 + 1
+    h_10 = tau_3 - 2 * tau_2 + tau
+    h_01 = 3 * tau_2 - 2 * tau_3
+    h_11 = tau_3 - tau_2
+    dh_00 = 6 * tau_2 - 6 * tau
+    dh_10 = 3 * tau_2 - 4 * tau + 1
+    dh_11 = 3 * tau_2 - 2 * tau
+    positions = h_00 * p_0 + h_01 * p_1 + node_step * (h_10 * v_0 + h_11 * v_1)
+    velocities = dh_00 * (p_0 - p_1) / node_step + dh_10 * v_0 + dh_11 * v_1
+    return positions, velocities
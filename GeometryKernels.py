@@ -0,0 +1,153 @@
+import math
+import numpy
+
+
+# Вычислительные ядра геометрических расчетов, на которых основаны методы AnalyticGeometry и Coordinates. Здесь они
+#   реализованы на Python и NumPy. Если заранее собран модуль GeometryKernelsAccelerated (командой
+#   python BuildGeometryKernels.py build_ext --inplace), то в конце модуля функции с теми же названиями и аргументами
+#   заменяются его функциями. При импорте ничего не компилируется.
+
+
+def to_rotate_vector(x, y, z, axis_x, axis_y, axis_z, angle_of_rotation):
+    """
+    @Описание:
+        Метод вычисляет координаты вектора (x, y, z), повернутого вокруг оси (axis_x, axis_y, axis_z) на угол
+            angle_of_rotation по формуле Родрига (коэффициенты матрицы поворота те же, что и в
+            AnalyticGeometry.RotationMatrix). Вычисления выполняются над числами без создания объектов.
+    :param x: координата x поворачиваемого вектора.
+    :param y: координата y поворачиваемого вектора.
+    :param z: координата z поворачиваемого вектора.
+    :param axis_x: координата x вектора, задающего ось вращения (нормировать не обязательно).
+    :param axis_y: координата y вектора, задающего ось вращения.
+    :param axis_z: координата z вектора, задающего ось вращения.
+    :param angle_of_rotation: угол поворота (передается в синус и косинус без перевода).
+    :return: координаты x, y, z повернутого вектора
+    """
+    length = math.sqrt(axis_x * axis_x + axis_y * axis_y + axis_z * axis_z)
+    axis_x = axis_x / length
+    axis_y = axis_y / length
+    axis_z = axis_z / length
+    sin_of_angle = math.sin(angle_of_rotation)
+    cos_of_angle = math.cos(angle_of_rotation)
+    rotated_x = (cos_of_angle + (1 - cos_of_angle) * axis_x * axis_x) * x + \
+        ((1 - cos_of_angle) * axis_x * axis_y - sin_of_angle * axis_z) * y + \
+        ((1 - cos_of_angle) * axis_x * axis_z + sin_of_angle * axis_y) * z
+    rotated_y = ((1 - cos_of_angle) * axis_x * axis_y + sin_of_angle * axis_z) * x + \
+        (cos_of_angle + (1 - cos_of_angle) * axis_y * axis_y) * y + \
+        ((1 - cos_of_angle) * axis_y * axis_z - sin_of_angle * axis_x) * z
+    rotated_z = ((1 - cos_of_angle) * axis_x * axis_z - sin_of_angle * axis_y) * x + \
+        ((1 - cos_of_angle) * axis_y * axis_z + sin_of_angle * axis_x) * y + \
+        (cos_of_angle + (1 - cos_of_angle) * axis_z * axis_z) * z
+    return rotated_x, rotated_y, rotated_z
+
+
+def to_rotate_vectors(vectors, axes_of_rotation, angles_of_rotation, out):
+    """
+    @Описание:
+        Метод вычисляет векторы, равные векторам vectors, повернутым вокруг осей axes_of_rotation на углы
+            angles_of_rotation по формуле Родрига, сразу для массивов векторов, осей и углов.
+    :param vectors: массив numpy поворачиваемых векторов размера (N, 3).
+    :param axes_of_rotation: массив numpy векторов, задающих оси вращения, размера (N, 3).
+    :param angles_of_rotation: массив numpy углов поворота размера N.
+    :param out: массив numpy размера (N, 3), в который записываются повернутые векторы. Может совпадать с
+        axes_of_rotation, но не с vectors.
+    :return: массив out
+    """
+    length = numpy.sqrt(axes_of_rotation[:, 0] * axes_of_rotation[:, 0] +
+                        axes_of_rotation[:, 1] * axes_of_rotation[:, 1] +
+                        axes_of_rotation[:, 2] * axes_of_rotation[:, 2])
+    axis_x = axes_of_rotation[:, 0] / length
+    axis_y = axes_of_rotation[:, 1] / length
+    axis_z = axes_of_rotation[:, 2] / length
+    sin_of_angle = numpy.sin(angles_of_rotation)
+    cos_of_angle = numpy.cos(angles_of_rotation)
+    one_minus_cos_of_angle = 1 - cos_of_angle
+    x = vectors[:, 0]
+    y = vectors[:, 1]
+    z = vectors[:, 2]
+    out[:, 0] = (cos_of_angle + one_minus_cos_of_angle * axis_x * axis_x) * x + \
+        (one_minus_cos_of_angle * axis_x * axis_y - sin_of_angle * axis_z) * y + \
+        (one_minus_cos_of_angle * axis_x * axis_z + sin_of_angle * axis_y) * z
+    out[:, 1] = (one_minus_cos_of_angle * axis_x * axis_y + sin_of_angle * axis_z) * x + \
+        (cos_of_angle + one_minus_cos_of_angle * axis_y * axis_y) * y + \
+        (one_minus_cos_of_angle * axis_y * axis_z - sin_of_angle * axis_x) * z
+    out[:, 2] = (one_minus_cos_of_angle * axis_x * axis_z - sin_of_angle * axis_y) * x + \
+        (one_minus_cos_of_angle * axis_y * axis_z + sin_of_angle * axis_x) * y + \
+        (cos_of_angle + one_minus_cos_of_angle * axis_z * axis_z) * z
+    return out
+
+
+def to_intersect_lines_and_canonical_ellipsoid(points_on_lines, directing_vectors, axis_a, axis_b, axis_c, out):
+    """
+    @Описание:
+        Метод сразу для N прямых вычисляет ближайшие к точкам отсчета точки пересечения прямых с каноническим
+            эллипсоидом с полуосями axis_a, axis_b, axis_c. Для прямых, не пересекающих эллипсоид, координаты - nan.
+    :param points_on_lines: массив numpy точек отсчета прямых размера (N, 3).
+    :param directing_vectors: массив numpy направляющих векторов прямых размера (N, 3).
+    :param axis_a: полуось эллипсоида, параллельная оси x.
+    :param axis_b: полуось эллипсоида, параллельная оси y.
+    :param axis_c: полуось эллипсоида, параллельная оси z.
+    :param out: массив numpy размера (N, 3), в который записываются точки пересечения.
+    :return: массив out
+    """
+    a_coef = (directing_vectors[:, 0] / axis_a) ** 2 + (directing_vectors[:, 1] / axis_b) ** 2 + \
+        (directing_vectors[:, 2] / axis_c) ** 2
+    b_coef = 2 * (points_on_lines[:, 0] * directing_vectors[:, 0] / (axis_a * axis_a) +
+                  points_on_lines[:, 1] * directing_vectors[:, 1] / (axis_b * axis_b) +
+                  points_on_lines[:, 2] * directing_vectors[:, 2] / (axis_c * axis_c))
+    c_coef = (points_on_lines[:, 0] / axis_a) ** 2 + (points_on_lines[:, 1] / axis_b) ** 2 + \
+        (points_on_lines[:, 2] / axis_c) ** 2 - 1
+    # При отрицательном дискриминанте решения - nan
+    with numpy.errstate(invalid='ignore'):
+        square_root_of_discriminant = numpy.sqrt(b_coef ** 2 - 4 * a_coef * c_coef)
+    coef_1 = (-b_coef + square_root_of_discriminant) / (2 * a_coef)
+    coef_2 = (-b_coef - square_root_of_discriminant) / (2 * a_coef)
+    point_1 = points_on_lines + coef_1[:, numpy.newaxis] * directing_vectors
+    point_2 = points_on_lines + coef_2[:, numpy.newaxis] * directing_vectors
+    dist_1 = numpy.sqrt(numpy.sum((points_on_lines - point_1) * (points_on_lines - point_1), axis=1))
+    dist_2 = numpy.sqrt(numpy.sum((points_on_lines - point_2) * (points_on_lines - point_2), axis=1))
+    out[:] = numpy.where((dist_2 >= dist_1)[:, numpy.newaxis], point_1, point_2)
+    return out
+
+
+def to_geo_coordinates(x, y, z, earth_turn, semi_major_axis, f, count_of_iterations):
+    """
+    @Описание:
+        Метод переводит массивы координат из геоцентрической прямоугольной экваториальной системы в географическую при
+            заданном угле поворота Земли. Формула взята из библиотеки pyorbital, геодезическая широта уточняется
+            count_of_iterations раз.
+    :param x: массив numpy координат x (км).
+    :param y: массив numpy координат y (км).
+    :param z: массив numpy координат z (км).
+    :param earth_turn: угол поворота Земли (радианы) или массив numpy углов того же размера.
+    :param semi_major_axis: большая полуось эллипсоида Земли (км).
+    :param f: сжатие эллипсоида Земли.
+    :param count_of_iterations: количество итераций уточнения широты (int).
+    :return: массивы numpy долгот (градусы), широт (градусы) и высот над поверхностью Земли (км)
+    """
+    long = ((numpy.arctan2(y, x) - earth_turn) % (2 * numpy.pi))
+    long = numpy.where(long > math.pi, long - math.pi * 2, long)
+    long = numpy.where(long <= -math.pi, long + math.pi * 2, long)
+    r = numpy.sqrt(x ** 2 + y ** 2)
+    lat = numpy.arctan2(z, r)
+    e2 = f * (2 - f)
+    z_to_a = z / semi_major_axis
+    r_to_a = r / semi_major_axis
+    for _ in range(count_of_iterations):
+        sin_lat_in_last_iter = numpy.sin(lat)
+        c = 1 / (numpy.sqrt(1 - e2 * (sin_lat_in_last_iter ** 2)))
+        lat = numpy.arctan2(z_to_a + c * e2 * sin_lat_in_last_iter, r_to_a)
+    alt = r / numpy.cos(lat) - c * semi_major_axis
+    return numpy.rad2deg(long), numpy.rad2deg(lat), alt
+
+
+# Замена функций функциями заранее собранного модуля с теми же названиями и аргументами, если он есть
+try:
+    import GeometryKernelsAccelerated
+    to_rotate_vector = GeometryKernelsAccelerated.to_rotate_vector
+    to_rotate_vectors = GeometryKernelsAccelerated.to_rotate_vectors
+    to_intersect_lines_and_canonical_ellipsoid = GeometryKernelsAccelerated.to_intersect_lines_and_canonical_ellipsoid
+    to_geo_coordinates = GeometryKernelsAccelerated.to_geo_coordinates
+    IS_ACCELERATED = True
+except ImportError:
+    IS_ACCELERATED = False
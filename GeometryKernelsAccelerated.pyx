@@ -0,0 +1,127 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+# Ускоренные вычислительные ядра геометрических расчетов с теми же названиями и аргументами, что и функции модуля
+#   GeometryKernels (описание - там). Собирается заранее командой python BuildGeometryKernels.py build_ext --inplace и
+#   подключается модулем GeometryKernels автоматически. Циклы по элементам массивов выполняются без промежуточных
+#   массивов.
+import numpy
+from libc.math cimport sqrt, sin, cos, atan2, fmod, M_PI, NAN
+
+
+def to_rotate_vector(double x, double y, double z, double axis_x, double axis_y, double axis_z,
+                     double angle_of_rotation):
+    cdef double length = sqrt(axis_x * axis_x + axis_y * axis_y + axis_z * axis_z)
+    axis_x = axis_x / length
+    axis_y = axis_y / length
+    axis_z = axis_z / length
+    cdef double sin_of_angle = sin(angle_of_rotation)
+    cdef double cos_of_angle = cos(angle_of_rotation)
+    cdef double rotated_x = (cos_of_angle + (1 - cos_of_angle) * axis_x * axis_x) * x + \
+        ((1 - cos_of_angle) * axis_x * axis_y - sin_of_angle * axis_z) * y + \
+        ((1 - cos_of_angle) * axis_x * axis_z + sin_of_angle * axis_y) * z
+    cdef double rotated_y = ((1 - cos_of_angle) * axis_x * axis_y + sin_of_angle * axis_z) * x + \
+        (cos_of_angle + (1 - cos_of_angle) * axis_y * axis_y) * y + \
+        ((1 - cos_of_angle) * axis_y * axis_z - sin_of_angle * axis_x) * z
+    cdef double rotated_z = ((1 - cos_of_angle) * axis_x * axis_z - sin_of_angle * axis_y) * x + \
+        ((1 - cos_of_angle) * axis_y * axis_z + sin_of_angle * axis_x) * y + \
+        (cos_of_angle + (1 - cos_of_angle) * axis_z * axis_z) * z
+    return rotated_x, rotated_y, rotated_z
+
+
+def to_rotate_vectors(const double[:, :] vectors, const double[:, :] axes_of_rotation,
+                      const double[:] angles_of_rotation, out):
+    cdef double[:, :] result = out
+    cdef Py_ssize_t i
+    cdef double length, axis_x, axis_y, axis_z, sin_of_angle, cos_of_angle, one_minus_cos_of_angle, x, y, z
+    for i in range(vectors.shape[0]):
+        length = sqrt(axes_of_rotation[i, 0] * axes_of_rotation[i, 0] +
+                      axes_of_rotation[i, 1] * axes_of_rotation[i, 1] +
+                      axes_of_rotation[i, 2] * axes_of_rotation[i, 2])
+        axis_x = axes_of_rotation[i, 0] / length
+        axis_y = axes_of_rotation[i, 1] / length
+        axis_z = axes_of_rotation[i, 2] / length
+        sin_of_angle = sin(angles_of_rotation[i])
+        cos_of_angle = cos(angles_of_rotation[i])
+        one_minus_cos_of_angle = 1 - cos_of_angle
+        x = vectors[i, 0]
+        y = vectors[i, 1]
+        z = vectors[i, 2]
+        result[i, 0] = (cos_of_angle + one_minus_cos_of_angle * axis_x * axis_x) * x + \
+            (one_minus_cos_of_angle * axis_x * axis_y - sin_of_angle * axis_z) * y + \
+            (one_minus_cos_of_angle * axis_x * axis_z + sin_of_angle * axis_y) * z
+        result[i, 1] = (one_minus_cos_of_angle * axis_x * axis_y + sin_of_angle * axis_z) * x + \
+            (cos_of_angle + one_minus_cos_of_angle * axis_y * axis_y) * y + \
+            (one_minus_cos_of_angle * axis_y * axis_z - sin_of_angle * axis_x) * z
+        result[i, 2] = (one_minus_cos_of_angle * axis_x * axis_z - sin_of_angle * axis_y) * x + \
+            (one_minus_cos_of_angle * axis_y * axis_z + sin_of_angle * axis_x) * y + \
+            (cos_of_angle + one_minus_cos_of_angle * axis_z * axis_z) * z
+    return out
+
+
+def to_intersect_lines_and_canonical_ellipsoid(const double[:, :] points_on_lines, const double[:, :] directing_vectors,
+                                               double axis_a, double axis_b, double axis_c, out):
+    cdef double[:, :] result = out
+    cdef Py_ssize_t i, j
+    cdef double a_coef, b_coef, c_coef, discriminant, square_root_of_discriminant, coef, coef_1, coef_2
+    cdef double dist_1, dist_2, delta
+    for i in range(points_on_lines.shape[0]):
+        a_coef = (directing_vectors[i, 0] / axis_a) ** 2 + (directing_vectors[i, 1] / axis_b) ** 2 + \
+            (directing_vectors[i, 2] / axis_c) ** 2
+        b_coef = 2 * (points_on_lines[i, 0] * directing_vectors[i, 0] / (axis_a * axis_a) +
+                      points_on_lines[i, 1] * directing_vectors[i, 1] / (axis_b * axis_b) +
+                      points_on_lines[i, 2] * directing_vectors[i, 2] / (axis_c * axis_c))
+        c_coef = (points_on_lines[i, 0] / axis_a) ** 2 + (points_on_lines[i, 1] / axis_b) ** 2 + \
+            (points_on_lines[i, 2] / axis_c) ** 2 - 1
+        discriminant = b_coef ** 2 - 4 * a_coef * c_coef
+        if discriminant < 0:
+            for j in range(3):
+                result[i, j] = NAN
+            continue
+        square_root_of_discriminant = sqrt(discriminant)
+        coef_1 = (-b_coef + square_root_of_discriminant) / (2 * a_coef)
+        coef_2 = (-b_coef - square_root_of_discriminant) / (2 * a_coef)
+        # Расстояния от точки отсчета до точек пересечения
+        dist_1 = 0
+        dist_2 = 0
+        for j in range(3):
+            delta = points_on_lines[i, j] - (points_on_lines[i, j] + coef_1 * directing_vectors[i, j])
+            dist_1 += delta * delta
+            delta = points_on_lines[i, j] - (points_on_lines[i, j] + coef_2 * directing_vectors[i, j])
+            dist_2 += delta * delta
+        coef = coef_1 if sqrt(dist_2) >= sqrt(dist_1) else coef_2
+        for j in range(3):
+            result[i, j] = points_on_lines[i, j] + coef * directing_vectors[i, j]
+    return out
+
+
+def to_geo_coordinates(const double[:] x, const double[:] y, const double[:] z, const double[:] earth_turn,
+                       double semi_major_axis, double f, int count_of_iterations):
+    cdef Py_ssize_t count = x.shape[0]
+    long_array = numpy.empty(count)
+    lat_array = numpy.empty(count)
+    alt_array = numpy.empty(count)
+    cdef double[:] long_result = long_array
+    cdef double[:] lat_result = lat_array
+    cdef double[:] alt_result = alt_array
+    cdef double e2 = f * (2 - f)
+    cdef double long, r, lat, sin_lat_in_last_iter, c = 0
+    cdef Py_ssize_t i
+    cdef int k
+    for i in range(count):
+        # Долгота в диапазоне (-pi, pi] (остаток от деления берется так же, как в Python - с неотрицательным знаком)
+        long = fmod(atan2(y[i], x[i]) - earth_turn[i], 2 * M_PI)
+        if long < 0:
+            long += 2 * M_PI
+        if long > M_PI:
+            long -= M_PI * 2
+        if long <= -M_PI:
+            long += M_PI * 2
+        r = sqrt(x[i] ** 2 + y[i] ** 2)
+        lat = atan2(z[i], r)
+        for k in range(count_of_iterations):
+            sin_lat_in_last_iter = sin(lat)
+            c = 1 / (sqrt(1 - e2 * (sin_lat_in_last_iter ** 2)))
+            lat = atan2(z[i] / semi_major_axis + c * e2 * sin_lat_in_last_iter, r / semi_major_axis)
+        long_result[i] = long * 180 / M_PI
+        lat_result[i] = lat * 180 / M_PI
+        alt_result[i] = r / cos(lat) - c * semi_major_axis
+    return long_array, lat_array, alt_array
@@ -21,6 +21,10 @@ if __name__ == '__main__':
     # Создание объекта - спутниковой группировки, с помощью которой будет выполняться задача. Спутники satellite_group
     #   вращаются вокруг эллипсоида Земли earth_ellipsoid
     satellite_group = SatellitesGroup(earth_ellipsoid)
+    #   Директория, в которой сохраняются блоки эфемерид, чтобы повторное моделирование не вычисляло их заново (None -
+    #       блоки не сохраняются)
+    ephemeris_cache_directory = 'D:\\results\\Ephemeris cache'
+    satellite_group.to_set_ephemeris_cache(ephemeris_cache_directory)
     # Добавление спутника №1 (ISS) в группу
     satellite_group.to_add_satellite(ISS_name, ISS_tle, ISS_angle_of_view)
     print("".join(["\nСпутники в группе:\n", str(satellite_group)]))
@@ -61,6 +65,9 @@ if __name__ == '__main__':
     # Создание объекта - группы полигонов, которые должны быть просканированы для того, чтобы задача считалась
     #   выполненной. Полигоны расположены на поверхности эллипсоида Земли earth_ellipsoid
     polygons_group = PolygonsGroup(earth_ellipsoid)
+    #   Директория, в которой сохраняется разбиение полигонов на сегменты (None - разбиение не сохраняется)
+    segmentation_cache_directory = None
+    polygons_group.to_set_segmentation_cache(segmentation_cache_directory)
     #   Загрузка полигонов из файла
     polygons_group.to_read_shape_file(
         "D:/Карты/Валуйки/Важные объединенные участки леса валуйского лесничества (shape).shp")
@@ -91,6 +98,9 @@ if __name__ == '__main__':
 
     # Флажок, определяющий, учитывать ли во время моделирования выполнения задачи частичную облачность
     to_consider_partial_cloudiness = False
+    # Начальное значение генератора случайных чисел для балла облачности и частичной облачности (None - моделирование
+    #   не воспроизводится)
+    random_seed = None
 
     # Параметры отчетности
     #   Периоды отчетов
@@ -142,6 +152,8 @@ if __name__ == '__main__':
 
     # Задается, флажок, определяющий, учитывать ли во время моделирования выполнения задачи частичную облачность
     task.to_set_considering_considering_partial_cloudiness(to_consider_partial_cloudiness)
+    # Задается начальное значение генератора случайных чисел
+    task.to_set_random_seed(random_seed)
 
     # Моделирование
     start_time = datetime.now()
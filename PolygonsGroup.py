@@ -1,8 +1,13 @@
+import os
+import hashlib
 from shapefile import Reader
-from random import random
+import bisect
 from numpy import arange, concatenate, zeros
+import shapely
 from shapely import geometry
+from scipy.spatial import cKDTree
 import math
+import numpy
 import Coordinates
 import DateManagement
 # Ускорение работы объектов класса
@@ -27,8 +32,13 @@ class PolygonsGroup:
         polygons_list – список, состоящий из объектов класса Polygon, где каждый элемент обозначает тестовый полигон
             принадлежащий моделируемой группе полигонов. При инициализации - пустой список. Заполняется методом
             self.to_read_shape_file
-        full_segments_list - список, содержащий все сегменты, на которые разделены все полигоны из моделируемой группы.
-            При инициалиации задаётся пустым списком. Заполняется с помощью метода to_split_all_polygons
+        segment_store - объект SegmentStore - массивы данных всех сегментов, на которые разделены все полигоны из
+            моделируемой группы (сегменты каждого полигона - подряд, в порядке self.polygons_list). При инициализации -
+            пустое хранилище. Составляется методом to_split_all_polygons.
+        full_segments_list - список объектов Segment для всех сегментов из self.segment_store. Составляется только при
+            обращении.
+        segments_float_type, segments_count_type - типы numpy массивов координат и площадей и массива количеств
+            захватов сегментов. По умолчанию numpy.float64 и numpy.int32. Задаются методом self.to_set_segments_types.
         full_area – общая площадь всех полигонов, входящих в моделируемую группу. Общая площадь вычисляется
             суммированием площадей всех полигонов, входящих в группу, то есть всех, перечисленных в списке (кв. м)
             self.polygons_list, а площадь каждого полигона – объекта класса Polygon записана в их поле polygons_area.
@@ -45,6 +55,12 @@ class PolygonsGroup:
             присваивается 0. Обновляется методом to_randomize_common_cloudiness объекта класса PolygonGroup.
         common_calculations_of_cloudiness - если True, вычислять облачность над всей группой полигонов вместе, если
             False, то отдельно для каждого полигона в группе (boolean). По умолчанию True.
+        centers_index - объект PolygonsCentersIndex - пространственный индекс центров полигонов группы для поиска
+            полигонов, близких к спутнику. При инициализации - None. Составляется методом self.to_get_centers_index.
+        segmentation_cache - объект SegmentationCache - хранилище результатов разбиения полигонов на сегменты на диске.
+            При инициализации - None (разбиение не сохраняется). Задается методом self.to_set_segmentation_cache.
+        shape_files_addresses - список адресов shape-файлов, из которых прочитаны полигоны группы, по порядку чтения.
+            При инициализации - пустой список. Дополняется методом self.to_read_shape_file.
 
     @Методы:
         to_read_shape_file(self, shape_file_address) – читает из shape-файла информацию о тестовых полигонах, полигоны
@@ -53,8 +69,13 @@ class PolygonsGroup:
         to_split_all_polygons(self, lat_fineness, long_fineness, earth_ellipsoid) – разбивает каждый полигон в группе на
             сегменты с мелкостью разбиения lat_fineness по широте и long_fineness по долготе, вычисляет приблизительную
             общую площадь всех полигонов в моделируемой группе.
+        to_set_segmentation_cache(self, cache_directory) - задает директорию, в которой сохраняются результаты
+            разбиения полигонов на сегменты.
+        to_load_segmentation(self, segmentation) - задает полигонам группы сохраненные результаты разбиения.
+        to_make_segmentation(self) - составляет словарь массивов с результатами разбиения для сохранения.
         to_calc_percentages_of_grabbed_areas(self) – определяет ход выполнения тематической задачи – сколько процентов
             площади тестовых полигонов попало в поле зрения ГСК, сколько раз.
+        to_set_segments_types(self, float_type, count_type) - задает типы массивов данных сегментов.
         to_clear_count_of_grabs(self) - очищает все сегменты всех полигонов от "сканирований". То есть после применения
             считается, что полигоны не сканировались.
         to_add_common_cloudiness_distr(self, common_cloudiness_distr_table, common_cloudiness_distr_ranges) - добавляет
@@ -64,9 +85,10 @@ class PolygonsGroup:
             добавляет распределения вероятности появления облачности некоторого балла для каждого полигона в
             моделируемой группе для годовых периодов, границы которых также записываются.
         to_normalize_distribution(distribution) - нормируетраспределение на единицу distribution.
-        to_calculate_cloudiness_above_group(self, time) - определяет текущий балл облачности для всей моделируемой
-            группы полигонов в соответвии с распределением из self.common_cloudiness_distr_table для времени из
-            аргумента time.
+        to_calculate_cloudiness_above_group(self, time, random_generator) - определяет текущий балл облачности для
+            всей моделируемой группы полигонов в соответвии с распределением из self.common_cloudiness_distr_table для
+            времени из аргумента time с помощью генератора random_generator.
+        to_get_centers_index(self) - возвращает пространственный индекс центров полигонов группы.
     """
     # Ускорение работы объектов класса
     #import pyximport; pyximport.install()
@@ -77,7 +99,9 @@ class PolygonsGroup:
     def __init__(self, earth_ellipsoid):
         self.earth_ellipsoid = earth_ellipsoid
         self.polygons_list = []
-        self.full_segments_list = []
+        self.segments_float_type = numpy.float64
+        self.segments_count_type = numpy.int32
+        self.segment_store = SegmentStore(0, self.segments_float_type, self.segments_count_type)
         self.full_area = 0
         # По умолчанию стопроцентно облачность нулевая
         self.common_cloudiness_distr_table = [[1, 0]]
@@ -85,6 +109,9 @@ class PolygonsGroup:
         self.common_cloudiness_distr_ranges = [1, 365]
         self.common_current_cloudiness_in_score = 0
         self.common_calculations_of_cloudiness = True
+        self.centers_index = None
+        self.segmentation_cache = None
+        self.shape_files_addresses = []
 
     def to_read_shape_file(self, shape_file_address, polygons_names=None):
         """
@@ -109,6 +136,7 @@ class PolygonsGroup:
         # и запись в self.polygons_list в цикле
         for shape in shape_file_list:
             self.polygons_list.append(Polygon(shape, self))
+        self.shape_files_addresses.append(shape_file_address)
         # Задание полигонам стандартных названий: "Полигон 1", "Полигон 2", "Полигон 3" ...
         self.to_set_polygons_names(polygons_names)
 
@@ -142,20 +170,154 @@ class PolygonsGroup:
         @Описание:
             Метод разбивает каждый полигон в группе (из списка polygons_list) на сегменты с мелкостью разбиения
                 lat_fineness по широте и long_fineness по долготе, вычисляет приблизительную общую площадь всех
-                полигонов в моделируемой группе
+                полигонов в моделируемой группе. Если задано хранилище self.segmentation_cache, то разбиение
+                загружается из него, если оно там есть, а если нет, то сохраняется в него после вычисления
         :param lat_fineness: мелкость разбиения сегментов по широте (км)
         :param long_fineness: мелкость разбиения сегментов по долготе (км)
         """
-        self.full_segments_list = []
+        # Если задано хранилище self.segmentation_cache и в нем есть разбиение тех же shape-файлов с той же мелкостью
+        #   на том же эллипсоиде с тем же типом массивов сегментов, то оно загружается вместо повторного разбиения (и
+        #   вычисления центров и радиусов полигонов)
+        if self.segmentation_cache is not None:
+            key = SegmentationCache.to_make_key(self.shape_files_addresses, lat_fineness, long_fineness,
+                                                self.earth_ellipsoid, self.segments_float_type)
+            segmentation = self.segmentation_cache.to_load(key)
+            if segmentation is not None and len(segmentation['polygons_areas']) == len(self.polygons_list):
+                self.to_load_segmentation(segmentation)
+                return
         self.full_area = 0
         # В цикле к каждому полигону применяется метод to_split_polygon(lat_fineness, long_fineness)
         for polygon in self.polygons_list:
             polygon.to_split_polygon(lat_fineness, long_fineness)
-            # Сегменты, на которые разделился полигон из группы включаются в список всех сегментов моделируемой группы
-            #   self.full_segments_list
-            self.full_segments_list += polygon.segments_list
             # Площадь полигона из группы прибавляется к общей площади полигонов из моделируемой группы
             self.full_area += polygon.area
+        # Сегменты, на которые разделились полигоны из группы, переносятся в общее хранилище сегментов моделируемой
+        #   группы self.segment_store, массивы полигонов становятся его частями
+        self.segment_store = SegmentStore(sum([polygon.segment_store.count_of_segments
+                                               for polygon in self.polygons_list]),
+                                          self.segments_float_type, self.segments_count_type)
+        first_index = 0
+        for polygon_id in range(0, len(self.polygons_list)):
+            polygon = self.polygons_list[polygon_id]
+            count_of_segments = polygon.segment_store.count_of_segments
+            self.segment_store.to_copy(first_index, polygon.segment_store, polygon_id)
+            polygon.to_attach_segment_store(self.segment_store, first_index, count_of_segments)
+            first_index += count_of_segments
+        # Сохранение разбиения в хранилище
+        if self.segmentation_cache is not None:
+            self.segmentation_cache.to_save(key, self.to_make_segmentation())
+
+    def to_set_segmentation_cache(self, cache_directory):
+        """
+        @Описание:
+            Метод задает директорию, в которой сохраняются результаты разбиения полигонов на сегменты, чтобы при
+                повторном разбиении тех же полигонов с той же мелкостью они загружались с диска.
+        :param cache_directory: адрес директории хранилища (String). Допустимо None - тогда разбиение не сохраняется.
+        :return: в поле self.segmentation_cache записывается объект SegmentationCache или None
+        """
+        if cache_directory is not None:
+            self.segmentation_cache = SegmentationCache(cache_directory)
+        else:
+            self.segmentation_cache = None
+
+    def to_make_segmentation(self):
+        """
+        @Описание:
+            Метод составляет словарь массивов numpy с результатами разбиения полигонов группы на сегменты: данными
+                сегментов из self.segment_store, площадями, центрами и радиусами полигонов и сетками центров сегментов
+                полигонов (сетки всех полигонов записываются подряд в одномерные массивы).
+        :return: словарь массивов numpy (ключи см. SegmentationCache)
+        """
+        return {'long': self.segment_store.long,
+                'lat': self.segment_store.lat,
+                'areas': self.segment_store.areas,
+                'polygons_ids': self.segment_store.polygons_ids,
+                'polygons_areas': numpy.array([polygon.area for polygon in self.polygons_list], dtype=numpy.float64),
+                'centers_long': numpy.array([polygon.center.geo_coordinates.long for polygon in self.polygons_list],
+                                            dtype=numpy.float64),
+                'centers_lat': numpy.array([polygon.center.geo_coordinates.lat for polygon in self.polygons_list],
+                                           dtype=numpy.float64),
+                'radii': numpy.array([polygon.radius for polygon in self.polygons_list], dtype=numpy.float64),
+                'counts_of_grid_lats': numpy.array([len(polygon.grid_lats) for polygon in self.polygons_list],
+                                                   dtype=numpy.int64),
+                'counts_of_grid_longs': numpy.array([len(polygon.grid_longs) for polygon in self.polygons_list],
+                                                    dtype=numpy.int64),
+                'grid_lats': numpy.array([lat for polygon in self.polygons_list for lat in polygon.grid_lats],
+                                         dtype=numpy.float64),
+                'grid_longs': numpy.array([long for polygon in self.polygons_list for long in polygon.grid_longs],
+                                          dtype=numpy.float64),
+                'segments_grids': numpy.concatenate([polygon.segments_grid.ravel() for polygon in self.polygons_list] +
+                                                    [numpy.zeros(0, dtype=numpy.int32)])}
+
+    def to_load_segmentation(self, segmentation):
+        """
+        @Описание:
+            Метод задает полигонам группы результаты разбиения на сегменты segmentation, составленные ранее методом
+                to_make_segmentation (например, загруженные из SegmentationCache), и вычисляет общую площадь полигонов.
+        :param segmentation: словарь массивов numpy (ключи см. SegmentationCache).
+        :return: заполняются self.segment_store и self.full_area, полигонам задаются центры, радиусы, площади, сетки
+            центров сегментов и части self.segment_store
+        """
+        self.segment_store = SegmentStore(len(segmentation['long']), self.segments_float_type,
+                                          self.segments_count_type)
+        self.segment_store.long[:] = segmentation['long']
+        self.segment_store.lat[:] = segmentation['lat']
+        self.segment_store.areas[:] = segmentation['areas']
+        self.segment_store.polygons_ids[:] = segmentation['polygons_ids']
+        counts_of_segments = numpy.bincount(self.segment_store.polygons_ids,
+                                            minlength=len(self.polygons_list)).tolist()
+        counts_of_grid_lats = segmentation['counts_of_grid_lats'].tolist()
+        counts_of_grid_longs = segmentation['counts_of_grid_longs'].tolist()
+        grid_lats = segmentation['grid_lats'].tolist()
+        grid_longs = segmentation['grid_longs'].tolist()
+        segments_grids = segmentation['segments_grids']
+        self.full_area = 0
+        first_segment_index = 0
+        first_lat_index = 0
+        first_long_index = 0
+        first_grid_index = 0
+        for polygon_id in range(0, len(self.polygons_list)):
+            polygon = self.polygons_list[polygon_id]
+            count_of_lats = counts_of_grid_lats[polygon_id]
+            count_of_longs = counts_of_grid_longs[polygon_id]
+            polygon.to_set_center_and_radius(float(segmentation['centers_long'][polygon_id]),
+                                             float(segmentation['centers_lat'][polygon_id]),
+                                             float(segmentation['radii'][polygon_id]))
+            polygon.to_set_segmentation(float(segmentation['polygons_areas'][polygon_id]),
+                                        grid_lats[first_lat_index:first_lat_index + count_of_lats],
+                                        grid_longs[first_long_index:first_long_index + count_of_longs],
+                                        numpy.array(segments_grids[first_grid_index:
+                                                                   first_grid_index + count_of_lats * count_of_longs],
+                                                    dtype=numpy.int32).reshape(count_of_lats, count_of_longs))
+            polygon.to_attach_segment_store(self.segment_store, first_segment_index, counts_of_segments[polygon_id])
+            # Площадь полигона из группы прибавляется к общей площади полигонов из моделируемой группы
+            self.full_area += polygon.area
+            first_segment_index += counts_of_segments[polygon_id]
+            first_lat_index += count_of_lats
+            first_long_index += count_of_longs
+            first_grid_index += count_of_lats * count_of_longs
+
+    @property
+    def full_segments_list(self):
+        """
+        @Описание:
+            Список всех сегментов группы в виде объектов Segment, составляемых по хранилищу self.segment_store при
+                обращении.
+        :return: список объектов Segment
+        """
+        return self.segment_store.to_make_segments(0, self.segment_store.count_of_segments)
+
+    def to_set_segments_types(self, float_type=numpy.float64, count_type=numpy.int32):
+        """
+        @Описание:
+            Метод задает типы массивов данных сегментов. Например, numpy.float32 вдвое уменьшает память на координаты и
+                площади сегментов, но координаты центров сегментов округляются. Применяется до разбиения полигонов.
+        :param float_type: тип numpy массивов координат и площадей сегментов. По умолчанию numpy.float64.
+        :param count_type: тип numpy массива количеств захватов сегментов. По умолчанию numpy.int32.
+        :return: записывает типы в поля self.segments_float_type, self.segments_count_type
+        """
+        self.segments_float_type = float_type
+        self.segments_count_type = count_type
 
     def to_calc_percentages_of_grabbed_areas(self, result_in_percents=True):
         """
@@ -167,28 +329,23 @@ class PolygonsGroup:
         :return: список, в каждом элементе которого содержится процент площади группы полигонов, захваченных в ПЗ ГСК n
             раз, где n равняется номеру элемента списка плюс один
         """
-        segments_list = self.full_segments_list
+        count_of_grabs = self.segment_store.count_of_grabs
+        areas = self.segment_store.areas
         percentages_of_grabbed_areas_list = []
         i = 1
-        # Цикл продолжает работу пока из списка segments_list не будут исключены все сегменты
-        while len(segments_list) > 0:
-            new_list_of_grabbed_segments = []
-            current_area = 0
-            # В цикле перебираются все сегменты из списка segments_list и проверяется, сколько раз он был просканирован:
-            #   если i раз (i - счетчик), то площадь сегмента прибавляется к площади, просканированной i раз, если
-            #   меньше, то сегмент исключается из списка segments_list
-            for segment in segments_list:
-                if segment.count_of_grabs >= i:
-                    if segment.count_of_grabs > i:
-                        new_list_of_grabbed_segments.append(segment)
-                    current_area += segment.segments_area
+        # Цикл продолжает работу, пока есть сегменты, просканированные не меньше i раз (i - счетчик): их площадь - это
+        #   площадь, просканированная не меньше i раз. Сегменты, просканированные меньше, исключаются
+        are_grabbed = count_of_grabs >= i
+        while numpy.any(are_grabbed):
+            count_of_grabs = count_of_grabs[are_grabbed]
+            areas = areas[are_grabbed]
             # Вычисляется в м^2
-            percentages_of_grabbed_areas_list.append(current_area)
+            percentages_of_grabbed_areas_list.append(float(numpy.sum(areas, dtype=numpy.float64)))
             if result_in_percents:
                 # м^2 переводится в проценты
                 percentages_of_grabbed_areas_list[-1] /= self.full_area / 100
-            segments_list = new_list_of_grabbed_segments
             i += 1
+            are_grabbed = count_of_grabs >= i
         return percentages_of_grabbed_areas_list
 
     def to_clear_count_of_grabs(self):
@@ -198,9 +355,7 @@ class PolygonsGroup:
                 сканировались.
         :return: count_of_grabs каждого сегмента, каждого полигона в группе приравнивается к нулю.
         """
-        for polygon in self.polygons_list:
-            for segment in polygon.segments_list:
-                segment.count_of_grabs = 0
+        self.segment_store.count_of_grabs[:] = 0
 
     def to_add_common_cloudiness_distr(self, common_cloudiness_distr_table, common_cloudiness_distr_ranges):
         """
@@ -258,29 +413,44 @@ class PolygonsGroup:
                 element /= elements_sum
         return distribution
 
-    def to_calculate_cloudiness_above_group(self, time):
+    def to_calculate_cloudiness_above_group(self, time, random_generator):
         """
         @Описание:
             Метод определяет текущий балл облачности для всей моделируемой группы полигонов в соответвии с
             распределением из self.common_cloudiness_distr_table для времени из аргумента time
         :param time: объект datetime - время в формате UTC
+        :param random_generator: генератор случайных чисел numpy.random.Generator, по которому разыгрывается балл
+            облачности
         :return: определяет облачность для всей группы полигонов
         """
         if self.common_calculations_of_cloudiness:
             common_cloudiness = to_randomize_cloudiness(time, self.common_cloudiness_distr_table,
-                                                        self.common_cloudiness_distr_ranges)
+                                                        self.common_cloudiness_distr_ranges, random_generator)
             for polygon in self.polygons_list:
                 polygon.current_cloudiness_in_score = common_cloudiness
         else:
             for polygon in self.polygons_list:
-                polygon.to_randomize_cloudiness_to_polygon(time)
+                polygon.to_randomize_cloudiness_to_polygon(time, random_generator)
 
         self.common_current_cloudiness_in_score = to_randomize_cloudiness(time, self.common_cloudiness_distr_table,
-                                                                          self.common_cloudiness_distr_ranges)
+                                                                          self.common_cloudiness_distr_ranges,
+                                                                          random_generator)
         # Присвоение балла для каждого полигона
         for polygon in self.polygons_list:
             polygon.current_cloudiness_in_score = self.common_current_cloudiness_in_score
 
+    def to_get_centers_index(self):
+        """
+        @Описание:
+            Метод возвращает пространственный индекс центров полигонов группы. Индекс составляется один раз и
+                пересоставляется, только если изменился список полигонов.
+        :return: объект PolygonsCentersIndex
+        """
+        if self.centers_index is None or self.centers_index.polygons_list is not self.polygons_list or \
+                self.centers_index.count_of_polygons != len(self.polygons_list):
+            self.centers_index = PolygonsCentersIndex(self.polygons_list, self.earth_ellipsoid)
+        return self.centers_index
+
     def to_str(self, count_of_numerals_after_point_for_centers=3,
                count_of_numerals_after_point_for_area=3,
                count_of_numerals_after_point_for_area_in_percents=3):
@@ -320,6 +490,151 @@ class PolygonsGroup:
         return "".join(str_satellite_group)
 
 
+class PolygonsCentersIndex:
+    """
+    @Описание:
+        Класс PolygonsCentersIndex - пространственный индекс центров полигонов для поиска полигонов, близких к спутнику
+            (в смысле метода SatellitesGroup.Satellite.to_determine_close_polygons). Расстояния между географическими
+            координатами вычисляются методами EarthEllipsoid на сфере с радиусом, равным большой полуоси эллипсоида
+            Земли, поэтому центры полигонов хранятся в виде единичных векторов на этой сфере
+            (Polygon.center_unit_vector) в KD-дереве: круг на сфере радиуса d (км) - это шар с радиусом-хордой
+            2 * sin(d / (2 * R)). Из дерева выбираются полигоны, центры которых ближе наибольшего возможного радиуса
+            круга "близости", затем критерий близости проверяется точно только для них. Поиск выполняется за
+            логарифмическое от количества полигонов время.
+        Критерий близости - угол между подспутниковой точкой и центром полигона меньше суммы углового радиуса полигона
+            alpha и углового расстояния от подспутниковой точки до края полосы захвата beta (оба с множителем
+            Polygon.CLOSENESS_FACTOR), - проверяется без тригонометрии для каждой пары: скалярное произведение единичных
+            векторов больше cos(alpha + beta) = cos(alpha) * cos(beta) - sin(alpha) * sin(beta), где косинус и синус
+            alpha вычислены заранее для каждого полигона. Для всех спутников и всех полигонов сразу это одно
+            произведение матриц.
+
+    @Аргументы:
+        polygons_list - список полигонов (Polygon).
+        earth_ellipsoid - объект EarthEllipsoid, на котором расположены полигоны.
+
+    @Поля:
+        polygons_list - список полигонов, по которому составлен индекс. Задается аргументом polygons_list.
+        count_of_polygons - количество полигонов в индексе (int).
+        earth_ellipsoid - объект EarthEllipsoid. Задается аргументом earth_ellipsoid.
+        centers_unit_vectors - массив numpy размера (count_of_polygons, 3) центров полигонов в виде единичных векторов.
+        centers_long, centers_lat - массивы numpy долгот и широт центров полигонов (градусы).
+        radiuses - массив numpy радиусов полигонов (км).
+        reach_angles - массив numpy угловых радиусов полигонов с множителем Polygon.CLOSENESS_FACTOR (радианы).
+        cos_of_reach_angles - массив numpy косинусов self.reach_angles.
+        sin_of_reach_angles - массив numpy синусов self.reach_angles.
+        max_reach_angle - наибольший из self.reach_angles (радианы).
+        tree - объект cKDTree из scipy по единичным векторам центров полигонов.
+
+    @Константы:
+        RELATIVE_MARGIN - относительный запас радиуса поиска в дереве, покрывающий погрешности округления.
+        MAX_COUNT_OF_POLYGONS_FOR_MATRIX - наибольшее количество полигонов, при котором близость полигонов проверяется
+            сразу для всех пар спутник-полигон произведением матриц, а не поиском в дереве.
+
+    @Методы:
+        to_calculate_satellites_reach_angles(self, alt, tangents_of_half_angles_of_view) - вычисляет угловые расстояния
+            от подспутниковых точек до края полос захвата.
+        to_find_polygons_indexes_in_cones(self, unit_vectors, angles) - находит номера полигонов, центры которых
+            находятся в заданных угловых расстояниях от заданных точек.
+        to_find_close_polygons_indexes(self, long, lat, alt, tangents_of_half_angles_of_view) - находит номера
+            полигонов, близких к спутникам с заданными координатами, поиском в дереве.
+        to_calculate_close_polygons_matrix(self, long, lat, alt, tangents_of_half_angles_of_view) - определяет
+            близость всех полигонов ко всем спутникам одним произведением матриц.
+    """
+    RELATIVE_MARGIN = 1e-6
+    MAX_COUNT_OF_POLYGONS_FOR_MATRIX = 1000
+
+    def __init__(self, polygons_list, earth_ellipsoid):
+        self.polygons_list = polygons_list
+        self.count_of_polygons = len(polygons_list)
+        self.earth_ellipsoid = earth_ellipsoid
+        self.centers_unit_vectors = numpy.array([polygon.center_unit_vector for polygon in polygons_list],
+                                                dtype=float).reshape(-1, 3)
+        self.centers_long = numpy.array([polygon.center.geo_coordinates.long for polygon in polygons_list], dtype=float)
+        self.centers_lat = numpy.array([polygon.center.geo_coordinates.lat for polygon in polygons_list], dtype=float)
+        self.radiuses = numpy.array([polygon.radius for polygon in polygons_list], dtype=float)
+        self.reach_angles = numpy.array([Polygon.CLOSENESS_FACTOR * polygon.radius for polygon in polygons_list],
+                                        dtype=float) / earth_ellipsoid.semi_major_axis
+        self.cos_of_reach_angles = numpy.array([polygon.cos_of_reach_angle for polygon in polygons_list], dtype=float)
+        self.sin_of_reach_angles = numpy.array([polygon.sin_of_reach_angle for polygon in polygons_list], dtype=float)
+        self.max_reach_angle = float(numpy.max(self.reach_angles)) if self.count_of_polygons > 0 else 0
+        self.tree = cKDTree(self.centers_unit_vectors)
+
+    def to_calculate_satellites_reach_angles(self, alt, tangents_of_half_angles_of_view):
+        """
+        @Описание:
+            Метод вычисляет угловые расстояния от подспутниковых точек до края полос захвата с множителем
+                Polygon.CLOSENESS_FACTOR.
+        :param alt: массив numpy высот спутников (км).
+        :param tangents_of_half_angles_of_view: массив numpy тангенсов половин углов обзора спутников.
+        :return: массив numpy углов (радианы)
+        """
+        return Polygon.CLOSENESS_FACTOR * numpy.asarray(alt) * tangents_of_half_angles_of_view / \
+            self.earth_ellipsoid.semi_major_axis
+
+    def to_find_polygons_indexes_in_cones(self, unit_vectors, angles):
+        """
+        @Описание:
+            Метод находит номера полигонов, центры которых находятся на угловом расстоянии меньше angles (с запасом
+                RELATIVE_MARGIN) от точек, заданных единичными векторами unit_vectors.
+        :param unit_vectors: массив numpy единичных векторов размера (N, 3).
+        :param angles: массив numpy угловых расстояний размера N (радианы).
+        :return: список отсортированных массивов numpy номеров полигонов для каждой точки
+        """
+        angles = numpy.minimum(numpy.asarray(angles, dtype=float) * (1 + self.RELATIVE_MARGIN), math.pi)
+        chords = 2 * numpy.sin(angles / 2) + self.RELATIVE_MARGIN
+        indexes_lists = self.tree.query_ball_point(unit_vectors, chords, return_sorted=True)
+        return [numpy.array(indexes, dtype=int) for indexes in indexes_lists]
+
+    def to_find_close_polygons_indexes(self, long, lat, alt, tangents_of_half_angles_of_view):
+        """
+        @Описание:
+            Метод сразу для нескольких спутников находит номера близких к ним полигонов. Кандидаты выбираются из дерева
+                по наибольшему угловому радиусу полигонов, для них критерий проверяется скалярным произведением.
+        :param long: массив numpy долгот спутников (градусы).
+        :param lat: массив numpy широт спутников (градусы).
+        :param alt: массив numpy высот спутников (км).
+        :param tangents_of_half_angles_of_view: массив numpy тангенсов половин углов обзора спутников.
+        :return: список отсортированных массивов numpy номеров близких полигонов для каждого спутника
+        """
+        unit_vectors = to_calculate_unit_vectors(long, lat)
+        satellites_reach_angles = self.to_calculate_satellites_reach_angles(alt, tangents_of_half_angles_of_view)
+        cos_of_satellites_reach_angles = numpy.cos(satellites_reach_angles)
+        sin_of_satellites_reach_angles = numpy.sin(satellites_reach_angles)
+        candidates_lists = self.to_find_polygons_indexes_in_cones(unit_vectors,
+                                                                  self.max_reach_angle + satellites_reach_angles)
+        close_indexes_lists = []
+        for i in range(0, len(candidates_lists)):
+            candidates = candidates_lists[i]
+            dot_products = self.centers_unit_vectors[candidates] @ unit_vectors[i]
+            thresholds = cos_of_satellites_reach_angles[i] * self.cos_of_reach_angles[candidates] - \
+                sin_of_satellites_reach_angles[i] * self.sin_of_reach_angles[candidates]
+            # Если сумма углов не меньше pi, то полигон близок при любом положении
+            thresholds[self.reach_angles[candidates] + satellites_reach_angles[i] >= math.pi] = -math.inf
+            close_indexes_lists.append(candidates[dot_products > thresholds])
+        return close_indexes_lists
+
+    def to_calculate_close_polygons_matrix(self, long, lat, alt, tangents_of_half_angles_of_view):
+        """
+        @Описание:
+            Метод определяет близость всех полигонов ко всем спутникам: скалярные произведения единичных векторов
+                подспутниковых точек и центров полигонов вычисляются одним произведением матриц и сравниваются с
+                порогами cos(alpha + beta).
+        :param long: массив numpy долгот спутников (градусы).
+        :param lat: массив numpy широт спутников (градусы).
+        :param alt: массив numpy высот спутников (км).
+        :param tangents_of_half_angles_of_view: массив numpy тангенсов половин углов обзора спутников.
+        :return: массив numpy (boolean) размера (количество спутников, количество полигонов), в котором True
+            означает, что полигон близок к спутнику
+        """
+        satellites_reach_angles = self.to_calculate_satellites_reach_angles(alt, tangents_of_half_angles_of_view)
+        dot_products = to_calculate_unit_vectors(long, lat) @ self.centers_unit_vectors.T
+        thresholds = numpy.cos(satellites_reach_angles)[:, numpy.newaxis] * self.cos_of_reach_angles - \
+            numpy.sin(satellites_reach_angles)[:, numpy.newaxis] * self.sin_of_reach_angles
+        # Если сумма углов не меньше pi, то полигон близок при любом положении
+        thresholds[satellites_reach_angles[:, numpy.newaxis] + self.reach_angles >= math.pi] = -math.inf
+        return dot_products > thresholds
+
+
 class Polygon:
     """
     @Описание:
@@ -338,8 +653,21 @@ class Polygon:
             shape-файла. Записанный геометрический объект определяет границы тестового полигона. При инициализации
             объект в поле записывается значение аргумента shape.
         name - название полигона. При инициализации присваивается None. Задается методом to_set_polygons_name.
+        segment_store - объект SegmentStore, в котором хранятся данные сегментов, на которые разбит моделируемый полигон
+            (после разбиения всех полигонов группы - общее хранилище группы). Задается методом to_attach_segment_store.
+        first_segment_index - номер первого сегмента полигона в self.segment_store (сегменты полигона - подряд).
+        count_of_segments - количество сегментов полигона.
+        segments_long, segments_lat, segments_areas, segments_count_of_grabs - части массивов self.segment_store с
+            долготами и широтами центров (градусы), площадями и количествами захватов сегментов полигона. Изменения
+            количеств захватов записываются прямо в хранилище.
         segments_list – список, состоящий из объектов класса Segment, где каждый элемент обозначает один из сегментов на
-            которые разбит моделируемый полигон. Заполняется при применении метода to_split_polygon.
+            которые разбит моделируемый полигон. Составляется по self.segment_store только при обращении.
+        grid_lats, grid_longs - списки широт и долгот (градусы) строк и столбцов сетки центров сегментов по
+            возрастанию (для двоичного поиска). При инициализации - пустые списки. Составляются методом
+            to_split_polygon.
+        segments_grid - двумерный массив numpy (строки - self.grid_lats, столбцы - self.grid_longs) номеров сегментов в
+            self.segments_list, -1 - центр ячейки не принадлежит полигону. При инициализации - пустой массив.
+            Составляется методом to_split_polygon.
         polygons_area – площадь моделируемого полигона с некоторой точностью, равна общей площади всех сегментов, на
             которые разбит тестовый полигон, то есть сумма полей segments_area объектов Segment, входящих в список
             self.segmentsList. При инициализации объекта приравнивается к нулю, значение обновляется при применении
@@ -352,9 +680,16 @@ class Polygon:
         left_border_long – долгота самой западной точки на границе тестового полигона. Вычисляется при инициализации
         right_border_long – долгота самой восточной точки на границе тестового полигона. Вычисляется при инициализации
         center – объект Coordinates.GeoCoordinatesAndPointSet, содержащий координаты точки на поверхности Земли. (высота
-            над поверхностью Земли всегда 0) - центра полигона. Вычисляется при инициализации
+            над поверхностью Земли всегда 0) - центра полигона. При инициализации - None.
         radius – расстояние от центра тестового полигона до самой дальней от него точки на границы
-            полигона. Определяется при инициализации
+            полигона. При инициализации - None.
+            center и radius задаются методом to_set_center_and_radius: при разбиении полигона они вычисляются методом
+            to_calculate_center_and_radius, а при загрузке разбиения из SegmentationCache берутся из хранилища.
+        center_unit_vector - массив numpy - центр полигона в виде единичного вектора на сфере с радиусом, равным большой
+            полуоси эллипсоида Земли (на этой сфере EarthEllipsoid вычисляет расстояния). Вычисляется вместе с center.
+        cos_of_reach_angle, sin_of_reach_angle - косинус и синус углового радиуса полигона, умноженного на
+            CLOSENESS_FACTOR, - части порога в проверке близости полигона к спутнику скалярным произведением.
+            Вычисляются вместе с radius.
         cloudiness_distr_table - таблица (двумерный список), содержащая распределения вероятности появления облачности
             некоторого балла (балл соответствует номеру элемента одномерного списка, содержащего распределение, включая
             ноль, вероятность для этого балла записана в значение этого элемента, полная вероятность нормирована на
@@ -370,43 +705,59 @@ class Polygon:
             Обновляется методом to_randomize_cloudiness_to_each_polygon объекта класса PolygonGroup.
 
 
+    @Константы:
+        CLOSENESS_FACTOR - множитель запаса в критерии близости полигона к спутнику.
+
     @Методы
         to_set_polygons_name(self, polygons_name) - задает название полигона.
+        to_calculate_center_and_radius(self) - вычисляет центр и радиус полигона по его границе.
+        to_set_center_and_radius(self, center_long, center_lat, radius) - задает центр и радиус полигона.
+        to_set_segmentation(self, area, grid_lats, grid_longs, segments_grid) - задает сохраненные ранее результаты
+            разбиения полигона на сегменты.
         to_split_polygon(self, lat_fineness, long_fineness) - разделяет моделируемый полигон на сегменты с мелкостью
             разбиения по широте lat_fineness и по долготе long_fineness
+        to_attach_segment_store(self, segment_store, first_segment_index, count_of_segments) - задает хранилище, в
+            котором находятся данные сегментов полигона.
+        to_grab_segments(self, segments_indexes, random_generator, scanned_area) - отмечает сегменты полигона,
+            попавшие в полосу захвата, как просканированные.
+        to_find_segments_indexes_in_ring(self, ring_long, ring_lat) - находит сегменты, центры которых лежат внутри
+            многоугольника, растеризацией многоугольника на сетку центров сегментов.
         to_calculate_segments_area(self, lat_of_grids_nodes, longFineness) - метод вычисляет площади сегментов,
             на которые делится полигон в зависимости от широты их верхних и нижних границ lat_of_grids_nodes и мелкости
             разбиения по долготе long_fineness
         to_calculate_space_from_equator_to_lat(self, lat) - вычисляет площадь поверхности эллипсоида Земли
             self.own_group.earth_ellipsoid от экватора до заданной аргументом lat широты
-        segment_is_hidden(self) – случайным образом определяет закрыт ли некоторый сегмент моделируемого полигона
-            облаком или тенью от облака. Вероятность зависит от текущего балла облачности над полигоном
-            self.current_cloudiness_in_score
-        to_randomize_cloudiness_to_polygon(self, time) - добавляет распределения вероятности появления облачности
-            некоторого балла моделируемого полигона для годовых периодов, границы которых также
+        to_determine_hidden_segments(self, count_of_segments, random_generator) – случайным образом определяет
+            закрыты ли count_of_segments сегментов моделируемого полигона облаком или тенью от облака. Вероятность
+            зависит от текущего балла облачности над полигоном self.current_cloudiness_in_score
+        to_randomize_cloudiness_to_polygon(self, time, random_generator) - добавляет распределения вероятности
+            появления облачности некоторого балла моделируемого полигона для годовых периодов, границы которых также
             записываются
     """
     # Ускорение работы объектов класса
     #import pyximport; pyximport.install()
 
+    # Множитель запаса в критерии близости полигона к спутнику (расстояние от подспутниковой точки до центра полигона
+    #   меньше CLOSENESS_FACTOR * (радиус полигона + расстояние от подспутниковой точки до края полосы захвата))
+    CLOSENESS_FACTOR = 1.1
+
     def __init__(self, shape, polygon_group):
         self.shape = shape
         self.name = None
-        self.segments_list = []
+        self.to_attach_segment_store(SegmentStore(0, polygon_group.segments_float_type,
+                                                  polygon_group.segments_count_type), 0, 0)
+        self.grid_lats = []
+        self.grid_longs = []
+        self.segments_grid = numpy.zeros((0, 0), dtype=numpy.int32)
         self.area = 0
         self.own_group = polygon_group
         [self.left_long_border, self.bot_lat_border, self.right_long_border, self.top_lat_border] = shape.bbox
-        self.center = Coordinates.GeoCoordinatesAndPointSet((self.left_long_border + self.right_long_border) / 2,
-                                                            (self.top_lat_border + self.bot_lat_border) / 2, 0)
-        border_points = shape.points
-        max_distance = 0
-        for point in border_points:
-            geo_coordinates_of_point = Coordinates.GeoCoordinates(point[0], point[1], 0)
-            distance_to_point = self.own_group.earth_ellipsoid.dist_between_geo_coordinates(self.center.geo_coordinates,
-                                                                                            geo_coordinates_of_point)
-            if distance_to_point > max_distance:
-                max_distance = distance_to_point
-        self.radius = max_distance
+        # Центр и радиус вычисляются при разбиении полигона или загружаются вместе с разбиением из хранилища
+        self.center = None
+        self.radius = None
+        self.center_unit_vector = None
+        self.cos_of_reach_angle = None
+        self.sin_of_reach_angle = None
         self.cloudiness_distr_table = [[1, 0]]
         self.cloudiness_distr_ranges = [1, 365]
         self.current_cloudiness_in_score = 0
@@ -419,6 +770,61 @@ class Polygon:
         """
         self.name = polygons_name
 
+    def to_calculate_center_and_radius(self):
+        """
+        @Описание:
+            Метод вычисляет центр полигона (центр описанного прямоугольника) и радиус - расстояние от центра до самой
+                дальней от него точки на границе полигона.
+        :return: центр и радиус задаются методом self.to_set_center_and_radius
+        """
+        center = Coordinates.GeoCoordinates((self.left_long_border + self.right_long_border) / 2,
+                                            (self.top_lat_border + self.bot_lat_border) / 2, 0)
+        border_points = self.shape.points
+        max_distance = 0
+        for point in border_points:
+            geo_coordinates_of_point = Coordinates.GeoCoordinates(point[0], point[1], 0)
+            distance_to_point = self.own_group.earth_ellipsoid.dist_between_geo_coordinates(center,
+                                                                                            geo_coordinates_of_point)
+            if distance_to_point > max_distance:
+                max_distance = distance_to_point
+        self.to_set_center_and_radius(center.long, center.lat, max_distance)
+
+    def to_set_center_and_radius(self, center_long, center_lat, radius):
+        """
+        @Описание:
+            Метод задает центр и радиус полигона и вычисляет по ним величины для проверки близости полигона к спутнику.
+        :param center_long: долгота центра полигона (градусы).
+        :param center_lat: широта центра полигона (градусы).
+        :param radius: расстояние от центра полигона до самой дальней от него точки на границе полигона.
+        :return: записывает поля self.center, self.radius, self.center_unit_vector, self.cos_of_reach_angle,
+            self.sin_of_reach_angle
+        """
+        self.center = Coordinates.GeoCoordinatesAndPointSet(center_long, center_lat, 0)
+        self.radius = radius
+        # Центр в виде единичного вектора и косинус и синус углового радиуса круга "близости" (с множителем
+        #   CLOSENESS_FACTOR) на сфере, используемой EarthEllipsoid для вычисления расстояний
+        self.center_unit_vector = to_calculate_unit_vectors(center_long, center_lat)[0]
+        reach_angle = min(self.CLOSENESS_FACTOR * self.radius / self.own_group.earth_ellipsoid.semi_major_axis, math.pi)
+        self.cos_of_reach_angle = math.cos(reach_angle)
+        self.sin_of_reach_angle = math.sin(reach_angle)
+
+    def to_set_segmentation(self, area, grid_lats, grid_longs, segments_grid):
+        """
+        @Описание:
+            Метод задает результаты разбиения полигона на сегменты, сохраненные ранее (например, загруженные из
+                SegmentationCache), без повторного разбиения. Данные самих сегментов задаются методом
+                to_attach_segment_store.
+        :param area: площадь полигона (кв. м).
+        :param grid_lats: список широт строк сетки центров сегментов по возрастанию (градусы).
+        :param grid_longs: список долгот столбцов сетки центров сегментов по возрастанию (градусы).
+        :param segments_grid: двумерный массив numpy номеров сегментов в ячейках сетки (-1 - вне полигона).
+        :return: записывает поля self.area, self.grid_lats, self.grid_longs, self.segments_grid
+        """
+        self.area = area
+        self.grid_lats = grid_lats
+        self.grid_longs = grid_longs
+        self.segments_grid = segments_grid
+
     def to_split_polygon(self, lat_fineness, long_fineness):
         """
         @Описание:
@@ -427,6 +833,8 @@ class Polygon:
         :param lat_fineness: мелкость разбиения сегментов по широте (км)
         :param long_fineness: мелкость разбиения сегментов по долготе (км)
         """
+        if self.center is None:
+            self.to_calculate_center_and_radius()
         self.area = 0
         # Координаты центрального сегмента будут совпадать с центром полигона
         coordinates_of_central_segment = Coordinates.GeoCoordinates(self.center.geo_coordinates.long,
@@ -445,21 +853,128 @@ class Polygon:
                                     lat_fineness)
         # Вычисление площадей сегментов в зависимости от их широты
         area_of_segments_of_lat = self.to_calculate_segments_area(lat_of_grids_nodes, long_fineness)
-        # Представление моделируемого объекта в виде прямоугольника на плоскости
+        # Представление моделируемого объекта в виде многоугольника на плоскости, подготовленного для многократных
+        #   проверок принадлежности точек
         polygon = geometry.Polygon(self.shape.points)
-        # В двойном цикле производится проверка того, принадлежат ли сегменты, координаты которых записаны в
-        #   lat_of_segments и long_of_segments моделируемому полигону
-        for i in range(0, len(lat_of_segments)):
-            for segment_long in long_of_segments:
-                # Проверка того, находится ли центр сегмента внутри многоугольника
-                point = geometry.Point(segment_long, lat_of_segments[i])
-                if polygon.contains(point):
-                    # Если центр сегмента находится внутри многоугольника, то он добавляется в список сегментов, на
-                    #   которые разделён моделируемый полигон self.segments_list
-                    self.segments_list.append(Segment(segment_long, lat_of_segments[i], area_of_segments_of_lat[i]))
-                    # Также площадь сегмента (определяемая из списка area_of_segments_of_lat) прибавляется к общей
-                    #   площади полигона self.area
-                    self.area += area_of_segments_of_lat[i]
+        shapely.prepare(polygon)
+        # Сетка центров сегментов с широтами и долготами по возрастанию: в ячейке - номер сегмента в
+        #   self.segments_list или -1, если центр ячейки не принадлежит полигону
+        lat_ranks = numpy.empty(len(lat_of_segments), dtype=int)
+        lat_ranks[numpy.argsort(lat_of_segments)] = numpy.arange(len(lat_of_segments))
+        long_ranks = numpy.empty(len(long_of_segments), dtype=int)
+        long_ranks[numpy.argsort(long_of_segments)] = numpy.arange(len(long_of_segments))
+        self.grid_lats = numpy.sort(lat_of_segments).tolist()
+        self.grid_longs = numpy.sort(long_of_segments).tolist()
+        self.segments_grid = numpy.full((len(lat_of_segments), len(long_of_segments)), -1, dtype=numpy.int32)
+        # Проверка того, принадлежат ли моделируемому полигону центры сегментов, координаты которых записаны в
+        #   lat_of_segments и long_of_segments, производится сразу для всех узлов сетки. Номера найденных сегментов
+        #   идут по широтам из lat_of_segments, а внутри широты - по долготам из long_of_segments
+        long_of_nodes, lat_of_nodes = numpy.meshgrid(long_of_segments, lat_of_segments)
+        lat_indexes, long_indexes = numpy.nonzero(shapely.contains_xy(polygon, long_of_nodes, lat_of_nodes))
+        count_of_segments = len(lat_indexes)
+        self.segments_grid[lat_ranks[lat_indexes], long_ranks[long_indexes]] = numpy.arange(count_of_segments)
+        segments_areas = area_of_segments_of_lat[lat_indexes]
+        # Площади сегментов прибавляются к общей площади полигона self.area по порядку сегментов
+        for segments_area in segments_areas.tolist():
+            self.area += segments_area
+        # Сегменты записываются в собственное хранилище полигона
+        segment_store = SegmentStore(count_of_segments, self.own_group.segments_float_type,
+                                     self.own_group.segments_count_type)
+        segment_store.long[:] = long_of_segments[long_indexes]
+        segment_store.lat[:] = lat_of_segments[lat_indexes]
+        segment_store.areas[:] = segments_areas
+        self.to_attach_segment_store(segment_store, 0, count_of_segments)
+
+    def to_attach_segment_store(self, segment_store, first_segment_index, count_of_segments):
+        """
+        @Описание:
+            Метод задает хранилище segment_store, в котором данные сегментов полигона занимают count_of_segments
+                элементов подряд, начиная с first_segment_index, и составляет части его массивов для полигона.
+        :param segment_store: объект SegmentStore.
+        :param first_segment_index: номер первого сегмента полигона в хранилище (int).
+        :param count_of_segments: количество сегментов полигона (int).
+        :return: записывает хранилище и части его массивов в поля полигона
+        """
+        self.segment_store = segment_store
+        self.first_segment_index = first_segment_index
+        self.count_of_segments = count_of_segments
+        segments_slice = slice(first_segment_index, first_segment_index + count_of_segments)
+        self.segments_long = segment_store.long[segments_slice]
+        self.segments_lat = segment_store.lat[segments_slice]
+        self.segments_areas = segment_store.areas[segments_slice]
+        self.segments_count_of_grabs = segment_store.count_of_grabs[segments_slice]
+
+    @property
+    def segments_list(self):
+        """
+        @Описание:
+            Список сегментов полигона в виде объектов Segment, составляемых по хранилищу self.segment_store при
+                обращении.
+        :return: список объектов Segment
+        """
+        return self.segment_store.to_make_segments(self.first_segment_index,
+                                                   self.first_segment_index + self.count_of_segments)
+
+    def to_grab_segments(self, segments_indexes, random_generator=None, scanned_area=0):
+        """
+        @Описание:
+            Метод отмечает сегменты полигона с номерами segments_indexes, попавшие в полосу захвата, как
+                просканированные еще один раз. Если задан генератор случайных чисел random_generator (учитывается
+                частичная облачность), то методом self.to_determine_hidden_segments для всех сегментов сразу случайно
+                определяется, не закрыты ли они облаками. Количества захватов увеличиваются сразу для всех
+                просканированных сегментов.
+        :param segments_indexes: массив numpy номеров сегментов полигона (без повторов) по возрастанию.
+        :param random_generator: генератор случайных чисел numpy.random.Generator, по которому определяется частичная
+            облачность. Если None, то частичная облачность не учитывается. По умолчанию None.
+        :param scanned_area: площадь (кв. м), к которой прибавляются площади просканированных сегментов. По умолчанию 0.
+        :return: scanned_area с прибавленной площадью просканированных сегментов (кв. м)
+        """
+        if random_generator is not None:
+            segments_indexes = segments_indexes[~self.to_determine_hidden_segments(len(segments_indexes),
+                                                                                  random_generator)]
+        self.segments_count_of_grabs[segments_indexes] += 1
+        # Площади прибавляются по порядку, как при обходе сегментов по одному
+        for segments_area in self.segments_areas[segments_indexes].tolist():
+            scanned_area += segments_area
+        return scanned_area
+
+    def to_find_segments_indexes_in_ring(self, ring_long, ring_lat):
+        """
+        @Описание:
+            Метод находит сегменты, центры которых лежат внутри многоугольника с вершинами ring_long, ring_lat
+                (например, четырехугольника полосы захвата), растеризацией многоугольника на сетку центров сегментов:
+                для каждой строки сетки (широты), попадающей в многоугольник, вычисляются точки пересечения с ребрами, и
+                между парами точек пересечения (правило четности) двоичным поиском выбираются столбцы сетки (долготы),
+                лежащие внутри. Время работы пропорционально количеству строк и покрытых ячеек сетки, а не количеству
+                сегментов полигона.
+        :param ring_long: список долгот вершин многоугольника (градусы) без повторения первой вершины.
+        :param ring_lat: список широт вершин многоугольника (градусы) без повторения первой вершины.
+        :return: отсортированный массив numpy номеров сегментов в self.segments_list
+        """
+        parts = []
+        if self.count_of_segments > 0:
+            count_of_vertices = len(ring_long)
+            # Ребра многоугольника (начало - i-ая вершина, конец - следующая)
+            edges = [(ring_long[i], ring_lat[i], ring_long[i + 1 - count_of_vertices],
+                      ring_lat[i + 1 - count_of_vertices]) for i in range(0, count_of_vertices)]
+            # Обход строк сетки между наименьшей и наибольшей широтой вершин
+            for row in range(bisect.bisect_left(self.grid_lats, min(ring_lat)),
+                             bisect.bisect_right(self.grid_lats, max(ring_lat))):
+                lat = self.grid_lats[row]
+                # Ребро пересекает строку, если широта строки лежит в полуинтервале между широтами его концов
+                crossings = sorted([begin_long + (lat - begin_lat) * (end_long - begin_long) / (end_lat - begin_lat)
+                                    for begin_long, begin_lat, end_long, end_lat in edges
+                                    if (begin_lat <= lat) != (end_lat <= lat)])
+                # Отрезки внутри многоугольника - между 0-ой и 1-ой, 2-ой и 3-ей ... точками пересечения
+                for k in range(0, len(crossings) - 1, 2):
+                    first_column = bisect.bisect_right(self.grid_longs, crossings[k])
+                    last_column = bisect.bisect_left(self.grid_longs, crossings[k + 1])
+                    if first_column < last_column:
+                        parts.append(self.segments_grid[row, first_column:last_column])
+        if len(parts) == 0:
+            return numpy.zeros(0, dtype=int)
+        segments_indexes = numpy.concatenate(parts)
+        return numpy.sort(segments_indexes[segments_indexes >= 0])
 
     def to_calculate_segments_area(self, lat_of_grids_nodes, long_fineness):
         """
@@ -468,69 +983,61 @@ class Polygon:
                 границ lat_of_grids_nodes и мелкости разбиения по долготе long_fineness
         :param lat_of_grids_nodes: список границ сегментов полигона по широте (градусы)
         :param long_fineness: мелкость разбиения моделируемого полигона на сегменты по долготе (градусы)
-        :return: список длиной в (len(lat_of_grids_nodes) - 1), содержащий площади сегментов (кв. км), на которые
+        :return: массив numpy длиной в (len(lat_of_grids_nodes) - 1), содержащий площади сегментов (кв. км), на которые
             делится моделируемый полигон. В элементе с номером i содержит площадь сегмента, расположенного между
             широтами lat_of_grids_nodes[i] и lat_of_grids_nodes[i + 1]
         """
-        # Создание пустого массива, в который будут записываться результаты
-        area_of_segments_of_lat = []
-        # Вычисление площадь эллипсоида self.own_group.earth_ellipsoid от экватора до нижней границы самого южного
-        #   сегмента
-        area_from_equator_to_segments_bot_border = self.to_calculate_space_from_equator_to_lat(lat_of_grids_nodes[0])
-        # В цикле вычислеяются площади сегментов от широты и добавляется в area_of_segments_of_lat
-        for lat_of_node in lat_of_grids_nodes[1:]:
-            # Вычисление площадь эллипсоида self.own_group.earth_ellipsoid от экватора до верхней границы некоторого
-            #   сегмента
-            area_from_equator_to_segments_top_border = self.to_calculate_space_from_equator_to_lat(lat_of_node)
-            # Вычисляется площадь некоторого сегмента и добавляется в список результатов
-            area_of_segments_of_lat.append((area_from_equator_to_segments_top_border -
-                                            area_from_equator_to_segments_bot_border) * long_fineness / 360)
-            area_from_equator_to_segments_bot_border = area_from_equator_to_segments_top_border
-        return area_of_segments_of_lat
+        # Вычисление площадей эллипсоида self.own_group.earth_ellipsoid от экватора до всех границ сегментов сразу
+        area_from_equator_to_nodes = self.to_calculate_space_from_equator_to_lat(numpy.asarray(lat_of_grids_nodes))
+        # Площадь сегмента - разность площадей до его верхней и нижней границ
+        return (area_from_equator_to_nodes[1:] - area_from_equator_to_nodes[:-1]) * long_fineness / 360
 
     def to_calculate_space_from_equator_to_lat(self, lat):
         """
         @Описание:
             Метод вычисляет площадь поверхности эллипсоида Земле self.own_group.earth_ellipsoid от экватора до заданной
                 аргументом lat широты. Вычисление происходит методом интегрирования части эллипсоида по поверхности
-        :param lat: широта, до которой вычесляется площадь (градусы)
+        :param lat: широта, до которой вычесляется площадь (градусы), или массив numpy широт
         :return: площадь поверхности на эллипсоиде Земли self.own_group.earth_ellipsoid от экватора эллипсоида до
-            заданной широты lat (кв. км)
+            заданной широты lat (кв. км) или массив numpy площадей для каждой широты из lat
         """
         semi_major_axis = self.own_group.earth_ellipsoid.semi_major_axis
         semi_minor_axis = self.own_group.earth_ellipsoid.semi_minor_axis
-        y = semi_minor_axis * math.sin(lat * math.pi / 180)
+        y = semi_minor_axis * numpy.sin(lat * math.pi / 180)
         a = semi_major_axis * semi_major_axis - semi_minor_axis * semi_minor_axis
         b = a ** 0.5
         c = semi_minor_axis ** 4
         d = (c + y * y * a) ** 0.5
-        return 2 * math.pi / semi_minor_axis * d * ((c * math.log(b * d + y * a)) / (b * d) + y)
+        return 2 * math.pi / semi_minor_axis * d * ((c * numpy.log(b * d + y * a)) / (b * d) + y)
 
-    def segment_is_hidden(self):
+    def to_determine_hidden_segments(self, count_of_segments, random_generator):
         """
         @Описание:
-            Метод случайным образом определяет закрыт ли некоторый сегмент моделируемого полигона облаком или тенью от
-                облака. Вероятность зависит от текущего балла облачности над полигоном self.current_cloudiness_in_score
-        :return: возвращается логическая величина. Если возвращается False – это означает, что данный сегмент не скрыт
-            облаками или тенью от облаков, если True - скрыт. Вероятность возврата “правды” или “лжи” зависит от
-            значения self.current_cloudiness_in_score
+            Метод случайным образом определяет для count_of_segments сегментов моделируемого полигона, закрыты ли они
+                облаком или тенью от облака. Случайные числа для всех сегментов берутся из random_generator за один
+                вызов. Вероятность зависит от текущего балла облачности над полигоном self.current_cloudiness_in_score
+        :param count_of_segments: количество сегментов (int).
+        :param random_generator: генератор случайных чисел numpy.random.Generator.
+        :return: логический массив numpy длины count_of_segments. True - сегмент скрыт облаками или тенью от облаков,
+            False - не скрыт
         """
         # Вычисление доли неба, закрытого облаками по баллу облачности
         current_cloudiness_in_proportion = self.current_cloudiness_in_score / (len(self.cloudiness_distr_table[0]) - 1)
-        # Определяется случайне число от 0 до 1
-        rand = random()
-        # rand сравнивается с вероятности скрытия некоторого сегмента облаками или тенью от облаков
-        return rand >= current_cloudiness_in_proportion * (2 - current_cloudiness_in_proportion)
+        # Сегмент скрыт, если случайное число от 0 до 1 меньше вероятности скрытия облаками или тенью от облаков
+        return random_generator.random(count_of_segments) < \
+            current_cloudiness_in_proportion * (2 - current_cloudiness_in_proportion)
 
-    def to_randomize_cloudiness_to_polygon(self, time):
+    def to_randomize_cloudiness_to_polygon(self, time, random_generator):
         """
         @Описание:
             Метод случайно определяет текущий балл облачности моделируемого полигона в соответвии с распределением для
                 полигона, для времени из аргумента time
         :param time: объект datetime - время в формате UTC
+        :param random_generator: генератор случайных чисел numpy.random.Generator, по которому разыгрывается балл
+            облачности
         """
         self.current_cloudiness_in_score = to_randomize_cloudiness(time, self.cloudiness_distr_table,
-                                                                   self.cloudiness_distr_ranges)
+                                                                   self.cloudiness_distr_ranges, random_generator)
 
     def to_str(self, count_of_numerals_after_point_for_centers=3, count_of_numerals_after_point_for_area=3):
         """
@@ -547,24 +1054,187 @@ class Polygon:
                         ',\tплощадь:\t', str(round(self.area, count_of_numerals_after_point_for_area)), ' м^2'])
 
 
+class SegmentStore:
+    """
+    @Описание:
+        Класс SegmentStore хранит данные сегментов, на которые разделены полигоны, в непрерывных массивах numpy:
+            долготы и широты центров, площади, номера полигонов и количества захватов. Сканирование и подсчет статистики
+            выполняются над частями массивов, а объекты Segment составляются только при обращении к ним.
+
+    @Аргументы:
+        count_of_segments - количество сегментов (int).
+        float_type - тип numpy массивов координат и площадей. По умолчанию numpy.float64.
+        count_type - тип numpy массива количеств захватов. По умолчанию numpy.int32.
+
+    @Поля:
+        count_of_segments - количество сегментов (int). Задается аргументом count_of_segments.
+        long - массив numpy долгот центров сегментов (градусы).
+        lat - массив numpy широт центров сегментов (градусы).
+        areas - массив numpy площадей сегментов (кв. м).
+        polygons_ids - массив numpy номеров полигонов, к которым относятся сегменты, в списке полигонов группы.
+        count_of_grabs - массив numpy количеств захватов сегментов в ПЗ ГСК. При инициализации - нули.
+
+    @Методы:
+        to_copy(self, first_index, segment_store, polygon_id) - копирует данные сегментов из другого хранилища.
+        to_make_segments(self, first_index, last_index) - составляет список объектов Segment для части сегментов.
+    """
+    def __init__(self, count_of_segments, float_type=numpy.float64, count_type=numpy.int32):
+        self.count_of_segments = count_of_segments
+        self.long = numpy.zeros(count_of_segments, dtype=float_type)
+        self.lat = numpy.zeros(count_of_segments, dtype=float_type)
+        self.areas = numpy.zeros(count_of_segments, dtype=float_type)
+        self.polygons_ids = numpy.zeros(count_of_segments, dtype=numpy.int32)
+        self.count_of_grabs = numpy.zeros(count_of_segments, dtype=count_type)
+
+    def to_copy(self, first_index, segment_store, polygon_id):
+        """
+        @Описание:
+            Метод копирует данные всех сегментов хранилища segment_store в элементы, начиная с first_index, и задает им
+                номер полигона polygon_id.
+        :param first_index: номер элемента, с которого записываются сегменты (int).
+        :param segment_store: объект SegmentStore, из которого копируются данные.
+        :param polygon_id: номер полигона, к которому относятся сегменты (int).
+        :return: записывает данные в массивы хранилища
+        """
+        segments_slice = slice(first_index, first_index + segment_store.count_of_segments)
+        self.long[segments_slice] = segment_store.long
+        self.lat[segments_slice] = segment_store.lat
+        self.areas[segments_slice] = segment_store.areas
+        self.polygons_ids[segments_slice] = polygon_id
+        self.count_of_grabs[segments_slice] = segment_store.count_of_grabs
+
+    def to_make_segments(self, first_index, last_index):
+        """
+        @Описание:
+            Метод составляет объекты Segment для сегментов с номерами от first_index до last_index (не включая).
+        :param first_index: номер первого сегмента (int).
+        :param last_index: номер сегмента после последнего (int).
+        :return: список объектов Segment
+        """
+        return [Segment(self, index) for index in range(first_index, last_index)]
+
+
+class SegmentationCache:
+    """
+    @Описание:
+        Класс моделирует хранилище результатов разбиения полигонов группы на сегменты на диске. Каждое разбиение
+            сохраняется в виде сжатого файла .npz под ключом - хэшем содержимого shape-файлов, из которых прочитаны
+            полигоны, мелкости разбиения по широте и долготе, параметров эллипсоида Земли и типа массивов координат и
+            площадей сегментов. При повторном разбиении тех же полигонов разбиение загружается с диска вместо
+            повторного вычисления.
+        В файле записываются массивы:
+            long, lat, areas, polygons_ids - данные сегментов (см. SegmentStore);
+            polygons_areas, centers_long, centers_lat, radii - площади, центры и радиусы полигонов;
+            counts_of_grid_lats, counts_of_grid_longs - размеры сеток центров сегментов полигонов;
+            grid_lats, grid_longs, segments_grids - широты и долготы строк и столбцов и номера сегментов в ячейках
+                сеток всех полигонов, записанные подряд.
+
+    @Аргументы:
+        directory - адрес директории, в которой хранятся разбиения (String). Если директории нет, она создается.
+
+    @Поля:
+        directory - адрес директории, в которой хранятся разбиения. Задается аргументом directory при инициализации.
+
+    @Методы:
+        to_make_key(shape_files_addresses, lat_fineness, long_fineness, earth_ellipsoid, float_type) - статический
+            метод. Вычисляет ключ разбиения.
+        to_load(self, key) - загружает разбиение с ключом key, если оно сохранено.
+        to_save(self, key, segmentation) - сохраняет разбиение под ключом key.
+        to_get_address(self, key) - возвращает адрес файла разбиения с ключом key.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    @staticmethod
+    def to_make_key(shape_files_addresses, lat_fineness, long_fineness, earth_ellipsoid, float_type):
+        """
+        @Описание:
+            Метод вычисляет ключ разбиения - хэш SHA-256 байтов файлов .shp, .shx и .dbf всех shape-файлов, мелкости
+                разбиения по широте и долготе, параметров эллипсоида Земли и типа массивов сегментов. Файлы читаются
+                как есть, без разбора, поэтому ключ вычисляется до построения полигонов.
+        :param shape_files_addresses: список адресов shape-файлов (с расширением .shp или без него) в порядке чтения.
+        :param lat_fineness: мелкость разбиения сегментов по широте (градусы).
+        :param long_fineness: мелкость разбиения сегментов по долготе (градусы).
+        :param earth_ellipsoid: объект EarthEllipsoid, на котором расположены полигоны.
+        :param float_type: тип numpy массивов координат и площадей сегментов.
+        :return: ключ разбиения (String)
+        """
+        key_hash = hashlib.sha256()
+        for shape_file_address in shape_files_addresses:
+            base_address, extension = os.path.splitext(shape_file_address)
+            if extension.lower() not in ('.shp', '.shx', '.dbf'):
+                base_address = shape_file_address
+            for extension in ('.shp', '.shx', '.dbf'):
+                address = "".join([base_address, extension])
+                # Для отсутствующего файла (например, .dbf) в хэш добавляется только его расширение
+                key_hash.update(extension.encode('utf-8'))
+                if os.path.exists(address):
+                    with open(address, 'rb') as shape_file:
+                        key_hash.update(hashlib.sha256(shape_file.read()).digest())
+        key_hash.update("\n".join([str(len(shape_files_addresses)), repr(float(lat_fineness)),
+                                   repr(float(long_fineness)), repr(earth_ellipsoid.semi_major_axis),
+                                   repr(earth_ellipsoid.f), numpy.dtype(float_type).name]).encode('utf-8'))
+        return key_hash.hexdigest()
+
+    def to_load(self, key):
+        """
+        @Описание:
+            Метод загружает разбиение с ключом key, если оно сохранено в self.directory.
+        :param key: ключ разбиения (String).
+        :return: словарь массивов numpy, если разбиение сохранено, если нет, то None
+        """
+        address = self.to_get_address(key)
+        if not os.path.exists(address):
+            return None
+        with numpy.load(address) as segmentation_file:
+            return {name: segmentation_file[name] for name in segmentation_file.files}
+
+    def to_save(self, key, segmentation):
+        """
+        @Описание:
+            Метод сохраняет разбиение segmentation под ключом key в self.directory. Файл сначала записывается под
+                временным именем, а затем переименовывается, чтобы прерванная запись не оставляла испорченного файла.
+        :param key: ключ разбиения (String).
+        :param segmentation: словарь массивов numpy.
+        :return: в self.directory записывается файл .npz
+        """
+        address = self.to_get_address(key)
+        temporary_address = "".join([address[:-len('.npz')], '.tmp.npz'])
+        numpy.savez_compressed(temporary_address, **segmentation)
+        os.replace(temporary_address, address)
+
+    def to_get_address(self, key):
+        """
+        @Описание:
+            Метод возвращает адрес файла, в котором хранится разбиение с ключом key.
+        :param key: ключ разбиения (String).
+        :return: адрес файла (String)
+        """
+        return os.path.join(self.directory, "".join([key, '_segmentation.npz']))
+
+
 class Segment:
     """
     @Описание
         Класс моделирует один из сегментов, на которые разделен некоторый наземный полигон, моделируемый объектом
-            Polygon. Предусматривается возможность подсчёта, сколько раз был просканирован моделируемый сегмент
+            Polygon. Предусматривается возможность подсчёта, сколько раз был просканирован моделируемый сегмент. Данные
+            сегмента хранятся в объекте SegmentStore, объект Segment только обращается к ним.
 
     @Аргументы
-        long - долгогта географического центра сегмента
-        lat - широта географического центра сегмента
-        segments_area - площадь сегмента в кв. километрах
+        segment_store - объект SegmentStore, в котором хранятся данные сегмента
+        index - номер сегмента в segment_store
 
     @Поля
+        segment_store - объект SegmentStore. Задается аргументом segment_store.
+        index - номер сегмента в segment_store. Задается аргументом index.
         center_geo_coordinates – объект Coordinates.GeoCoordinatesAndPointSet(long, lat, 0) содержащий географические
-            координаты географического центра сегмента на поверхности Земли. Задается при инициализации, long и lat -
-            аргументы объекта
-        segments_area – площадь сегмента. При инициализации задается значением аргумента segments_area
+            координаты географического центра сегмента на поверхности Земли. Составляется по segment_store при
+            обращении
+        segments_area – площадь сегмента из segment_store
         count_of_grabs – число захватов сегмента в ПЗ любого из ГСК, участвующего в выполнении задачи, за все время
-            моделирования. При инициализации задается значние 0
+            моделирования. Читается и записывается в segment_store
 
     @Методы:
         segment_grabbed(self) – прибавляет единицу к значению поля self.countOfGrabs, то есть обозначает, что этот
@@ -573,10 +1243,37 @@ class Segment:
     # Ускорение работы объектов класса
     #import pyximport; pyximport.install()
 
-    def __init__(self, long, lat, segments_area):
-        self.center_geo_coordinates = Coordinates.GeoCoordinatesAndPointSet(long, lat, 0)
-        self.segments_area = segments_area
-        self.count_of_grabs = 0
+    __slots__ = ('segment_store', 'index')
+
+    def __init__(self, segment_store, index):
+        self.segment_store = segment_store
+        self.index = index
+
+    @property
+    def center_geo_coordinates(self):
+        """
+        :return: объект Coordinates.GeoCoordinatesAndPointSet - географический центр сегмента
+        """
+        return Coordinates.GeoCoordinatesAndPointSet(float(self.segment_store.long[self.index]),
+                                                     float(self.segment_store.lat[self.index]), 0)
+
+    @property
+    def segments_area(self):
+        """
+        :return: площадь сегмента
+        """
+        return float(self.segment_store.areas[self.index])
+
+    @property
+    def count_of_grabs(self):
+        """
+        :return: число захватов сегмента (int)
+        """
+        return int(self.segment_store.count_of_grabs[self.index])
+
+    @count_of_grabs.setter
+    def count_of_grabs(self, count_of_grabs):
+        self.segment_store.count_of_grabs[self.index] = count_of_grabs
 
     def segment_grabbed(self):
         """
@@ -584,10 +1281,24 @@ class Segment:
             Метод прибавляет единицу к значению поля self.countOfGrabs, то есть обозначает, что этот сегмент попал в ПЗ
                 ГСК
         """
-        self.count_of_grabs += 1
+        self.segment_store.count_of_grabs[self.index] += 1
+
+
+def to_calculate_unit_vectors(long, lat):
+    """
+    @Описание:
+        Метод переводит географические координаты в единичные векторы на сфере (без учета вращения Земли).
+    :param long: массив numpy долгот (градусы).
+    :param lat: массив numpy широт (градусы).
+    :return: массив numpy единичных векторов размера (N, 3)
+    """
+    long = numpy.deg2rad(numpy.atleast_1d(numpy.asarray(long, dtype=float)))
+    lat = numpy.deg2rad(numpy.atleast_1d(numpy.asarray(lat, dtype=float)))
+    cos_lat = numpy.cos(lat)
+    return numpy.stack((cos_lat * numpy.cos(long), cos_lat * numpy.sin(long), numpy.sin(lat)), axis=1)
 
 
-def to_randomize_cloudiness(time, distribution_of_year_ranges, borders_of_ranges):
+def to_randomize_cloudiness(time, distribution_of_year_ranges, borders_of_ranges, random_generator):
     """
     @Описание:
         Метод случайно определяет балл облачности в соответвии с распределением из distribution_of_year_range для
@@ -597,6 +1308,8 @@ def to_randomize_cloudiness(time, distribution_of_year_ranges, borders_of_ranges
         балла облачности для годовых периодов, границы которых записаны в аргументе borders_of_ranges
     :param borders_of_ranges: границы годовых периодов, для которых в аргументе distribution_of_year_range
         определены распределения вероятности выпадения некоторого балла облачности
+    :param random_generator: генератор случайных чисел numpy.random.Generator, по которому разыгрывается балл
+        облачности
     :return: случайный балл облачности
     """
     # Определение дня от начала года в невисокосном году
@@ -611,7 +1324,7 @@ def to_randomize_cloudiness(time, distribution_of_year_ranges, borders_of_ranges
         i += 1
     distribution = distribution_of_year_ranges[i]
     # Вычисление случайного балла облачности в соответствии с распределением для определенного выше годового периода
-    rand = random()
+    rand = random_generator.random()
     j = 0
     sum_proportion = distribution[0]
     while rand >= sum_proportion:
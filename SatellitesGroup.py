@@ -1,9 +1,15 @@
 import math
+import bisect
+import numpy
 import Coordinates
 import AnalyticGeometry
+from Ephemeris import Ephemeris, EphemerisCache, to_make_time_grid, to_interpolate_hermite
+from ConstellationPropagator import ConstellationPropagator
+from TleCatalog import TleCatalog
 from pyorbital import astronomy, tlefile, orbital
+import shapely
 from shapely import geometry
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 class SatellitesGroup:
@@ -32,6 +38,47 @@ class SatellitesGroup:
             Должно вестись, чтобы не допускать одинаковой облачности слишком долгое время, чтобы сравнивать с
             self.polygons_group.TIME_OF_CLOUDINESS_CHANGING. По умолчанию 0. Обновляется привыполнении метода
             self.to_scan.
+        ephemeris - объект Ephemeris, содержащий координаты и векторы скорости всех спутников группировки для блока
+            модельного времени из EPHEMERIS_BLOCK_SIZE шагов. При инициализации - None. Вычисляется методом
+            self.to_update_ephemeris, когда следующее модельное время выходит за пределы блока.
+        ephemeris_origin_time - модельное время (datetime), от которого отсчитываются начала блоков эфемерид: блоки
+            начинаются в моменты ephemeris_origin_time + k * EPHEMERIS_BLOCK_SIZE * шаг, поэтому при повторном
+            моделировании с тем же начальным временем блоки совпадают и загружаются из self.ephemeris_cache. При
+            инициализации - None. Задается методом self.to_set_simulation_time.
+        ephemeris_cache - объект EphemerisCache - хранилище блоков эфемерид на диске, из которого блоки загружаются
+            вместо повторного вычисления. При инициализации - None, то есть блоки не сохраняются. Задается методом
+            self.to_set_ephemeris_cache.
+        state - объект ConstellationState - массивы координат всех спутников группировки в текущее модельное время.
+            Пересоздается при добавлении спутника, обновляется на месте методом self.to_move_to_time.
+        previous_state - объект ConstellationState - массивы координат всех спутников группировки в предыдущее
+            модельное время, по которым вместе с self.state вычисляются полосы захвата. На каждом шаге self.to_act
+            меняется местами с self.state.
+        half_angles_of_view - массив numpy половин углов обзора спутников группировки (радианы). Составляется при
+            добавлении спутника.
+        tangents_of_half_angles_of_view - массив numpy тангенсов половин углов обзора спутников группировки.
+            Составляется при добавлении спутника.
+        access_windows - отсортированный список непересекающихся окон доступа в виде пар (начало, конец) (datetime) -
+            интервалов модельного времени, вне которых ни один полигон не может оказаться достаточно близко ни к одному
+            спутнику группировки. При инициализации - None. Вычисляется методом self.to_calculate_access_windows.
+        access_windows_ends - список концов окон доступа из self.access_windows (datetime) для поиска окна по времени.
+            При инициализации - None. Вычисляется методом self.to_calculate_access_windows.
+        access_windows_final_time - время, до которого вычислены окна доступа (datetime). При инициализации - None.
+            Задается методом self.to_calculate_access_windows.
+        propagator - объект ConstellationPropagator, вычисляющий координаты сразу всех спутников группировки по модели
+            SGP4 над массивами. При инициализации - None, то есть координаты вычисляются с помощью pyorbital для
+            каждого спутника отдельно. Задается методом self.to_set_vectorized_propagation.
+        propagator_validation_tolerance - допустимое отклонение координат, вычисленных self.propagator, от вычисленных
+            с помощью pyorbital (км). При инициализации - None, то есть сравнение не проводится. Задается методом
+            self.to_set_vectorized_propagation.
+        interpolation_step - шаг узлов (секунды), в которых координаты спутников вычисляются по модели SGP4 при
+            составлении блока эфемерид. Между узлами координаты и векторы скорости вычисляются интерполяцией Эрмита.
+            При инициализации - None, то есть блоки вычисляются по SGP4 в каждый момент времени. Задается методом
+            self.to_set_ephemeris_interpolation.
+        interpolation_tolerance - допустимая погрешность интерполяции координат (км). При инициализации - None, то
+            есть погрешность не оценивается. Задается методом self.to_set_ephemeris_interpolation.
+        interpolation_error - наибольшая погрешность интерполяции координат (км), оцененная по середине интервалов между
+            узлами для всех вычисленных блоков эфемерид. При инициализации - 0. Обновляется методом
+            self.to_calculate_interpolated_positions_and_velocities, если задано self.interpolation_tolerance.
 
     @Методы:
         to_act(self, next_simulation_time) - моделирует работу спутниковой группировки, то есть всех спутников, входящих
@@ -40,10 +87,48 @@ class SatellitesGroup:
             моделирования работы группировки производили съемку.
         to_add_satellite(self, sat_name, tle_address, angle_of_view) - создает объект Satellite и добавляет его в список
             спутникоа группировки, то есть добавляет новый спутник в группировку.
+        to_add_satellites(self, tle_address, satellites_parameters) - добавляет в группировку сразу многие спутники из
+            каталога TLE, читая файл каталога один раз.
+        to_update_satellites_arrays(self) - пересоздает массивы группировки после добавления спутников.
+        to_calculate_ephemeris(self, initial_time, step, count_of_steps) - вычисляет координаты и векторы скорости всех
+            спутников группировки сразу для блока моментов времени с постоянным шагом.
+        to_update_ephemeris(self, next_simulation_time) - проверяет, входит ли заданное модельное время в текущий блок
+            эфемерид, и вычисляет новый блок, если не входит.
+        to_set_ephemeris_cache(self, cache_directory) - задает директорию, в которой сохраняются блоки эфемерид.
+        to_set_vectorized_propagation(self, vectorized_propagation=True, validation_tolerance=None) - включает или
+            выключает вычисление координат сразу всех спутников группировки над массивами.
+        to_calculate_positions_and_velocities(self, utc_times) - вычисляет координаты и векторы скорости всех спутников
+            группировки во все заданные моменты времени.
+        to_set_ephemeris_interpolation(self, interpolation_step=60, interpolation_tolerance=None) - включает или
+            выключает интерполяцию блоков эфемерид между редкими узлами.
+        to_calculate_interpolated_positions_and_velocities(self, initial_time, step, count_of_steps) - вычисляет
+            координаты и векторы скорости всех спутников группировки интерполяцией Эрмита между узлами.
+        to_move_to_time(self, next_time) - вычисляет координаты всех спутников группировки в заданное время.
+        to_determine_close_polygons(self) - сразу для всех спутников определяет близкие к ним полигоны.
+        to_determine_scan_areas(self, satellites_indexes) - сразу для нескольких спутников определяет полосы захвата
+            за последний шаг.
+        to_calculate_ground_points_in_field_of_view(self, state, satellites_indexes, angles_of_rotation) - сразу для
+            нескольких спутников вычисляет точки на Земле, в которые направлены векторы, повернутые от надира.
+        to_calculate_ground_points_of_arrays(self, positions, velocities, subsatellite_positions, angles_of_rotation,
+                                             utc_time) - то же для массивов координат и векторов скорости спутников.
+        to_determine_passes(self, initial_time, step, count_of_steps) - вычисляет блок эфемерид и определяет по нему
+            пролеты всех спутников группировки в порядке их начала.
+        to_scan_pass(self, satellite_pass) - моделирует съемку сразу за целый пролет спутника.
+        to_calculate_time_without_close_polygons(self) - вычисляет время, в течение которого ни один спутник группировки
+            не может оказаться вблизи какого-либо полигона.
+        to_skip_to_time(self, next_simulation_time) - переносит группировку в заданное модельное время без
+            моделирования съемки.
+        to_calculate_access_windows(self, initial_time, final_time, step) - вычисляет окна доступа всех спутников
+            группировки ко всем полигонам и объединяет их.
+        to_calculate_time_to_access_window(self) - вычисляет время от текущего модельного времени до ближайшего окна
+            доступа.
     """
     # Ускорение работы объектов класса
     #import pyximport; pyximport.install()
 
+    # Количество шагов модельного времени в одном блоке эфемерид
+    EPHEMERIS_BLOCK_SIZE = 3600
+
     def __init__(self, earth_ellipsoid):
         self.earth_ellipsoid = earth_ellipsoid
         a = earth_ellipsoid.semi_major_axis
@@ -53,6 +138,21 @@ class SatellitesGroup:
         self.simulation_time = None
         self.task = None
         self.time_of_scanning = 0
+        self.ephemeris = None
+        self.ephemeris_origin_time = None
+        self.ephemeris_cache = None
+        self.state = ConstellationState(0)
+        self.previous_state = ConstellationState(0)
+        self.half_angles_of_view = numpy.zeros(0)
+        self.tangents_of_half_angles_of_view = numpy.zeros(0)
+        self.access_windows = None
+        self.access_windows_ends = None
+        self.access_windows_final_time = None
+        self.propagator = None
+        self.propagator_validation_tolerance = None
+        self.interpolation_step = None
+        self.interpolation_tolerance = None
+        self.interpolation_error = 0
 
     def to_act(self, next_simulation_time):
         """
@@ -69,28 +169,28 @@ class SatellitesGroup:
             Список спутников, которые за время моделирования работы группировки производили съемку.
         """
         common_scanned_area = 0
-        close_polygons_are_exist = False
-        # Обход всех спутников группировки
-        for satellite in self.satellites_list:
-            # Сохранение координат выбранного спутника в текущее время моделирования
-            current_coordinates_set = satellite.satellite_coordinates_set
-            # Моделирование движения спутника до времени next_simulation_time
-
-            satellite.to_move_to_time(next_simulation_time)
-
-            next_coordinates_set = satellite.satellite_coordinates_set
-            # Определение полигонов достаточно близких моделируемому спутнику, чтобы быть просканированными
-            satellite.to_determine_close_polygons()
-            if len(satellite.close_polygons) > 0:
-                close_polygons_are_exist = True
-                #   Моделирование полосы захвата (по прямой линии между точками на орбите)
-                satellite.to_determine_scan_area(current_coordinates_set, next_coordinates_set)
+        # Координаты спутников в следующее модельное время берутся из блока эфемерид, который вычисляется сразу для
+        #   всех спутников, если next_simulation_time в него не входит
+        self.to_update_ephemeris(next_simulation_time)
+        # Текущее состояние группировки становится предыдущим, а следующее записывается на место предыдущего
+        self.state, self.previous_state = self.previous_state, self.state
+        # Моделирование движения всех спутников до времени next_simulation_time
+        self.to_move_to_time(next_simulation_time)
+        # Определение полигонов достаточно близких каждому спутнику, чтобы быть просканированными
+        are_close = self.to_determine_close_polygons()
+        satellites_are_close = numpy.any(are_close, axis=1)
+        close_polygons_are_exist = bool(numpy.any(satellites_are_close))
+        if close_polygons_are_exist:
+            # Моделирование полос захвата (по прямой линии между точками на орбите) спутников, вблизи которых есть
+            #   полигоны
+            self.to_determine_scan_areas(numpy.flatnonzero(satellites_are_close))
         # Если есть полигоны, близкие к спутникам из группы
         if close_polygons_are_exist:
             # Если сканирование только начинается
             if self.time_of_scanning == 0:
                 # Задается облачность
-                self.task.polygons_group.to_calculate_cloudiness_above_group(self.simulation_time)
+                self.task.polygons_group.to_calculate_cloudiness_above_group(self.simulation_time,
+                                                                             self.task.random_generator)
                 # Если погода не меняется не слишком долго
                 # Вычисляется шаг времени сканирования и прибавляется времени сеанса
                 self.time_of_scanning += (next_simulation_time - self.simulation_time).total_seconds()
@@ -138,6 +238,226 @@ class SatellitesGroup:
         :return: добавляет спутник в список спутников группы self.satellites_list
         """
         self.satellites_list.append(Satellite(sat_name, tle_address, angle_of_view, self))
+        self.to_update_satellites_arrays()
+
+    def to_add_satellites(self, tle_address, satellites_parameters):
+        """
+        @Описание:
+            Метод добавляет в группировку сразу многие спутники, данные TLE которых содержатся в одном файле-каталоге по
+                адресу tle_address. Файл читается один раз (объектом TleCatalog), а массивы группировки пересоздаются
+                один раз после добавления всех спутников.
+        :param tle_address: адрес файла-каталога данных TLE (String).
+        :param satellites_parameters: список пар (название спутника (String) или его номер в каталоге NORAD (int), угол
+            обзора бортового гиперспектрометра спутника (градусы)).
+        :return: добавляет спутники в список спутников группы self.satellites_list. Если какого-либо спутника нет в
+            каталоге, то вызывается исключение KeyError и ни один спутник не добавляется
+        """
+        tle_catalog = TleCatalog(tle_address)
+        tle_list = [tle_catalog.to_get_tle(sat_name_or_number) for sat_name_or_number, _ in satellites_parameters]
+        for tle, (_, angle_of_view) in zip(tle_list, satellites_parameters):
+            self.satellites_list.append(Satellite(tle.platform, tle_address, angle_of_view, self, tle))
+        self.to_update_satellites_arrays()
+
+    def to_update_satellites_arrays(self):
+        """
+        @Описание:
+            Метод пересоздает массивы группировки, зависящие от состава спутников (массивы состояния, углов обзора и
+                элементов орбит векторизованной модели SGP4), и сбрасывает вычисленные ранее эфемериды.
+        :return: обновляет поля self.ephemeris, self.state, self.previous_state, self.half_angles_of_view,
+            self.tangents_of_half_angles_of_view и self.propagator
+        """
+        # Вычисленные ранее эфемериды не содержат новых спутников
+        self.ephemeris = None
+        # Массивы состояния группировки пересоздаются с учетом новых спутников
+        self.state = ConstellationState(len(self.satellites_list))
+        self.previous_state = ConstellationState(len(self.satellites_list))
+        self.half_angles_of_view = numpy.array([satellite.half_angle_of_view for satellite in self.satellites_list])
+        self.tangents_of_half_angles_of_view = numpy.array([math.tan(satellite.half_angle_of_view)
+                                                            for satellite in self.satellites_list])
+        # Элементы орбит новых спутников добавляются в массивы векторизованной модели SGP4
+        if self.propagator is not None:
+            self.propagator = ConstellationPropagator([satellite.tle for satellite in self.satellites_list])
+
+    def to_calculate_ephemeris(self, initial_time, step, count_of_steps):
+        """
+        @Описание:
+            Метод вычисляет координаты и векторы скорости всех спутников группировки сразу для count_of_steps моментов
+                времени, начиная с initial_time, с шагом step (методом self.to_calculate_positions_and_velocities или,
+                если шаг узлов интерполяции self.interpolation_step больше step, интерполяцией между узлами). Если
+                задано хранилище self.ephemeris_cache и в нем есть блок с такими же TLE, шагом, интервалом времени и
+                эллипсоидом Земли, то блок загружается из хранилища без вычислений, если нет, то вычисленный блок
+                сохраняется в хранилище.
+        :param initial_time: первый момент времени блока (datetime).
+        :param step: шаг времени в блоке (секунды).
+        :param count_of_steps: количество моментов времени в блоке (int).
+        :return: объект Ephemeris, содержащий массивы координат (км) и векторов скорости (км/с) всех спутников
+            группировки размера (count_of_steps, len(self.satellites_list), 3)
+        """
+        is_interpolated = (self.interpolation_step is not None) and (self.interpolation_step > step)
+        if self.ephemeris_cache is not None:
+            tle_lines = []
+            for satellite in self.satellites_list:
+                tle_lines += [satellite.tle.line1, satellite.tle.line2]
+            key = EphemerisCache.to_make_key(tle_lines, initial_time, step, count_of_steps, self.earth_ellipsoid,
+                                             self.interpolation_step if is_interpolated else None)
+            ephemeris = self.ephemeris_cache.to_load(key, initial_time, step)
+            if ephemeris is not None:
+                return ephemeris
+        if is_interpolated:
+            positions, velocities = self.to_calculate_interpolated_positions_and_velocities(initial_time, step,
+                                                                                            count_of_steps)
+        else:
+            time_grid = to_make_time_grid(initial_time, step, count_of_steps)
+            positions, velocities = self.to_calculate_positions_and_velocities(time_grid)
+        ephemeris = Ephemeris(initial_time, step, positions, velocities)
+        if self.ephemeris_cache is not None:
+            self.ephemeris_cache.to_save(key, ephemeris)
+        return ephemeris
+
+    def to_update_ephemeris(self, next_simulation_time):
+        """
+        @Описание:
+            Метод проверяет, входит ли время next_simulation_time в блок эфемерид self.ephemeris с шагом, равным шагу от
+                текущего модельного времени до next_simulation_time. Если не входит, то вычисляется новый блок из
+                self.EPHEMERIS_BLOCK_SIZE моментов времени, в который входит next_simulation_time. Блоки начинаются в
+                моменты self.ephemeris_origin_time + k * self.EPHEMERIS_BLOCK_SIZE * step, чтобы не зависеть от
+                того, какие шаги были пропущены методом self.to_skip_to_time. Если next_simulation_time не попадает на
+                сетку с шагом step от self.ephemeris_origin_time, то блок начинается с next_simulation_time.
+        :param next_simulation_time: следующее модельное время (datetime).
+        :return: при необходимости обновляется поле self.ephemeris, углы поворота Земли для моментов времени нового
+            блока записываются в общее хранилище Coordinates.earth_rotation_cache
+        """
+        step = (next_simulation_time - self.simulation_time).total_seconds()
+        if step <= 0:
+            return
+        if (self.ephemeris is None) or (abs(self.ephemeris.step - step) > Ephemeris.TIME_TOLERANCE) or \
+                (self.ephemeris.to_get_index(next_simulation_time) is None):
+            initial_time = next_simulation_time
+            if self.ephemeris_origin_time is not None:
+                # Номер шага next_simulation_time от начала отсчета блоков
+                steps_from_origin = (next_simulation_time - self.ephemeris_origin_time).total_seconds() / step
+                index_from_origin = int(round(steps_from_origin))
+                if abs(index_from_origin - steps_from_origin) * step <= Ephemeris.TIME_TOLERANCE:
+                    initial_time = self.ephemeris_origin_time + \
+                        timedelta(seconds=(index_from_origin // self.EPHEMERIS_BLOCK_SIZE) *
+                                  self.EPHEMERIS_BLOCK_SIZE * step)
+            self.ephemeris = self.to_calculate_ephemeris(initial_time, step, self.EPHEMERIS_BLOCK_SIZE)
+            # Углы поворота Земли для всего блока вычисляются одним вызовом pyorbital
+            Coordinates.earth_rotation_cache.to_fill(to_make_time_grid(initial_time, step,
+                                                                       self.EPHEMERIS_BLOCK_SIZE))
+
+    def to_set_ephemeris_cache(self, cache_directory):
+        """
+        @Описание:
+            Метод задает директорию, в которой сохраняются вычисленные блоки эфемерид, чтобы при повторном
+                моделировании на том же интервале времени с теми же TLE они загружались с диска.
+        :param cache_directory: адрес директории хранилища блоков эфемерид (String). Допустимо None - тогда блоки не
+            сохраняются.
+        :return: в поле self.ephemeris_cache записывается объект EphemerisCache или None
+        """
+        if cache_directory is not None:
+            self.ephemeris_cache = EphemerisCache(cache_directory)
+        else:
+            self.ephemeris_cache = None
+
+    def to_set_vectorized_propagation(self, vectorized_propagation=True, validation_tolerance=None):
+        """
+        @Описание:
+            Метод включает или выключает вычисление координат и векторов скорости сразу всех спутников группировки по
+                модели SGP4 над массивами (объектом ConstellationPropagator) вместо вызова pyorbital для каждого
+                спутника. Если задано validation_tolerance, то каждый результат сравнивается с pyorbital.
+        :param vectorized_propagation: True - координаты вычисляются над массивами, False - с помощью pyorbital для
+            каждого спутника (по умолчанию True).
+        :param validation_tolerance: допустимое отклонение координат от вычисленных с помощью pyorbital (км). Допустимо
+            None - тогда сравнение не проводится.
+        :return: записывает значения в поля self.propagator и self.propagator_validation_tolerance
+        """
+        if vectorized_propagation:
+            self.propagator = ConstellationPropagator([satellite.tle for satellite in self.satellites_list])
+        else:
+            self.propagator = None
+        self.propagator_validation_tolerance = validation_tolerance
+
+    def to_calculate_positions_and_velocities(self, utc_times):
+        """
+        @Описание:
+            Метод вычисляет координаты и векторы скорости всех спутников группировки во все моменты времени utc_times.
+                Если задан self.propagator, то сразу для всех спутников над массивами (и, если задано
+                self.propagator_validation_tolerance, с проверкой отклонения от pyorbital), иначе с помощью pyorbital
+                одним вызовом для каждого спутника.
+        :param utc_times: массив numpy.datetime64 моментов времени в формате UTC.
+        :return: массивы numpy координат (км) и векторов скорости (км/с) размера (len(utc_times),
+            len(self.satellites_list), 3)
+        """
+        if self.propagator is not None:
+            positions, velocities = self.propagator.to_calculate_positions_and_velocities(utc_times)
+            if self.propagator_validation_tolerance is not None:
+                deviation, _ = self.propagator.to_calculate_max_deviations(
+                    [satellite.orbit for satellite in self.satellites_list], utc_times)
+                if deviation > self.propagator_validation_tolerance:
+                    raise ValueError("".join(["Отклонение координат от pyorbital ", str(deviation),
+                                              " км превышает допустимое ",
+                                              str(self.propagator_validation_tolerance), " км"]))
+            return positions, velocities
+        positions = numpy.empty((len(utc_times), len(self.satellites_list), 3))
+        velocities = numpy.empty((len(utc_times), len(self.satellites_list), 3))
+        for i in range(0, len(self.satellites_list)):
+            position, velocity = self.satellites_list[i].orbit.get_position(utc_times, normalize=False)
+            positions[:, i, :] = numpy.transpose(position)
+            velocities[:, i, :] = numpy.transpose(velocity)
+        return positions, velocities
+
+    def to_set_ephemeris_interpolation(self, interpolation_step=60, interpolation_tolerance=None):
+        """
+        @Описание:
+            Метод включает или выключает составление блоков эфемерид интерполяцией Эрмита: координаты и векторы скорости
+                спутников вычисляются по модели SGP4 только в узлах с шагом interpolation_step, а в остальные моменты
+                времени блока - интерполяцией между узлами. Если задано interpolation_tolerance, то для каждого блока
+                оценивается погрешность интерполяции.
+        :param interpolation_step: шаг узлов интерполяции (секунды, по умолчанию 60). Допустимо None - тогда блоки
+            вычисляются по SGP4 в каждый момент времени.
+        :param interpolation_tolerance: допустимая погрешность интерполяции координат (км). Допустимо None - тогда
+            погрешность не оценивается.
+        :return: записывает значения в поля self.interpolation_step и self.interpolation_tolerance, вычисленные ранее
+            эфемериды сбрасываются
+        """
+        self.interpolation_step = interpolation_step
+        self.interpolation_tolerance = interpolation_tolerance
+        self.interpolation_error = 0
+        self.ephemeris = None
+
+    def to_calculate_interpolated_positions_and_velocities(self, initial_time, step, count_of_steps):
+        """
+        @Описание:
+            Метод вычисляет координаты и векторы скорости всех спутников группировки в count_of_steps моментов времени,
+                начиная с initial_time, с шагом step интерполяцией Эрмита между узлами с шагом self.interpolation_step,
+                в которых координаты вычисляются методом self.to_calculate_positions_and_velocities. Если задано
+                self.interpolation_tolerance, то координаты дополнительно вычисляются в серединах интервалов между
+                узлами, где погрешность интерполяции наибольшая, и сравниваются с интерполированными. Наибольшее
+                отклонение записывается в self.interpolation_error, при превышении допустимого вызывается исключение.
+        :param initial_time: первый момент времени (datetime).
+        :param step: шаг времени (секунды).
+        :param count_of_steps: количество моментов времени (int).
+        :return: массивы numpy координат (км) и векторов скорости (км/с) размера (count_of_steps,
+            len(self.satellites_list), 3)
+        """
+        node_step = self.interpolation_step
+        count_of_nodes = max(2, int(math.ceil(step * (count_of_steps - 1) / node_step)) + 1)
+        node_positions, node_velocities = self.to_calculate_positions_and_velocities(
+            to_make_time_grid(initial_time, node_step, count_of_nodes))
+        positions, velocities = to_interpolate_hermite(node_step, node_positions, node_velocities,
+                                                       numpy.arange(count_of_steps) * step)
+        if self.interpolation_tolerance is not None:
+            midpoints_positions, _ = self.to_calculate_positions_and_velocities(
+                to_make_time_grid(initial_time + timedelta(seconds=node_step / 2), node_step, count_of_nodes - 1))
+            interpolated_midpoints_positions, _ = to_interpolate_hermite(
+                node_step, node_positions, node_velocities, (numpy.arange(count_of_nodes - 1) + 0.5) * node_step)
+            error = float(numpy.max(numpy.linalg.norm(midpoints_positions - interpolated_midpoints_positions, axis=2)))
+            self.interpolation_error = max(self.interpolation_error, error)
+            if error > self.interpolation_tolerance:
+                raise ValueError("".join(["Погрешность интерполяции координат ", str(error),
+                                          " км превышает допустимую ", str(self.interpolation_tolerance), " км"]))
+        return positions, velocities
 
     def to_set_simulation_time(self, simulation_time):
         """
@@ -147,19 +467,274 @@ class SatellitesGroup:
         :param simulation_time: устанавливаемое модельное время (datetime)
         :return: записывает время simulation_time в поле self.simulation_time и вычисляет для поля
                  satellite_coordinates_set для каждого спутника из self.satellites_list вычисляет координаты в модельное
-                 время simulation_time
+                 время simulation_time, оценки орбит спутников (поле orbit_bounds) сбрасываются
         """
         # Установка модельного времени
         self.simulation_time = simulation_time
-        # Вычисление координат каждого спутника в модельное время simulation_time
+        self.ephemeris_origin_time = simulation_time
+        # Оценки орбит спутников вычисляются заново в новое модельное время
+        for satellite in self.satellites_list:
+            satellite.orbit_bounds = None
+        # Вычисление координат всех спутников в модельное время simulation_time
+        #   (из блока эфемерид, если время simulation_time в него входит)
+        self.to_move_to_time(simulation_time)
+
+    def to_move_to_time(self, next_time):
+        """
+        @Описание:
+            Метод определяет координаты и векторы скорости всех спутников группировки во время next_time и записывает их
+                в массивы состояния группировки self.state. Если время next_time входит в блок эфемерид группы, то
+                координаты берутся из него, иначе вычисляются методом
+                self.to_calculate_positions_and_velocities.
+        :param next_time: время в формате UTC, в которое определяются координаты спутников (datetime).
+        :return: обновляет массивы self.state
+        """
+        index_of_time = None
+        if self.ephemeris is not None:
+            index_of_time = self.ephemeris.to_get_index(next_time)
+        if index_of_time is not None:
+            positions = self.ephemeris.positions[index_of_time]
+            velocities = self.ephemeris.velocities[index_of_time]
+        else:
+            positions, velocities = self.to_calculate_positions_and_velocities(
+                numpy.array([numpy.datetime64(next_time, 'us')]))
+            positions = positions[0]
+            velocities = velocities[0]
+        self.state.to_update(positions, velocities, next_time, self.earth_ellipsoid)
+
+    def to_determine_close_polygons(self):
+        """
+        @Описание:
+            Метод сразу для всех спутников группировки определяет, какие полигоны находятся достаточно близко к
+                спутнику, чтобы части их территории могли попасть в полосу захвата спутника (тот же критерий, что и в
+                методе Satellite.to_determine_close_polygons). Списки близких полигонов записываются в поля
+                close_polygons спутников.
+        :return: массив numpy (boolean) размера (количество спутников, количество полигонов), в котором True
+            означает, что полигон близок к спутнику
+        """
+        polygons_list = self.task.polygons_group.polygons_list
+        centers_index = self.task.polygons_group.to_get_centers_index()
+        long = self.state.geo_coordinates[:, 0]
+        lat = self.state.geo_coordinates[:, 1]
+        alt = self.state.geo_coordinates[:, 2]
+        # При небольшом количестве полигонов близость проверяется сразу для всех пар спутник-полигон произведением
+        #   матриц, иначе близкие полигоны ищутся по пространственному индексу центров полигонов
+        if centers_index.count_of_polygons <= centers_index.MAX_COUNT_OF_POLYGONS_FOR_MATRIX:
+            are_close = centers_index.to_calculate_close_polygons_matrix(long, lat, alt,
+                                                                         self.tangents_of_half_angles_of_view)
+            close_indexes_lists = [numpy.flatnonzero(are_close[i]) for i in range(0, len(self.satellites_list))]
+        else:
+            close_indexes_lists = centers_index.to_find_close_polygons_indexes(long, lat, alt,
+                                                                               self.tangents_of_half_angles_of_view)
+            are_close = numpy.zeros((len(self.satellites_list), len(polygons_list)), dtype=bool)
+            for i in range(0, len(self.satellites_list)):
+                are_close[i, close_indexes_lists[i]] = True
+        for i in range(0, len(self.satellites_list)):
+            self.satellites_list[i].close_polygons = [polygons_list[j] for j in close_indexes_lists[i].tolist()]
+        return are_close
+
+    def to_determine_scan_areas(self, satellites_indexes):
+        """
+        @Описание:
+            Метод определяет полосы захвата спутников с номерами satellites_indexes при прямолинейном движении спутников
+                между координатами из self.previous_state и self.state. Если на прошлом шаге спутник вел съемку, то
+                текущими границами полосы захвата становятся следующие границы на прошлом шаге.
+        :param satellites_indexes: массив numpy номеров спутников в группировке.
+        :return: полосы захвата записываются в поля scanned_territory_for_last_step спутников в виде списков
+            геокоординат (GeoCoordinates)
+        """
+        half_angles = self.half_angles_of_view[satellites_indexes]
+        # Границы полосы захвата для следующего положения спутников (сначала левые, затем правые)
+        next_long, next_lat, next_alt = self.to_calculate_ground_points_in_field_of_view(
+            self.state, numpy.concatenate((satellites_indexes, satellites_indexes)),
+            numpy.concatenate((half_angles, -half_angles)))
+        # Границы полосы захвата для текущего положения спутников, которые не вели съемку на прошлом шаге
+        are_starting = numpy.array([len(self.satellites_list[i].scanned_territory_for_last_step) == 0
+                                    for i in satellites_indexes])
+        starting_indexes = satellites_indexes[are_starting]
+        current_long, current_lat, current_alt = self.to_calculate_ground_points_in_field_of_view(
+            self.previous_state, numpy.concatenate((starting_indexes, starting_indexes)),
+            numpy.concatenate((half_angles[are_starting], -half_angles[are_starting])))
+        count_of_satellites = len(satellites_indexes)
+        count_of_starting_satellites = len(starting_indexes)
+        index_of_starting_satellite = 0
+        for k in range(0, count_of_satellites):
+            satellite = self.satellites_list[satellites_indexes[k]]
+            if are_starting[k]:
+                left_current_swath_border = Coordinates.GeoCoordinates(
+                    current_long[index_of_starting_satellite], current_lat[index_of_starting_satellite],
+                    current_alt[index_of_starting_satellite])
+                right_current_swath_border = Coordinates.GeoCoordinates(
+                    current_long[index_of_starting_satellite + count_of_starting_satellites],
+                    current_lat[index_of_starting_satellite + count_of_starting_satellites],
+                    current_alt[index_of_starting_satellite + count_of_starting_satellites])
+                index_of_starting_satellite += 1
+            else:
+                left_current_swath_border = satellite.scanned_territory_for_last_step[3]
+                right_current_swath_border = satellite.scanned_territory_for_last_step[2]
+            left_next_swath_border = Coordinates.GeoCoordinates(next_long[k], next_lat[k], next_alt[k])
+            right_next_swath_border = Coordinates.GeoCoordinates(next_long[k + count_of_satellites],
+                                                                 next_lat[k + count_of_satellites],
+                                                                 next_alt[k + count_of_satellites])
+            satellite.scanned_territory_for_last_step = [left_current_swath_border, right_current_swath_border,
+                                                         right_next_swath_border, left_next_swath_border]
+
+    def to_calculate_ground_points_in_field_of_view(self, state, satellites_indexes, angles_of_rotation):
+        """
+        @Описание:
+            Метод сразу для нескольких спутников вычисляет координаты точек на Земле, в которые направлены векторы,
+                повернутые от надира спутников в сторону от их движения параллельно эллипсоиду Земли на заданные углы
+                (точки пересечения эллипсоида Земли и прямых, проведенных из спутников в этих направлениях). Перевод в
+                географические координаты производится в текущее модельное время группы.
+        :param state: объект ConstellationState, из которого берутся координаты и векторы скорости спутников.
+        :param satellites_indexes: массив numpy номеров спутников в группировке (номера могут повторяться).
+        :param angles_of_rotation: массив numpy углов поворота того же размера, что и satellites_indexes.
+        :return: массивы numpy долгот (градусы), широт (градусы) и высот (км) искомых точек
+        """
+        return self.to_calculate_ground_points_of_arrays(state.positions[satellites_indexes],
+                                                         state.velocities[satellites_indexes],
+                                                         state.subsatellite_positions[satellites_indexes],
+                                                         angles_of_rotation, self.simulation_time)
+
+    def to_calculate_ground_points_of_arrays(self, positions, velocities, subsatellite_positions, angles_of_rotation,
+                                             utc_time):
+        """
+        @Описание:
+            Метод вычисляет координаты точек на Земле, в которые направлены векторы, повернутые от надира спутников в
+                сторону от их движения параллельно эллипсоиду Земли на заданные углы, сразу для массивов координат и
+                векторов скорости спутников (в том числе одного спутника в разные моменты времени).
+        :param positions: массив numpy координат спутников размера (N, 3) (км).
+        :param velocities: массив numpy векторов скорости спутников размера (N, 3) (км/с).
+        :param subsatellite_positions: массив numpy координат подспутниковых точек размера (N, 3) (км).
+        :param angles_of_rotation: массив numpy углов поворота размера N.
+        :param utc_time: время в формате UTC (datetime) или массив numpy.datetime64 размера N, во время которого
+            координаты переводятся в географические.
+        :return: массивы numpy долгот (градусы), широт (градусы) и высот (км) искомых точек
+        """
+        nadir = subsatellite_positions - positions
+        # Ось вращения, вокруг которой вращается вектор-надир, чтобы найти вектор движения спутника параллельно
+        #   плоскости эллипсоида Земли (векторное произведение надира на вектор скорости)
+        rot_axis = numpy.stack((nadir[:, 1] * velocities[:, 2] - velocities[:, 1] * nadir[:, 2],
+                                velocities[:, 0] * nadir[:, 2] - nadir[:, 0] * velocities[:, 2],
+                                nadir[:, 0] * velocities[:, 1] - velocities[:, 0] * nadir[:, 1]), axis=1)
+        parallel_mov_vector = AnalyticGeometry.to_rotate_vectors(nadir, rot_axis, numpy.full(len(positions), 90.0))
+        vector_to_searched_point = AnalyticGeometry.to_rotate_vectors(nadir, parallel_mov_vector, angles_of_rotation,
+                                                                      parallel_mov_vector)
+        # Ближайшие к спутникам точки пересечения прямых с эллипсоидом Земли
+        searched_point = AnalyticGeometry.\
+            to_found_points_of_intersections_of_lines_and_canonical_ellipsoid_nearest_to_starting_points(
+                positions, vector_to_searched_point, self.canon_ellipsoid)
+        return Coordinates.to_geo_coordinates_of_arrays(searched_point[:, 0], searched_point[:, 1],
+                                                        searched_point[:, 2], utc_time, self.earth_ellipsoid)
+
+    def to_determine_passes(self, initial_time, step, count_of_steps):
+        """
+        @Описание:
+            Метод определяет пролеты всех спутников группировки на count_of_steps шагах модельного времени, начиная с
+                initial_time (см. Satellite.to_determine_passes). Координаты спутников вычисляются одним блоком эфемерид
+                методом self.to_calculate_ephemeris, то есть тем же способом, что и при моделировании по шагам (над
+                массивами, с помощью pyorbital или интерполяцией, с хранилищем эфемерид), и блок записывается в
+                self.ephemeris.
+        :param initial_time: начало интервала модельного времени (datetime).
+        :param step: шаг модельного времени (секунды).
+        :param count_of_steps: количество шагов модельного времени (int).
+        :return: список пролетов (см. Satellite.to_determine_passes) всех спутников группировки в порядке их начала
+        """
+        self.ephemeris = self.to_calculate_ephemeris(initial_time, step, count_of_steps + 1)
+        passes = []
+        for satellite in self.satellites_list:
+            passes += satellite.to_determine_passes(self.ephemeris)
+        passes.sort(key=lambda satellite_pass: satellite_pass[1])
+        return passes
+
+    def to_scan_pass(self, satellite_pass):
+        """
+        @Описание:
+            Метод моделирует съемку полигонов за целый пролет спутника (см. Satellite.to_scan_pass) по координатам
+                из блока эфемерид self.ephemeris, вычисленного методом self.to_determine_passes: вместо проверки
+                сегментов на каждом шаге модельного времени составляется одна полоса захвата за пролет и сегменты
+                проверяются один раз.
+        :param satellite_pass: пролет - элемент списка, возвращенного методом self.to_determine_passes.
+        :return: площадь просканированной территории (кв. м) и номер момента времени в блоке self.ephemeris - конца
+            последнего шага пролета, на котором были просканированы сегменты (int), или None, если сегменты не
+            просканированы
+        """
+        satellite, first, end, polygons_indexes = satellite_pass
+        return satellite.to_scan_pass(self.ephemeris, first, end, polygons_indexes)
+
+    def to_calculate_time_without_close_polygons(self):
+        """
+        @Описание:
+            Метод вычисляет время от текущего модельного времени, в течение которого ни один спутник группировки не
+                может оказаться вблизи какого-либо полигона (в смысле метода Satellite.to_determine_close_polygons).
+                Если текущее модельное время входит в интервал, для которого вычислены окна доступа, то это время до
+                ближайшего окна доступа, иначе - оценка по скорости движения подспутниковых точек.
+        :return: время в секундах (double), 0 - если какой-либо спутник уже может находиться вблизи полигона
+        """
+        if self.access_windows is not None and self.simulation_time <= self.access_windows_final_time:
+            return self.to_calculate_time_to_access_window()
+        time_without_close_polygons = math.inf
+        for satellite in self.satellites_list:
+            time_without_close_polygons = min(time_without_close_polygons,
+                                              satellite.to_calculate_time_to_close_polygons())
+        return time_without_close_polygons
+
+    def to_calculate_access_windows(self, initial_time, final_time, step):
+        """
+        @Описание:
+            Метод вычисляет окна доступа каждого спутника группировки к каждому полигону (см.
+                Satellite.to_calculate_access_windows) и объединяет их в один отсортированный список непересекающихся
+                окон. Координаты спутников в initial_time должны быть вычислены (например, методом
+                self.to_set_simulation_time).
+        :param initial_time: начало интервала модельного времени (datetime).
+        :param final_time: конец интервала модельного времени (datetime).
+        :param step: шаг модельного времени, с точностью до которого определяются окна доступа (секунды).
+        :return: в поля self.access_windows, self.access_windows_ends и self.access_windows_final_time записываются
+            окна доступа группировки, их концы и final_time
+        """
+        all_windows = []
+        for satellite in self.satellites_list:
+            satellite.to_calculate_access_windows(initial_time, final_time, step)
+            for polygon_windows in satellite.access_windows:
+                all_windows += polygon_windows
+        all_windows.sort()
+        self.access_windows = []
+        for begin, end in all_windows:
+            if len(self.access_windows) > 0 and begin <= self.access_windows[-1][1]:
+                self.access_windows[-1] = (self.access_windows[-1][0], max(self.access_windows[-1][1], end))
+            else:
+                self.access_windows.append((begin, end))
+        self.access_windows_ends = [end for begin, end in self.access_windows]
+        self.access_windows_final_time = final_time
+
+    def to_calculate_time_to_access_window(self):
+        """
+        @Описание:
+            Метод вычисляет время от текущего модельного времени до начала ближайшего окна доступа из
+                self.access_windows.
+        :return: время в секундах (double), 0 - если текущее модельное время входит в окно доступа. Если окон доступа
+            больше нет, то время до self.access_windows_final_time
+        """
+        index_of_window = bisect.bisect_left(self.access_windows_ends, self.simulation_time)
+        if index_of_window == len(self.access_windows):
+            return (self.access_windows_final_time - self.simulation_time).total_seconds()
+        return max((self.access_windows[index_of_window][0] - self.simulation_time).total_seconds(), 0)
+
+    def to_skip_to_time(self, next_simulation_time):
+        """
+        @Описание:
+            Метод переносит группировку в модельное время next_simulation_time без моделирования съемки. Результат тот
+                же, что и при моделировании методом self.to_act шагов, на которых вблизи спутников нет полигонов:
+                спутники перемещаются, полосы захвата и время сеанса сканирования обнуляются.
+        :param next_simulation_time: модельное время, в которое переносится группировка (datetime).
+        :return: перемещает спутники в модельное время next_simulation_time
+        """
+        self.to_move_to_time(next_simulation_time)
         for satellite in self.satellites_list:
-            (pos_x, pos_y, pos_z), (vel_x, vel_y, vel_z) = satellite.orbit.get_position(simulation_time,
-                                                                                        normalize=False)
-            satellite.satellite_coordinates_set = SatelliteCoordinateSet(Coordinates.CartesianCoordinates
-                                                                         (pos_x, pos_y, pos_z),
-                                                                         AnalyticGeometry.Vector(vel_x, vel_y, vel_z),
-                                                                         simulation_time,
-                                                                         self.earth_ellipsoid)
+            satellite.close_polygons = []
+            satellite.scanned_territory_for_last_step = []
+        self.time_of_scanning = 0
+        self.simulation_time = next_simulation_time
 
     def __str__(self):
         """
@@ -189,6 +764,8 @@ class Satellite:
         angle_of_view - угол обзора гиперспектрометра, базирующегося на спутнике с названием sat_name (градусы).
         satellites_group - объект SatelliteGroup - группа спутников, в который входит моделируемый спутник.
             Предполагается, что создаваемый объект Satellite инициируется методом именно этого объекта.
+        tle - объект Tle из pyorbital с уже прочитанными данными TLE спутника (например, из TleCatalog). Допустимо
+            значение None (по умолчанию) - тогда данные TLE читаются по адресу tle_address.
 
     @Поля:
         sat_name - название спутника. Название должно совпадать с названием спутниа в системе NORAD. Присваивается
@@ -198,35 +775,56 @@ class Satellite:
             в системе NORAD. Если значение аргумента sat_name - None, то данные TLE загружаются с веб-сайта
             celestrak.com для спутника под названием из аргумента sat_name. Если аргумент sat_name не задан или задан
             неправильно, то определение объекта Orbital невозможно. Создается при инициализации.
+        tle - объект Tle из pyorbital, содержащий данные TLE моделируемого спутника. Задается аргументом tle или
+            читается при инициализации.
         satellite_coordinate_set - объект SatelliteCoordinateSet, содержащий важнейшие координаты моделируемого
-            спутника. При инициалиции - None. Обновляется методом to_move_to_time.
+            спутника. Составляется по массивам состояния группировки (SatellitesGroup.state) при обращении. Пока
+            координаты не вычислены - None. Обновляется методом SatellitesGroup.to_move_to_time.
+        coordinates_set_cache, coordinates_set_cache_key - последний составленный объект SatelliteCoordinateSet и
+            состояние группировки, по которому он составлен. При инициализации - None.
         angle_of_view - половина угла обзора гиперспектрометра в радианах, базирующегося на моделируемом спутнике.
             Задается аргументом angle_of_view разделенным пополам при инициализации в градусах и переводится в радианы
             (радианы).
         satellites_group - объект SatelliteGroup, обозначающий спутниковую группировку, в которую входит моделируемый
             спутник. Задается аргументом satellite_group при инициализации.
+        number_in_group - номер моделируемого спутника в списке satellites_group.satellites_list, по которому его
+            координаты берутся из блока эфемерид группы. Задается при инициализации.
         scanned_territory_for_last_step - список географических координат (GeoCoordinates) - вершины прямоугольника -
             часть полосы захвата, просканированные за последний шаг модельного времени. По умолчанию - пустой список.
-            Определяется методом to_determine_close_polygons(self) и может очищаться методом to_act.
+            Определяется методом SatellitesGroup.to_determine_scan_areas и очищается методами
+            SatellitesGroup.to_act и SatellitesGroup.to_skip_to_time.
         close_polygons - список полигонов, достаточно близких к моделируемому спутнику, чтобы был шанс быть
             просканированными. По умолчанию - пустой список. Задаются методом to_determine_close_polygons.
+        access_windows - список окон доступа к полигонам: i-ый элемент - список пар (начало, конец) (datetime) для i-го
+            полигона из списка полигонов задачи. При инициализации - None. Вычисляется методом
+            to_calculate_access_windows.
+        orbit_bounds - оценки сверху высоты спутника, скорости движения подспутниковой точки и скорости изменения высоты
+            из метода to_estimate_orbit_bounds, вычисленные один раз за моделирование. При инициализации - None.
+            Вычисляется методом to_calculate_time_to_close_polygons и сбрасывается методом
+            SatellitesGroup.to_set_simulation_time.
 
     @Методы:
-        to_act(self, next_simulation_time) - моделирует работу спутника от текущего модельного времени спутниковой
-            группы до времени, заданного аргументом. Возвращает площадь просканированных тестовых полигонов за время
-            моделирования.
-        to_move_to_time(self, next_time) - определяет координаты спутника в заданное время и присваивает их значения
-            моделируемому спутнику.
-        to_determine_scan_area(self, previous_coordinate, current_coordinate) - вычисление точки пересечения эллипсоида
-            Земли и прямой повернутой вокруг оси движения спутника (касательной к поверхности Земли в подспутниковой
-            точке) с заданными координатами (параллельной Земле) на заданный угол.
-        to_calculate_geo_coordinates_of_ground_point_in_field_of_view(self, satellite_coordinates_set,
-                                                                      angle_of_rotation) - вычисляет точку пересечения
-            эллипсоида Земли и прямой повернутой вокруг оси движения спутника (проекция вектора скорости спутника на
-            касательную плоскость к поверхности Земли в подспутниковой точке) с координатами спутника на заданный угол.
         to_determine_close_polygons(self) - определяет, какие полигоны из заданных, то есть тех, которые должны быть
             просканированны для решения задачи, находятся достаточно близко к моделируемому спутнику, чтобы части их
             территории могли попасть в полосу захвата моделируемого спутника.
+        to_calculate_time_to_close_polygons(self) - вычисляет время, раньше которого ни один из заданных полигонов не
+            может оказаться достаточно близко к моделируемому спутнику.
+        to_estimate_orbit_bounds(self) - вычисляет оценки сверху высоты спутника, скорости движения подспутниковой точки
+            и скорости изменения высоты по оскулирующей орбите.
+        to_calculate_access_windows(self, initial_time, final_time, step) - вычисляет для каждого полигона интервалы
+            модельного времени, вне которых полигон не может оказаться достаточно близко к моделируемому спутнику.
+        to_calculate_distances_to_reach(self, seconds_from_initial_time, initial_time, polygons_indexes, positions) -
+            вычисляет расстояния от подспутниковой точки до кругов "близости" полигонов сразу для массива моментов
+            времени.
+        to_calculate_swath_edges(self, positions, velocities, utc_times) - сразу для массива моментов времени вычисляет
+            подспутниковые точки и левую и правую границы полосы захвата по координатам и векторам скорости спутника.
+        to_determine_pass_strips(self, left_long, left_lat, right_long, right_lat, are_steps_allowed) - составляет
+            полосу захвата за весь пролет по ломаным ее границ.
+        to_determine_last_covering_step(self, left_long, left_lat, right_long, right_lat, strips_steps, points_long,
+            points_lat) - определяет последний шаг пролета, полоса захвата на котором покрывает какую-либо из точек.
+        to_determine_passes(self, ephemeris) - определяет пролеты спутника над полигонами за время блока эфемерид.
+        to_scan_pass(self, ephemeris, first, end, polygons_indexes) - моделирует съемку близких полигонов сразу за
+            целый пролет, проверяя сегменты один раз за пролет.
         to_scan(self, polygons_to_scan) - моделирует процесс съемки заданных тестовых полигонов за некоторое время.
             Производится проверка того, попадают ли сегменты близких полигонов в полосу захвата за некоторое время,
             допустимый ли в момент съемки зенитный угол Солнца, моделирует облачность или для всех полигонов, или для
@@ -237,165 +835,253 @@ class Satellite:
     # Ускорение работы объектов класса
     #import pyximport; pyximport.install()
 
-    def __init__(self, sat_name, tle_address, angle_of_view, satellites_group):
+    # Коэффициент запаса для оценки сверху скорости движения подспутниковой точки
+    GROUND_SPEED_SAFETY_FACTOR = 1.2
+    # Запас для оценки сверху высоты спутника над поверхностью Земли (км)
+    ALTITUDE_MARGIN = 50
+    # Шаг грубой сетки моментов времени при поиске окон доступа (секунды)
+    ACCESS_WINDOWS_COARSE_STEP = 60
+    # Запас функции "близости" при поиске окон доступа, покрывающий погрешности вычислений (км)
+    ACCESS_WINDOWS_DISTANCE_MARGIN = 10
+    # Наибольшее количество значений функции "близости" (моментов грубой сетки, умноженных на количество полигонов),
+    #   вычисляемых за один раз при поиске окон доступа
+    ACCESS_WINDOWS_CHUNK_SIZE = 1000000
+
+    def __init__(self, sat_name, tle_address, angle_of_view, satellites_group, tle=None):
         self.sat_name = sat_name
         # Извлечение данных TLE из файла по адресу tle_address или загрузка с celestrak.com для спутника sat_name, если
-        #   tle_address is None
-        tle = tlefile.read(sat_name, tle_address)
+        #   tle_address is None (если данные TLE не прочитаны заранее)
+        if tle is None:
+            tle = tlefile.read(sat_name, tle_address)
+        self.tle = tle
         # Создание объекта Orbital из пакета pyorbital
-        self.orbit = orbital.Orbital(self.sat_name, line1=tle.line1, line2=tle.line2)
-        self.satellite_coordinates_set = None
+        self.orbit = orbital.Orbital(self.sat_name, line1=self.tle.line1, line2=self.tle.line2)
+        self.coordinates_set_cache = None
+        self.coordinates_set_cache_key = None
         # Перевод в радианы
         self.half_angle_of_view = math.pi * angle_of_view / 360
         self.satellites_group = satellites_group
+        self.number_in_group = len(satellites_group.satellites_list)
         self.scanned_territory_for_last_step = []
         self.close_polygons = []
+        self.access_windows = None
+        self.orbit_bounds = None
 
-    def to_act(self, next_simulation_time):
+    @property
+    def satellite_coordinates_set(self):
         """
         @Описание:
-            Метод моделирует работу спутника от текущего модельного времени группы
-                (self.satellite_group.simulation_time) до времени, заданного аргументом next_simulation_time. В процесс
-                моделирования входит моделиросвание движения моделируемого спутника, его полосы захвата, процесса
-                съемки. Возвращает площадь просканированных тестовых полигонов за время моделирования в кв. м.
-        :param next_simulation_time: время, до которого проходит моделирование. Следует использовать время не далекое от
-            модельного, так как спутник между двумя координатами, сответствующих начальному и конечному времени
-            моделирования, будет двигаться прямолинейно.
-        :return: площадь просканированных тестовых полигонов за время моделирования (кв. м).
+            Координаты моделируемого спутника в текущем состоянии группировки в виде объекта SatelliteCoordinateSet.
+                Объект составляется по строке массивов self.satellites_group.state только при первом обращении после
+                изменения состояния.
+        :return: объект SatelliteCoordinateSet или None, если координаты спутника еще не вычислены
         """
-        # Сохранение координат моделируемого спутника в начальное время моделирования
-        current_coordinates_set = self.satellite_coordinates_set
-        # Моделирование движения спутника
-        self.to_move_to_time(next_simulation_time)
-        next_coordinates_set = self.satellite_coordinates_set
-        # Определение полигонов достаточно близких моделируемому спутнику, чтобы быть просканированными
-        self.to_determine_close_polygons()
-        # Проверка, есть ли вблизи тестовые полигоны
-        if len(self.close_polygons) > 0:
-            # Если да, то
-            #   Моделирование полосы захвата (по прямой линии между точками на орбите)
-            self.to_determine_scan_area(current_coordinates_set, next_coordinates_set)
-            #   Моделируется сканирование близких полигонов и возвращается площадь
-            return self.to_scan()
-        else:
-            # Если нет то
-            #   очищается поле просканированной территории
-            if len(self.scanned_territory_for_last_step) > 0:
-                self.scanned_territory_for_last_step = []
-            #   возвращается 0
-            return 0
+        state = self.satellites_group.state
+        if state.utc_time is None:
+            return None
+        if self.coordinates_set_cache_key is None or self.coordinates_set_cache_key[0] is not state or \
+                self.coordinates_set_cache_key[1] != state.version:
+            self.coordinates_set_cache = state.to_make_satellite_coordinate_set(self.number_in_group,
+                                                                                self.satellites_group.earth_ellipsoid)
+            self.coordinates_set_cache_key = (state, state.version)
+        return self.coordinates_set_cache
 
-    def to_move_to_time(self, next_time):
+    def to_calculate_swath_edges(self, positions, velocities, utc_times):
         """
         @Описание:
-            Метод определяет координаты спутника во время next_time и присваивает их значения моделируемому спутнику.
-        :param next_time: время в формате UTC в которое определяются координаты моделируемого спутника.
-        :return: координаты в объекте класса SatelliteCoordinatesSet записываются в self.satellite_coordinates_set
-        """
-        #start_time = datetime.now()
-        (pos_x, pos_y, pos_z), (vel_x, vel_y, vel_z) = self.orbit.get_position(next_time, normalize=False)
-        #print((datetime.now() - start_time).total_seconds())
-        self.satellite_coordinates_set = SatelliteCoordinateSet(Coordinates.CartesianCoordinates(pos_x, pos_y, pos_z),
-                                                                AnalyticGeometry.Vector(vel_x, vel_y, vel_z),
-                                                                next_time,
-                                                                self.satellites_group.earth_ellipsoid)
-
-    def to_determine_scan_area(self, current_coordinates, next_coordinates):
-        """
-        @Описание:
-            Определяет полосу захвата моделируемого спутника при прямолинейном движении спутника между точками с
-                координатами current_coordinates и next_coordinates. Результат записывается в поле
-                self.scanned_territory_for_last_step в виде списка геосоординат (GeoCoordinates).
-        :param current_coordinates: координаты моделируемого спутника в начальной точке (SatelliteCoordinatesSet).
-        :param next_coordinates: координаты моделируемого спутника в конечной точке (SatelliteCoordinatesSet).
-        :return: полоса захвата записывается в поле self.scanned_territory_for_last_step в виде объекта
-        shapely.geometry.Polygon.
-        """
-        # Если на прошлом шагу не было сканирования
-        if len(self.scanned_territory_for_last_step) == 0:
-            # Вычисление вектора-надира для спутника с координатами current_coordinate
-            #   Декартовые координаты спутника в экватериальной системе координат
-            current_sat_x = current_coordinates.cartesian_coordinates.x
-            current_sat_y = current_coordinates.cartesian_coordinates.y
-            current_sat_z = current_coordinates.cartesian_coordinates.z
-            # Радиус-вектор спутника
-            current_sat_coordinates_vector = AnalyticGeometry.Vector(current_sat_x, current_sat_y, current_sat_z)
-            #   Вычисление вектора, указывающего направление надира для спутника
-            current_vector_to_ground_x = current_coordinates.subsatellite_cartesian_coordinates.x - current_sat_x
-            current_vector_to_ground_y = current_coordinates.subsatellite_cartesian_coordinates.y - current_sat_y
-            current_vector_to_ground_z = current_coordinates.subsatellite_cartesian_coordinates.z - current_sat_z
-            current_nadir_vector = AnalyticGeometry.Vector(current_vector_to_ground_x,
-                                                           current_vector_to_ground_y,
-                                                           current_vector_to_ground_z)
-            # Вычисление границ полосы захвата для текущего положения спутника
-            left_current_swath_border = self.to_calculate_geo_coordinates_of_ground_point_in_field_of_view(
-                current_sat_coordinates_vector, current_coordinates.velocity_vector, current_nadir_vector,
-                self.half_angle_of_view)
-            right_current_swath_border = self.to_calculate_geo_coordinates_of_ground_point_in_field_of_view(
-                current_sat_coordinates_vector, current_coordinates.velocity_vector, current_nadir_vector,
-                -self.half_angle_of_view)
-        # Если было
-        else:
-            # Текущими границами полосы захвата становятся следующие границы на предыдущем шаге
-            left_current_swath_border = self.scanned_territory_for_last_step[3]
-            right_current_swath_border = self.scanned_territory_for_last_step[2]
-
-        # Вычисление вектора-надира для спутника с координатами next_coordinates
-        #   Декартовые координаты спутника в экватериальной системе координат
-        next_sat_x = next_coordinates.cartesian_coordinates.x
-        next_sat_y = next_coordinates.cartesian_coordinates.y
-        next_sat_z = next_coordinates.cartesian_coordinates.z
-        # Радиус-вектор спутника
-        next_sat_coordinates_vector = AnalyticGeometry.Vector(next_sat_x, next_sat_y, next_sat_z)
-        #   Вычисление вектора, указывающего направление надира для спутника
-        next_vector_to_ground_x = next_coordinates.subsatellite_cartesian_coordinates.x - next_sat_x
-        next_vector_to_ground_y = next_coordinates.subsatellite_cartesian_coordinates.y - next_sat_y
-        next_vector_to_ground_z = next_coordinates.subsatellite_cartesian_coordinates.z - next_sat_z
-        next_nadir_vector = AnalyticGeometry.Vector(next_vector_to_ground_x,
-                                                    next_vector_to_ground_y,
-                                                    next_vector_to_ground_z)
-        # Вычисление границ полосы захвата для следующего положения спутника
-        right_next_swath_border = self.to_calculate_geo_coordinates_of_ground_point_in_field_of_view(
-            next_sat_coordinates_vector, next_coordinates.velocity_vector, next_nadir_vector, -self.half_angle_of_view)
-        left_next_swath_border = self.to_calculate_geo_coordinates_of_ground_point_in_field_of_view(
-            next_sat_coordinates_vector, next_coordinates.velocity_vector, next_nadir_vector, self.half_angle_of_view)
-        # Определение углов прямоугольной полосы захвата с помощью метода
-        #   self.to_calculate_geo_coordinates_of_ground_point_in_field_of_view
-        vertices = [left_current_swath_border, right_current_swath_border, right_next_swath_border,
-                    left_next_swath_border]
-        self.scanned_territory_for_last_step = vertices
-
-    def to_calculate_geo_coordinates_of_ground_point_in_field_of_view(self, sat_vector, velocity_vector, nadir_vector,
-                                                                      angle_of_rotation):
-        """
-
-        @Описание:
-            Вычисление координаты точки на Земле, в которую направлен вектор повернутый от надира спутника в сторону от
-            его движения параллельно эллипсоиду Земли на заданный угол.
-        :param sat_vector: координаты спутника (Coordinates.CartesianCoordinates)
-        :param velocity_vector: вектор скорости спутника (AnalyticGeometry.Vector)
-        :param nadir_vector: вектор-надир для спутника (Vector)
-        :param angle_of_rotation: угол поворота в градусах (int, double)
-        :return: Широту и долготу искомой точки (int, double) (в скобках для того, чтобы записать в объект Polygon)
-        """
-        # Вычисление координат вектора - оси вращения, вокруг которой будет вращаться вектор-надир, чтобы найти вектор
-        #   движения спутника параллельно плоскости эллипсоида Земли
-        rot_axis = nadir_vector * velocity_vector
-        # Вычисление координат вектора с помощью вращения движения спутника параллельно плоскости эллипсоида Земли
-        parallel_mov_vector = nadir_vector.to_rotate_vector(rot_axis, 90)
-        # Вычисление вектора, направленного в искомую точку с помощью вращения
-        vector_to_searched_point = nadir_vector.to_rotate_vector(parallel_mov_vector, angle_of_rotation)
-        # Вычисление координат искомой точки по пересечения vector_to_searched_point и
-        #   self.satellites_group.canon_ellipsoid
-        searched_point = AnalyticGeometry. \
-            to_found_point_of_intersection_of_line_and_canonical_ellipsoid_nearest_to_stating_point_of_line(
-                AnalyticGeometry.Line(sat_vector, vector_to_searched_point), self.satellites_group.canon_ellipsoid)
-        # Перевод декартовых  координат в географческие и вывод в виде объекта geometry.Point
-        geo_coordinates_of_search_point = Coordinates.CartesianCoordinates(searched_point.x,
-                                                                           searched_point.y,
-                                                                           searched_point.z). \
-            to_geo_coordinates(self.satellites_group.simulation_time, self.satellites_group.earth_ellipsoid)
-        return geo_coordinates_of_search_point
+            Метод сразу для всех заданных моментов времени вычисляет подспутниковые точки и левую и правую границы
+                полосы захвата моделируемого спутника (точки на Земле, в которые направлены векторы, повернутые от
+                надира на +-self.half_angle_of_view) по заданным координатам и векторам скорости спутника (например, из
+                блока эфемерид группы). Границы вычисляются одним вызовом
+                SatellitesGroup.to_calculate_ground_points_of_arrays. Перевод в географические координаты производится в
+                тот же момент времени, для которого заданы координаты.
+        :param positions: массив numpy координат спутника (км) размера (len(utc_times), 3).
+        :param velocities: массив numpy векторов скорости спутника (км/с) размера (len(utc_times), 3).
+        :param utc_times: массив numpy.datetime64 моментов времени.
+        :return: массивы numpy долгот и широт подспутниковых точек, долгот и широт левой границы полосы захвата и долгот
+            и широт правой границы полосы захвата (градусы)
+        """
+        earth_ellipsoid = self.satellites_group.earth_ellipsoid
+        long, lat, alt = Coordinates.to_geo_coordinates_of_arrays(positions[:, 0], positions[:, 1], positions[:, 2],
+                                                                  utc_times, earth_ellipsoid)
+        subsatellite_positions = numpy.stack(Coordinates.to_cartesian_coordinates_of_arrays(
+            long, lat, numpy.zeros(len(long)), utc_times, earth_ellipsoid), axis=1)
+        count_of_times = len(utc_times)
+        # Левые и правые границы вычисляются одним вызовом (сначала левые, затем правые)
+        edges_long, edges_lat, edges_alt = self.satellites_group.to_calculate_ground_points_of_arrays(
+            numpy.concatenate((positions, positions)), numpy.concatenate((velocities, velocities)),
+            numpy.concatenate((subsatellite_positions, subsatellite_positions)),
+            numpy.concatenate((numpy.full(count_of_times, self.half_angle_of_view),
+                               numpy.full(count_of_times, -self.half_angle_of_view))),
+            numpy.concatenate((utc_times, utc_times)))
+        return long, lat, edges_long[:count_of_times], edges_lat[:count_of_times], edges_long[count_of_times:], \
+            edges_lat[count_of_times:]
+
+    def to_determine_pass_strips(self, left_long, left_lat, right_long, right_lat, are_steps_allowed):
+        """
+        @Описание:
+            Метод составляет полосу захвата за весь пролет в виде многоугольников shapely, ограниченных ломаными левой
+                и правой границ полосы захвата. i-ый шаг - движение спутника между (i - 1)-ой и i-ой точками границ.
+                Полоса разрывается на шагах, съемка на которых недопустима (are_steps_allowed), и там, где границы
+                пересекают антимеридиан (долгота меняется больше, чем на 180 градусов).
+        :param left_long: массив numpy долгот левой границы полосы захвата (градусы).
+        :param left_lat: массив numpy широт левой границы полосы захвата (градусы).
+        :param right_long: массив numpy долгот правой границы полосы захвата (градусы).
+        :param right_lat: массив numpy широт правой границы полосы захвата (градусы).
+        :param are_steps_allowed: массив numpy (boolean) на один элемент короче массивов границ - допустима ли съемка на
+            шаге.
+        :return: список объектов shapely.geometry.Polygon, подготовленных к многократной проверке принадлежности точек,
+            и список пар (номер первого шага, номер шага, следующего за последним) серий шагов, по которым они
+            составлены
+        """
+        are_steps_allowed = are_steps_allowed & (numpy.abs(numpy.diff(left_long)) <= 180) & \
+            (numpy.abs(numpy.diff(right_long)) <= 180)
+        # Начала и концы серий допустимых шагов подряд
+        changes = numpy.diff(numpy.concatenate(([0], are_steps_allowed.astype(int), [0])))
+        begins = numpy.flatnonzero(changes == 1)
+        ends = numpy.flatnonzero(changes == -1)
+        strips = []
+        strips_steps = []
+        for begin, end in zip(begins.tolist(), ends.tolist()):
+            # Точки границ от начала первого шага серии до конца последнего: левая граница вперед, правая - назад
+            strip = geometry.Polygon(numpy.concatenate((
+                numpy.stack((left_long[begin:end + 1], left_lat[begin:end + 1]), axis=1),
+                numpy.stack((right_long[begin:end + 1], right_lat[begin:end + 1]), axis=1)[::-1])))
+            shapely.prepare(strip)
+            strips.append(strip)
+            strips_steps.append((begin, end))
+        return strips, strips_steps
+
+    def to_determine_last_covering_step(self, left_long, left_lat, right_long, right_lat, strips_steps, points_long,
+                                        points_lat):
+        """
+        @Описание:
+            Метод определяет последний шаг пролета, полоса захвата на котором покрывает какую-либо из заданных точек
+                (например, центров просканированных сегментов). Серии шагов из self.to_determine_pass_strips
+                просматриваются с конца. Часть полосы от шага s до конца серии покрывает какую-либо точку тем реже, чем
+                больше s, поэтому последний такой шаг в серии находится делением пополам, составляя многоугольник
+                только для логарифмического от длины серии количества частей полосы.
+        :param left_long: массив numpy долгот левой границы полосы захвата (градусы).
+        :param left_lat: массив numpy широт левой границы полосы захвата (градусы).
+        :param right_long: массив numpy долгот правой границы полосы захвата (градусы).
+        :param right_lat: массив numpy широт правой границы полосы захвата (градусы).
+        :param strips_steps: список пар (номер первого шага, номер шага, следующего за последним) серий шагов,
+            возвращенный методом self.to_determine_pass_strips.
+        :param points_long: массив numpy долгот точек (градусы).
+        :param points_lat: массив numpy широт точек (градусы).
+        :return: номер шага (int) - i-ый шаг заканчивается в (i + 1)-ой точке границ, или None, если ни одна точка не
+            покрыта полосой захвата
+        """
+        if len(points_long) == 0:
+            return None
+
+        def to_check_covering(begin, end):
+            # Покрывает ли часть полосы с шага begin до конца серии end какую-либо точку
+            part = geometry.Polygon(numpy.concatenate((
+                numpy.stack((left_long[begin:end + 1], left_lat[begin:end + 1]), axis=1),
+                numpy.stack((right_long[begin:end + 1], right_lat[begin:end + 1]), axis=1)[::-1])))
+            return bool(numpy.any(shapely.contains_xy(part, points_long, points_lat)))
+
+        for begin, end in reversed(strips_steps):
+            if not to_check_covering(begin, end):
+                continue
+            # Наибольший шаг серии, с которого часть полосы еще покрывает какую-либо точку
+            low, high = begin, end - 1
+            while low < high:
+                middle = (low + high + 1) // 2
+                if to_check_covering(middle, end):
+                    low = middle
+                else:
+                    high = middle - 1
+            return low
+        return None
+
+    def to_determine_passes(self, ephemeris):
+        """
+        @Описание:
+            Метод определяет пролеты моделируемого спутника за время блока эфемерид ephemeris. Пролет - серия шагов
+                модельного времени подряд, в конце которых какой-либо полигон близок к спутнику (в смысле метода
+                self.to_determine_close_polygons). Первый момент времени блока считается концом шага, уже
+                смоделированного ранее, поэтому пролеты начинаются не раньше первого шага блока.
+        :param ephemeris: блок эфемерид группировки (Ephemeris), координаты спутника берутся из него.
+        :return: список пролетов - кортежей (моделируемый спутник, номер момента времени начала первого шага пролета в
+            блоке, номер момента времени, следующего за концом последнего шага, массив numpy номеров полигонов, близких
+            к спутнику на каком-либо шаге пролета)
+        """
+        seconds_from_initial_time = numpy.arange(ephemeris.count_of_steps) * ephemeris.step
+        are_close = self.to_calculate_distances_to_reach(seconds_from_initial_time, ephemeris.initial_time,
+                                                         positions=ephemeris.positions[:, self.number_in_group]) < 0
+        are_close[0] = False
+        # Начала и концы пролетов
+        changes = numpy.diff(numpy.concatenate(([0], numpy.any(are_close, axis=1).astype(int), [0])))
+        passes_begins = numpy.flatnonzero(changes == 1)
+        passes_ends = numpy.flatnonzero(changes == -1)
+        passes = []
+        for begin, end in zip(passes_begins.tolist(), passes_ends.tolist()):
+            # Полоса захвата на первом шаге пролета начинается в предыдущий момент времени, как и при моделировании по
+            #   шагам
+            passes.append((self, begin - 1, end, numpy.flatnonzero(numpy.any(are_close[begin:end], axis=0))))
+        return passes
+
+    def to_scan_pass(self, ephemeris, first, end, polygons_indexes):
+        """
+        @Описание:
+            Метод моделирует съемку полигонов за целый пролет моделируемого спутника. По координатам спутника из блока
+                эфемерид одним вызовом вычисляются ломаные левой и правой границ полосы захвата
+                (self.to_calculate_swath_edges), по ним составляется полоса захвата за весь пролет
+                (self.to_determine_pass_strips) без шагов, на которых зенитный угол Солнца недопустим, и принадлежность
+                полосе проверяется сразу для всех сегментов каждого близкого полигона. Сегмент, попавший в полосу,
+                считается просканированным один раз за пролет (а не на каждом шаге, как в self.to_scan). Облачность
+                задается один раз в начале пролета. Последний шаг, на котором были просканированы сегменты, определяется
+                методом self.to_determine_last_covering_step.
+        :param ephemeris: блок эфемерид группировки (Ephemeris).
+        :param first: номер момента времени начала первого шага пролета в блоке (int).
+        :param end: номер момента времени, следующего за концом последнего шага пролета (int).
+        :param polygons_indexes: массив numpy номеров полигонов, близких к спутнику во время пролета.
+        :return: площадь просканированной территории (кв. м) и номер момента времени в блоке - конца последнего шага
+            пролета, на котором были просканированы сегменты (int), или None, если сегменты не просканированы
+        """
+        task = self.satellites_group.task
+        polygons_list = task.polygons_group.polygons_list
+        # Генератор случайных чисел задачи, если учитывается частичная облачность
+        random_generator = task.random_generator if task.to_consider_partial_cloudiness else None
+        pass_times = to_make_time_grid(ephemeris.initial_time + timedelta(seconds=first * ephemeris.step),
+                                       ephemeris.step, end - first)
+        task.polygons_group.to_calculate_cloudiness_above_group(ephemeris.initial_time +
+                                                                timedelta(seconds=first * ephemeris.step),
+                                                                task.random_generator)
+        long, lat, left_long, left_lat, right_long, right_lat = self.to_calculate_swath_edges(
+            ephemeris.positions[first:end, self.number_in_group], ephemeris.velocities[first:end, self.number_in_group],
+            pass_times)
+        # Съемка на шаге допустима, если допустим зенитный угол Солнца в подспутниковой точке в конце шага
+        are_steps_allowed = astronomy.sun_zenith_angle(pass_times[1:], long[1:], lat[1:]) <= task.max_zenith_angle
+        strips, strips_steps = self.to_determine_pass_strips(left_long, left_lat, right_long, right_lat,
+                                                             are_steps_allowed)
+        scanned_area = 0
+        if len(strips) == 0:
+            return scanned_area, None
+        # Центры просканированных сегментов (не закрытых облаками) всех полигонов
+        grabbed_long = [numpy.zeros(0)]
+        grabbed_lat = [numpy.zeros(0)]
+        for index_of_polygon in polygons_indexes.tolist():
+            polygon = polygons_list[index_of_polygon]
+            if polygon.current_cloudiness_in_score > task.max_cloud_score:
+                continue
+            are_covered = numpy.zeros(polygon.count_of_segments, dtype=bool)
+            for strip in strips:
+                are_covered |= shapely.contains_xy(strip, polygon.segments_long, polygon.segments_lat)
+            covered_indexes = numpy.flatnonzero(are_covered)
+            counts_of_grabs = polygon.segments_count_of_grabs[covered_indexes]
+            scanned_area = polygon.to_grab_segments(covered_indexes, random_generator, scanned_area)
+            grabbed_indexes = covered_indexes[polygon.segments_count_of_grabs[covered_indexes] != counts_of_grabs]
+            grabbed_long.append(polygon.segments_long[grabbed_indexes])
+            grabbed_lat.append(polygon.segments_lat[grabbed_indexes])
+        last_step = self.to_determine_last_covering_step(left_long, left_lat, right_long, right_lat, strips_steps,
+                                                         numpy.concatenate(grabbed_long),
+                                                         numpy.concatenate(grabbed_lat))
+        if last_step is None:
+            return scanned_area, None
+        return scanned_area, first + last_step + 1
 
     def to_determine_close_polygons(self):
         """
@@ -407,20 +1093,219 @@ class Satellite:
         :return: близкие к подспутниковой точке полигоны записываются в список близких к моделируемуму спутнику
                  полигонов.
         """
-        # Создание пустого списка
-        close_polygons = []
-        # Обход всех заданных полигонов, проверка на "близость" к моделируемому спутнику
-        for polygon in self.satellites_group.task.polygons_group.polygons_list:
-            # Вычисление расстояния от подспутниковой точки до центра полигона и сравнение с суммой расстояния от
-            #   подспутниковой точки до края полосы захвата с радиусом выбранного полигона, умноженная на 110% (критерий
-            #   близости)
-            if (self.satellites_group.earth_ellipsoid.dist_between_geo_coordinates(
-                    polygon.center.geo_coordinates, self.satellite_coordinates_set.geo_coordinates) < 1.1 *
-                    (polygon.radius + self.satellite_coordinates_set.geo_coordinates.alt *
-                     math.tan(self.half_angle_of_view))):
-                close_polygons.append(polygon)
+        polygons_group = self.satellites_group.task.polygons_group
+        geo_coordinates = self.satellite_coordinates_set.geo_coordinates
+        # Расстояние от подспутниковой точки до центра полигона сравнивается с суммой расстояния от подспутниковой точки
+        #   до края полосы захвата с радиусом полигона, умноженной на 110% (критерий близости). Проверяются только
+        #   полигоны, выбранные по пространственному индексу центров полигонов
+        close_indexes = polygons_group.to_get_centers_index().to_find_close_polygons_indexes(
+            numpy.array([geo_coordinates.long]), numpy.array([geo_coordinates.lat]), numpy.array([geo_coordinates.alt]),
+            numpy.array([math.tan(self.half_angle_of_view)]))[0]
+        close_polygons = [polygons_group.polygons_list[j] for j in close_indexes.tolist()]
         self.close_polygons = close_polygons
 
+    def to_calculate_time_to_close_polygons(self):
+        """
+        @Описание:
+            Метод вычисляет время от текущего положения спутника, раньше которого ни один из заданных полигонов не может
+                оказаться достаточно близко к моделируемому спутнику (в смысле метода self.to_determine_close_polygons).
+                Время до полигона - это расстояние до края круга "близости" полигона, деленное на оценку сверху
+                скорости движения подспутниковой точки (см. метод self.to_estimate_orbit_bounds). Оценки орбиты
+                вычисляются один раз за моделирование и хранятся в self.orbit_bounds, расстояния до всех полигонов
+                вычисляются сразу по массивам центров из пространственного индекса группы полигонов.
+        :return: время в секундах (double), 0 - если какой-либо полигон уже может быть близок к спутнику
+        """
+        earth_ellipsoid = self.satellites_group.earth_ellipsoid
+        centers_index = self.satellites_group.task.polygons_group.to_get_centers_index()
+        if self.orbit_bounds is None:
+            self.orbit_bounds = self.to_estimate_orbit_bounds()
+        max_altitude, max_ground_speed, max_altitude_rate = self.orbit_bounds
+        max_swath_reach = max_altitude * math.tan(self.half_angle_of_view)
+        geo_coordinates = self.satellite_coordinates_set.geo_coordinates
+        # Поиск наименьшего времени до края круга "близости" (с тем же множителем 110%, что и в
+        #   self.to_determine_close_polygons)
+        distances_to_reach = earth_ellipsoid.to_calculate_dists_between_geo_coordinates_of_arrays(
+            centers_index.centers_long, centers_index.centers_lat, geo_coordinates.long, geo_coordinates.lat) - \
+            1.1 * (centers_index.radiuses + max_swath_reach)
+        min_distance_to_reach = float(numpy.min(distances_to_reach, initial=math.inf))
+        if min_distance_to_reach <= 0:
+            return 0
+        return min_distance_to_reach / max_ground_speed
+
+    def to_estimate_orbit_bounds(self):
+        """
+        @Описание:
+            Метод по вектору скорости и координатам спутника в текущее модельное время определяет большую полуось и
+                эксцентриситет оскулирующей орбиты, а по ним - оценки сверху высоты спутника над поверхностью Земли (в
+                апогее), скорости движения подспутниковой точки (угловая скорость в перигее, сложенная с угловой
+                скоростью вращения Земли) и скорости изменения высоты спутника (радиальная скорость и изменение
+                расстояния до поверхности эллипсоида Земли с широтой).
+        :return: оценка сверху высоты спутника (км), скорости подспутниковой точки (км/с) и скорости изменения высоты
+            (км/с)
+        """
+        earth_ellipsoid = self.satellites_group.earth_ellipsoid
+        cartesian_coordinates = self.satellite_coordinates_set.cartesian_coordinates
+        velocity_vector = self.satellite_coordinates_set.velocity_vector
+        # Расстояние до центра Земли (км) и квадрат скорости (км^2/с^2)
+        radius = math.sqrt(cartesian_coordinates.x ** 2 + cartesian_coordinates.y ** 2 + cartesian_coordinates.z ** 2)
+        velocity_square = velocity_vector.scalar_product(velocity_vector)
+        radial_velocity = (cartesian_coordinates.x * velocity_vector.x + cartesian_coordinates.y * velocity_vector.y +
+                           cartesian_coordinates.z * velocity_vector.z)
+        gm = earth_ellipsoid.GM_WGS_84
+        # Большая полуось и эксцентриситет оскулирующей орбиты
+        semi_major_axis = 1 / (2 / radius - velocity_square / gm)
+        eccentricity_vector_coef_r = velocity_square / gm - 1 / radius
+        eccentricity_vector_coef_v = radial_velocity / gm
+        eccentricity = math.sqrt(
+            (eccentricity_vector_coef_r * cartesian_coordinates.x -
+             eccentricity_vector_coef_v * velocity_vector.x) ** 2 +
+            (eccentricity_vector_coef_r * cartesian_coordinates.y -
+             eccentricity_vector_coef_v * velocity_vector.y) ** 2 +
+            (eccentricity_vector_coef_r * cartesian_coordinates.z -
+             eccentricity_vector_coef_v * velocity_vector.z) ** 2)
+        # Оценка сверху высоты спутника над поверхностью эллипсоида Земли
+        max_altitude = semi_major_axis * (1 + eccentricity) - earth_ellipsoid.semi_minor_axis + self.ALTITUDE_MARGIN
+        # Оценка сверху скорости движения подспутниковой точки (км/с)
+        perigee_radius = semi_major_axis * (1 - eccentricity)
+        max_orbital_angular_velocity = math.sqrt(gm * (1 + eccentricity) / perigee_radius) / perigee_radius
+        max_angular_velocity = max_orbital_angular_velocity + earth_ellipsoid.ANGULAR_VELOCITY_WGS_84
+        max_ground_speed = self.GROUND_SPEED_SAFETY_FACTOR * earth_ellipsoid.semi_major_axis * max_angular_velocity
+        # Оценка сверху скорости изменения высоты (км/с)
+        max_radial_velocity = eccentricity * math.sqrt(gm / (semi_major_axis * (1 - eccentricity ** 2)))
+        max_altitude_rate = self.GROUND_SPEED_SAFETY_FACTOR * \
+            (max_radial_velocity +
+             (earth_ellipsoid.semi_major_axis - earth_ellipsoid.semi_minor_axis) * max_orbital_angular_velocity)
+        return max_altitude, max_ground_speed, max_altitude_rate
+
+    def to_calculate_access_windows(self, initial_time, final_time, step):
+        """
+        @Описание:
+            Метод вычисляет для каждого заданного полигона окна доступа - интервалы модельного времени от initial_time
+                до final_time, вне которых полигон заведомо не может оказаться достаточно близко к моделируемому
+                спутнику (в смысле метода self.to_determine_close_polygons). Функция "близости" (расстояние от
+                подспутниковой точки до центра полигона за вычетом радиуса круга "близости") вычисляется сразу для всех
+                моментов времени с шагом ACCESS_WINDOWS_COARSE_STEP частями не больше чем по
+                ACCESS_WINDOWS_CHUNK_SIZE значений. Затем интервалы, на которых функция с учетом оценки сверху
+                скорости ее изменения может стать меньше ACCESS_WINDOWS_DISTANCE_MARGIN, делятся пополам, пока их длина
+                не станет меньше шага step. Оставшиеся интервалы объединяются в окна доступа.
+        :param initial_time: начало интервала модельного времени (datetime).
+        :param final_time: конец интервала модельного времени (datetime).
+        :param step: шаг модельного времени, с точностью до которого определяются окна доступа (секунды).
+        :return: в поле self.access_windows записывается список, каждый элемент которого соответствует полигону из
+            self.satellites_group.task.polygons_group.polygons_list с тем же номером и является списком окон доступа в
+            виде пар (начало, конец) (datetime)
+        """
+        polygons_list = self.satellites_group.task.polygons_group.polygons_list
+        max_altitude, max_ground_speed, max_altitude_rate = self.to_estimate_orbit_bounds()
+        # Оценка сверху скорости изменения функции "близости" (км/с)
+        max_rate = max_ground_speed + 1.1 * math.tan(self.half_angle_of_view) * max_altitude_rate
+        # Грубая сетка моментов времени (секунды от initial_time)
+        duration = (final_time - initial_time).total_seconds()
+        coarse_step = max(self.ACCESS_WINDOWS_COARSE_STEP, step)
+        count_of_coarse_steps = int(math.ceil(duration / coarse_step)) + 1
+        coarse_times = numpy.arange(count_of_coarse_steps) * coarse_step
+        # Грубая сетка обрабатывается частями не больше чем по ACCESS_WINDOWS_CHUNK_SIZE значений функции "близости",
+        #   чтобы память не зависела от длины интервала модельного времени
+        count_of_intervals_in_chunk = max(self.ACCESS_WINDOWS_CHUNK_SIZE // max(len(polygons_list), 1), 1)
+        windows_begins = []
+        windows_ends = []
+        windows_polygons_indexes = []
+        for first_interval in range(0, count_of_coarse_steps - 1, count_of_intervals_in_chunk):
+            last_interval = min(first_interval + count_of_intervals_in_chunk, count_of_coarse_steps - 1)
+            chunk_times = coarse_times[first_interval:last_interval + 1]
+            distances_to_reach = self.to_calculate_distances_to_reach(chunk_times, initial_time)
+            # Интервалы-кандидаты для всех полигонов: начало, конец, значения функции "близости" на концах, номер
+            #   полигона
+            index_of_time, polygons_indexes = numpy.meshgrid(numpy.arange(len(chunk_times) - 1),
+                                                             numpy.arange(len(polygons_list)), indexing='ij')
+            polygons_indexes = polygons_indexes.ravel()
+            begins = chunk_times[index_of_time.ravel()]
+            ends = chunk_times[index_of_time.ravel() + 1]
+            distances_at_begins = distances_to_reach[:-1].ravel()
+            distances_at_ends = distances_to_reach[1:].ravel()
+            while len(begins) > 0:
+                # Нижняя оценка функции "близости" на интервале
+                lower_bounds = (distances_at_begins + distances_at_ends - max_rate * (ends - begins)) / 2
+                are_candidates = lower_bounds < self.ACCESS_WINDOWS_DISTANCE_MARGIN
+                begins = begins[are_candidates]
+                ends = ends[are_candidates]
+                distances_at_begins = distances_at_begins[are_candidates]
+                distances_at_ends = distances_at_ends[are_candidates]
+                polygons_indexes = polygons_indexes[are_candidates]
+                # Достаточно короткие интервалы становятся частями окон доступа
+                are_short = ends - begins <= step
+                windows_begins.append(begins[are_short])
+                windows_ends.append(ends[are_short])
+                windows_polygons_indexes.append(polygons_indexes[are_short])
+                begins = begins[~are_short]
+                ends = ends[~are_short]
+                distances_at_begins = distances_at_begins[~are_short]
+                distances_at_ends = distances_at_ends[~are_short]
+                polygons_indexes = polygons_indexes[~are_short]
+                # Длинные интервалы делятся пополам
+                middles = (begins + ends) / 2
+                distances_at_middles = self.to_calculate_distances_to_reach(middles, initial_time, polygons_indexes)
+                begins, ends = numpy.concatenate((begins, middles)), numpy.concatenate((middles, ends))
+                distances_at_begins, distances_at_ends = \
+                    numpy.concatenate((distances_at_begins, distances_at_middles)), \
+                    numpy.concatenate((distances_at_middles, distances_at_ends))
+                polygons_indexes = numpy.concatenate((polygons_indexes, polygons_indexes))
+        windows_begins = numpy.concatenate(windows_begins + [numpy.zeros(0)])
+        windows_ends = numpy.concatenate(windows_ends + [numpy.zeros(0)])
+        windows_polygons_indexes = numpy.concatenate(windows_polygons_indexes + [numpy.zeros(0, dtype=int)])
+        # Части окон доступа упорядочиваются по номеру полигона, а внутри полигона - по началу, и соприкасающиеся части
+        #   объединяются за один проход
+        order = numpy.lexsort((windows_begins, windows_polygons_indexes))
+        polygons_windows = [[] for _ in range(0, len(polygons_list))]
+        for i, begin, end in zip(windows_polygons_indexes[order].tolist(), windows_begins[order].tolist(),
+                                 windows_ends[order].tolist()):
+            polygon_windows = polygons_windows[i]
+            if len(polygon_windows) > 0 and begin <= polygon_windows[-1][1]:
+                polygon_windows[-1][1] = max(polygon_windows[-1][1], end)
+            else:
+                polygon_windows.append([begin, end])
+        self.access_windows = [[(initial_time + timedelta(seconds=begin), initial_time + timedelta(seconds=end))
+                                for begin, end in polygon_windows] for polygon_windows in polygons_windows]
+
+    def to_calculate_distances_to_reach(self, seconds_from_initial_time, initial_time, polygons_indexes=None,
+                                        positions=None):
+        """
+        @Описание:
+            Метод вычисляет функцию "близости" - расстояние от подспутниковой точки до центра полигона за вычетом
+                радиуса круга "близости" из метода self.to_determine_close_polygons - сразу для массива моментов
+                времени. Функция отрицательна, если полигон близок к моделируемому спутнику.
+        :param seconds_from_initial_time: массив numpy моментов времени в секундах от initial_time.
+        :param initial_time: время, от которого отсчитываются моменты времени (datetime).
+        :param polygons_indexes: массив numpy номеров полигонов того же размера, что и seconds_from_initial_time. Если
+            None (по умолчанию), функция вычисляется для всех полигонов в каждый момент времени.
+        :param positions: массив numpy координат спутника (км) размера (количество моментов времени, 3) в эти моменты
+            времени (например, из блока эфемерид группы). Если None (по умолчанию), координаты вычисляются с помощью
+            pyorbital.
+        :return: массив numpy значений функции "близости" (км) размера (количество моментов времени, количество
+            полигонов), если polygons_indexes - None, иначе того же размера, что и seconds_from_initial_time
+        """
+        earth_ellipsoid = self.satellites_group.earth_ellipsoid
+        centers_index = self.satellites_group.task.polygons_group.to_get_centers_index()
+        times = numpy.datetime64(initial_time, 'us') + \
+            numpy.round(numpy.asarray(seconds_from_initial_time) * 1e6).astype('int64').astype('timedelta64[us]')
+        if positions is None:
+            (pos_x, pos_y, pos_z), velocity = self.orbit.get_position(times, normalize=False)
+        else:
+            pos_x, pos_y, pos_z = positions[:, 0], positions[:, 1], positions[:, 2]
+        long, lat, alt = Coordinates.to_geo_coordinates_of_arrays(pos_x, pos_y, pos_z, times, earth_ellipsoid)
+        centers_long = centers_index.centers_long
+        centers_lat = centers_index.centers_lat
+        radiuses = centers_index.radiuses
+        if polygons_indexes is None:
+            long, lat, alt = long[:, numpy.newaxis], lat[:, numpy.newaxis], alt[:, numpy.newaxis]
+        else:
+            centers_long = centers_long[polygons_indexes]
+            centers_lat = centers_lat[polygons_indexes]
+            radiuses = radiuses[polygons_indexes]
+        distances = earth_ellipsoid.to_calculate_dists_between_geo_coordinates_of_arrays(centers_long, centers_lat,
+                                                                                        long, lat)
+        return distances - 1.1 * (radiuses + alt * math.tan(self.half_angle_of_view))
+
     def to_scan(self):
         """
         @Описание:
@@ -435,31 +1320,28 @@ class Satellite:
                 прибавляется к сумме, подаваемой на выход метода.
         :return: площадь просканированной территории (кв. м)
         """
-        # Преобразование списка геокоординат self.scanned_territory_for_last_step в объект geometry.Polygon
-        scanned_polygon = geometry.Polygon([
-            (self.scanned_territory_for_last_step[0].long, self.scanned_territory_for_last_step[0].lat),
-            (self.scanned_territory_for_last_step[1].long, self.scanned_territory_for_last_step[1].lat),
-            (self.scanned_territory_for_last_step[2].long, self.scanned_territory_for_last_step[2].lat),
-            (self.scanned_territory_for_last_step[3].long, self.scanned_territory_for_last_step[3].lat)])
+        # Вершины четырехугольника полосы захвата self.scanned_territory_for_last_step
+        vertices_long = [vertex.long for vertex in self.scanned_territory_for_last_step]
+        vertices_lat = [vertex.lat for vertex in self.scanned_territory_for_last_step]
         scanned_area = 0
+        task = self.satellites_group.task
+        # Проверка, допустим ли в момент съемки зенитный угол Солнца (одна и та же для всех сегментов)
+        if astronomy.sun_zenith_angle(self.satellites_group.simulation_time,
+                                      self.satellite_coordinates_set.geo_coordinates.long,
+                                      self.satellite_coordinates_set.geo_coordinates.lat) > task.max_zenith_angle:
+            return scanned_area
+        # Генератор случайных чисел задачи, если учитывается частичная облачность
+        random_generator = task.random_generator if task.to_consider_partial_cloudiness else None
         # Обход всех близких полигонов
         for polygon in self.close_polygons:
             # Проверка, допустима ли облачность для съемки
-            if polygon.current_cloudiness_in_score <= self.satellites_group.task.max_cloud_score:
-                # Обход всех сегментов полигона
-                for segment in polygon.segments_list:
-                    # Проверка всех условий для съемки
-                    if (scanned_polygon.contains(segment.center_geo_coordinates.point)) and \
-                            (astronomy.sun_zenith_angle(self.satellites_group.simulation_time,
-                                                        self.satellite_coordinates_set.geo_coordinates.long,
-                                                        self.satellite_coordinates_set.geo_coordinates.lat)
-                             <= self.satellites_group.task.max_zenith_angle) and \
-                            (not self.satellites_group.task.to_consider_partial_cloudiness
-                             or not polygon.segment_is_hidden()):
-                        # Сегмент считается, как просканированный еще один раз
-                        segment.segment_grabbed()
-                        # Площадь сегмента суммируется с общей суммой
-                        scanned_area += segment.segments_area
+            if polygon.current_cloudiness_in_score <= task.max_cloud_score:
+                # Полоса захвата растеризуется на сетку центров сегментов полигона: проверяются только покрытые ею
+                #   ячейки сетки
+                covered_indexes = polygon.to_find_segments_indexes_in_ring(vertices_long, vertices_lat)
+                # Попавшие в полосу захвата сегменты, не закрытые случайной облачностью, считаются просканированными
+                #   еще один раз, их площадь суммируется с общей суммой
+                scanned_area = polygon.to_grab_segments(covered_indexes, random_generator, scanned_area)
         return scanned_area
 
     def __str__(self):
@@ -484,6 +1366,11 @@ class SatelliteCoordinateSet:
             AnalyticGeometry.Vector в м/с.
         utc_time - время в формате UTC, в котором находится спутник (datetime.datetime).
         earth_ellipsoid - объект EarthEllipsoid, моделирующий эллипсоид Земли, по орбите которой движется спутник.
+        geo_coordinates - координаты спутника в географической системе координат (Coordinates.GeoCoordinates). Если
+            вычислены заранее, то не вычисляются повторно. По умолчанию None.
+        subsatellite_cartesian_coordinates - координаты подспутниковой точки в прямоугольной экватериальной системе
+            координат (Coordinates.CartesianCoordinates). Если вычислены заранее, то не вычисляются повторно. По
+            умолчанию None.
 
     @Поля:
         cartesian_coordinates - декартовые координаты спутника в прямоугольной экватериальной системе координат (объект
@@ -502,11 +1389,18 @@ class SatelliteCoordinateSet:
     # Ускорение работы объектов класса
     #import pyximport; pyximport.install()
 
-    def __init__(self, cartesian_coordinates, velocity_vector, utc_time, earth_ellipsoid):
+    __slots__ = ('cartesian_coordinates', 'geo_coordinates', 'velocity_vector', 'utc_time',
+                 'subsatellite_geo_coordinates', 'subsatellite_cartesian_coordinates')
+
+    def __init__(self, cartesian_coordinates, velocity_vector, utc_time, earth_ellipsoid, geo_coordinates=None,
+                 subsatellite_cartesian_coordinates=None):
         self.cartesian_coordinates = cartesian_coordinates
         # Вычисление координат спутника в географической системе координат путем перевода координат
-        #   cartesian_coordinates из прямоугольной экватериальной системы координат в географическую
-        self.geo_coordinates = cartesian_coordinates.to_geo_coordinates(utc_time, earth_ellipsoid)
+        #   cartesian_coordinates из прямоугольной экватериальной системы координат в географическую, если они не
+        #   заданы
+        if geo_coordinates is None:
+            geo_coordinates = cartesian_coordinates.to_geo_coordinates(utc_time, earth_ellipsoid)
+        self.geo_coordinates = geo_coordinates
         self.velocity_vector = velocity_vector
         self.utc_time = utc_time
         # Вычисление координат подспутниковой точки в географической системе координат путем обнуления высоты для поля
@@ -516,8 +1410,10 @@ class SatelliteCoordinateSet:
         # Вычисление координат подспутниковой точки в прямоугольной экватериальной системе координат путем перевода
         #   координат self.subsatellite_geo_coordinates из географической системы координат в прямоугольную
         #   экватериальную
-        self.subsatellite_cartesian_coordinates = self.subsatellite_geo_coordinates. \
-            to_cartesian_coordinates(utc_time, earth_ellipsoid)
+        if subsatellite_cartesian_coordinates is None:
+            subsatellite_cartesian_coordinates = self.subsatellite_geo_coordinates. \
+                to_cartesian_coordinates(utc_time, earth_ellipsoid)
+        self.subsatellite_cartesian_coordinates = subsatellite_cartesian_coordinates
 
     def to_str(self, count_of_numerals_after_point_in_geo_coordinates=3,
                count_of_numerals_after_point_in_altitude=1,
@@ -539,3 +1435,92 @@ class SatelliteCoordinateSet:
                                                     count_of_numerals_after_point_in_altitude), '\t',
                         str(round(abs(self.velocity_vector), count_of_numerals_after_point_in_velocity)), ' м/с\t',
                         str(self.utc_time)])
+
+
+class ConstellationState:
+    """
+    @Описание:
+        Класс содержит состояние всех спутников спутниковой группировки в некоторый момент модельного времени в виде
+            массивов numpy: координаты и векторы скорости в прямоугольной экватериальной системе координат, координаты в
+            географической системе координат и координаты подспутниковых точек в прямоугольной экватериальной системе
+            координат. i-ая строка каждого массива соответствует i-ому спутнику группировки. Массивы создаются один раз
+            и обновляются на месте, поэтому все вычисления с ними проводятся сразу для всех спутников.
+
+    @Аргументы:
+        count_of_satellites - количество спутников в группировке (int).
+
+    @Поля:
+        positions - массив numpy размера (count_of_satellites, 3) - координаты спутников (км).
+        velocities - массив numpy размера (count_of_satellites, 3) - векторы скорости спутников (км/с).
+        geo_coordinates - массив numpy размера (count_of_satellites, 3) - долгота (градусы), широта (градусы) и высота
+            над поверхностью Земли (км) спутников.
+        subsatellite_positions - массив numpy размера (count_of_satellites, 3) - координаты подспутниковых точек (км).
+        utc_time - время в формате UTC, в которое вычислены координаты (datetime). При инициализации - None.
+        version - номер обновления массивов (int). Увеличивается при каждом обновлении, по нему определяется,
+            устарели ли составленные по массивам объекты SatelliteCoordinateSet. При инициализации - 0.
+
+    @Методы:
+        to_update(self, positions, velocities, utc_time, earth_ellipsoid, satellites_indexes) - записывает координаты и
+            векторы скорости спутников и вычисляет по ним остальные массивы.
+        to_make_satellite_coordinate_set(self, index_of_satellite, earth_ellipsoid) - составляет объект
+            SatelliteCoordinateSet для спутника с заданным номером.
+    """
+    def __init__(self, count_of_satellites):
+        self.positions = numpy.zeros((count_of_satellites, 3))
+        self.velocities = numpy.zeros((count_of_satellites, 3))
+        self.geo_coordinates = numpy.zeros((count_of_satellites, 3))
+        self.subsatellite_positions = numpy.zeros((count_of_satellites, 3))
+        self.utc_time = None
+        self.version = 0
+
+    def to_update(self, positions, velocities, utc_time, earth_ellipsoid, satellites_indexes=None):
+        """
+        @Описание:
+            Метод записывает координаты и векторы скорости спутников в массивы состояния и вычисляет по ним
+                географические координаты спутников и координаты подспутниковых точек сразу для всех спутников.
+        :param positions: массив numpy координат спутников (км).
+        :param velocities: массив numpy векторов скорости спутников (км/с).
+        :param utc_time: время в формате UTC, в которое вычислены координаты (datetime).
+        :param earth_ellipsoid: объект EarthEllipsoid, вокруг которого движутся спутники.
+        :param satellites_indexes: список номеров спутников, строки которых обновляются. Если None (по умолчанию), то
+            обновляются все строки.
+        :return: обновляет массивы на месте
+        """
+        if satellites_indexes is None:
+            satellites_indexes = slice(None)
+        self.positions[satellites_indexes] = positions
+        self.velocities[satellites_indexes] = velocities
+        positions = self.positions[satellites_indexes]
+        long, lat, alt = Coordinates.to_geo_coordinates_of_arrays(positions[:, 0], positions[:, 1], positions[:, 2],
+                                                                  utc_time, earth_ellipsoid)
+        self.geo_coordinates[satellites_indexes, 0] = long
+        self.geo_coordinates[satellites_indexes, 1] = lat
+        self.geo_coordinates[satellites_indexes, 2] = alt
+        # Координаты подспутниковых точек - географические координаты спутников с нулевой высотой
+        subsatellite_x, subsatellite_y, subsatellite_z = Coordinates.to_cartesian_coordinates_of_arrays(
+            long, lat, numpy.zeros(len(long)), utc_time, earth_ellipsoid)
+        self.subsatellite_positions[satellites_indexes, 0] = subsatellite_x
+        self.subsatellite_positions[satellites_indexes, 1] = subsatellite_y
+        self.subsatellite_positions[satellites_indexes, 2] = subsatellite_z
+        self.utc_time = utc_time
+        self.version += 1
+
+    def to_make_satellite_coordinate_set(self, index_of_satellite, earth_ellipsoid):
+        """
+        @Описание:
+            Метод составляет объект SatelliteCoordinateSet для спутника с номером index_of_satellite по строкам массивов
+                состояния без повторного перевода координат.
+        :param index_of_satellite: номер спутника в группировке (int).
+        :param earth_ellipsoid: объект EarthEllipsoid, вокруг которого движутся спутники.
+        :return: объект SatelliteCoordinateSet
+        """
+        x, y, z = self.positions[index_of_satellite].tolist()
+        vel_x, vel_y, vel_z = self.velocities[index_of_satellite].tolist()
+        long, lat, alt = self.geo_coordinates[index_of_satellite].tolist()
+        subsatellite_x, subsatellite_y, subsatellite_z = self.subsatellite_positions[index_of_satellite].tolist()
+        return SatelliteCoordinateSet(Coordinates.CartesianCoordinates(x, y, z),
+                                      AnalyticGeometry.Vector(vel_x, vel_y, vel_z),
+                                      self.utc_time,
+                                      earth_ellipsoid,
+                                      Coordinates.GeoCoordinates(long, lat, alt),
+                                      Coordinates.CartesianCoordinates(subsatellite_x, subsatellite_y, subsatellite_z))
@@ -1,6 +1,7 @@
 import math
 import statistics
 import os
+import numpy
 import OutputDataMaker
 from datetime import timedelta, datetime
 from calendar import isleap
@@ -13,6 +14,7 @@ DEFAULT_MAX_CLOUD_SCORE = math.inf
 DEFAULT_INITIAL_ANNUAL_OBSERVATION_PERIOD = 1
 DEFAULT_FINAL_ANNUAL_OBSERVATION_PERIOD = 365
 DEFAULT_MIN_PERCENT_FOR_SOLVE = 100
+DEFAULT_RANDOM_SEED = None
 DAYS_IN_NOT_LEAP_YEAR = 365
 DAYS_IN_LEAP_YEAR = 366
 
@@ -43,6 +45,12 @@ class Task:
         to_consider_partial_cloudiness - вычислять статистически частичную облачность, если значение True и не
             вычислять, если False (boolean). Определяется с помощью метода
             self.to_set_considering_considering_partial_cloudiness. По умолчанию False.
+        random_seed - начальное значение генератора случайных чисел self.random_generator (int). Если None, то генератор
+            инициализируется случайно и моделирование не воспроизводится. Задается методом to_set_random_seed. По
+            умолчанию DEFAULT_RANDOM_SEED.
+        random_generator - генератор случайных чисел numpy.random.Generator, по которому разыгрываются балл облачности
+            и частичная облачность над сегментами полигонов. Создается по self.random_seed методом to_set_random_seed,
+            состояние может быть задано методом to_set_random_state.
         initial_annual_observation_period - номер первого дня в невисокосном году годового периода наблюдений (времени в
             году, когда допустима съемка) (int). Задается методом to_set_annual_observations_period. По умолчанию
             DEFAULT_INITIAL_ANNUAL_OBSERVATION_PERIOD.
@@ -64,6 +72,17 @@ class Task:
             методом to_set_border_of_simulation_time. По умолчанию None.
         step - шаг изменения модельного времени в секундах (int, double). Задается методом
             to_set_step_of_simulation_time. По умолчанию None.
+        adaptive_step - если True, то модельное время, в течение которого ни один спутник не может оказаться вблизи
+            полигонов, пропускается большими шагами (кратными self.step), а вблизи полигонов моделирование ведется с
+            шагом self.step. Результаты не отличаются от моделирования с постоянным шагом (boolean). Задается методом
+            to_set_adaptive_step. По умолчанию False.
+        access_windows_are_used - если True, то перед моделированием для каждого спутника и каждого полигона
+            вычисляются окна доступа, и моделирование с шагом self.step ведется только внутри них, а время между ними
+            пропускается (boolean). Результаты не отличаются от моделирования с постоянным шагом. Задается методом
+            to_set_access_windows. По умолчанию False.
+        pass_level_scanning - если True, то съемка моделируется сразу целыми пролетами спутников над полигонами
+            (сегменты проверяются один раз за пролет, облачность задается в начале пролета), а не на каждом шаге
+            модельного времени (boolean). Задается методом to_set_pass_level_scanning. По умолчанию False.
         growth_of_information - список. В каждую ячейку записывается площадь, просканированной территории полигонов
             self.PolygonsGroup в кв. метрах (double) за шаг изменения модельного времени self.step. Каждой заполненной
             ячейке сответствует время из списка self.time_of_growth_of_information. При этом в список не записываются
@@ -90,6 +109,18 @@ class Task:
         to_set_border_of_simulation_time - задаёт период модельного времени в течении которого будет проводиться
             моделирование
         to_set_step_of_simulation_time - задаёт шаг изменения модельного времени в секундах.
+        to_set_adaptive_step - задаёт, пропускать ли большими шагами время, когда спутники далеко от полигонов.
+        to_set_access_windows - задаёт, вычислять ли окна доступа спутников к полигонам и моделировать ли только внутри
+            них.
+        to_calculate_count_of_skipped_steps - вычисляет, сколько шагов модельного времени можно пропустить, не меняя
+            результатов моделирования.
+        to_set_pass_level_scanning - задаёт, моделировать ли съемку сразу целыми пролетами.
+        to_calculate_count_of_steps_in_passes_block - вычисляет, сколько шагов модельного времени моделируется одним
+            блоком при моделировании съемки целыми пролетами.
+        to_scan_passes - моделирует съемку целыми пролетами на блоке шагов модельного времени.
+        to_record_scanned_area - записывает просканированную площадь и проверяет, выполнена ли задача.
+        to_set_random_seed - задаёт начальное значение генератора случайных чисел и заново создает генератор.
+        to_set_random_state - задаёт состояние генератора случайных чисел.
         to_set_max_zenith_angle - задаёт максимальный зенитный угол при котором ведётся наблюдение в градусах.
         to_set_max_cloud_score - задаёт максимальный балл облачности при котором ведётся наблюдение.
         to_set_annual_observations_period - задаёт годовой период наблюдения.
@@ -116,6 +147,8 @@ class Task:
         self.max_zenith_angle = DEFAULT_MAX_ZENITH_ANGLE
         self.max_cloud_score = DEFAULT_MAX_CLOUD_SCORE
         self.to_consider_partial_cloudiness = False
+        self.random_seed = DEFAULT_RANDOM_SEED
+        self.random_generator = numpy.random.default_rng(self.random_seed)
         self.initial_annual_observation_period = DEFAULT_INITIAL_ANNUAL_OBSERVATION_PERIOD
         self.final_annual_observation_period = DEFAULT_FINAL_ANNUAL_OBSERVATION_PERIOD
         self.observation_period_inside_one_year = True
@@ -123,6 +156,9 @@ class Task:
         self.initial_simulation_time = None
         self.final_simulation_time = None
         self.step = None
+        self.adaptive_step = False
+        self.access_windows_are_used = False
+        self.pass_level_scanning = False
         self.growth_of_information = []
         self.time_of_growth_of_information = []
         self.time_of_solutions = []
@@ -262,6 +298,10 @@ class Task:
         else:
             # Если время между отчетами не задано, то оно приравнивается к бесконечносте
             report_time_sec = math.inf
+        # Вычисление окон доступа спутников к полигонам, если моделирование ведется только внутри них
+        if self.access_windows_are_used:
+            self.satellites_group.to_calculate_access_windows(self.satellites_group.simulation_time,
+                                                              self.final_simulation_time, self.step)
         # Время от последнего отчета в секундах
         time_from_report_last = 0
         # В цикле проверяется, не вышло ли модельное время спутниковой группировки self.SatelliteGroup за пределы
@@ -276,28 +316,37 @@ class Task:
                     (days_number_in_year == self.initial_annual_observation_period) or \
                     (days_number_in_year == self.final_annual_observation_period):
                 # Если входит, то
-                #   Определяется следущее модельное время для спутников self.SatelliteGroup через шаг времени self.step
-                next_simulation_time = self.satellites_group.simulation_time + timedelta(seconds=self.step)
-                #   Моделирование работы спутников из self.SatelliteGroup на следующие self.step секунд. Возвращается
-                #       площадь (кв. м) просканированной площади self.PolygonsGroup, меняется текущее модельное время на
-                #       next_simulation_time
-                scanned_area = self.satellites_group.to_act(next_simulation_time)
-                #   Изменение времени от последнего отчета
-                time_from_report_last += self.step
-                #   Если просканированная площадь не нулевая...
-                if scanned_area > 0:
-                    # То записываются в спискок площадей просконированной территории и список времени сканирования
-                    #   просканированная площадь scanned_area площадь и текущее модельное время, соответственно
-                    self.growth_of_information.append(scanned_area)
-                    self.time_of_growth_of_information.append(self.satellites_group.simulation_time)
-                    percentages_of_grabbed_areas_list = self.polygons_group.to_calc_percentages_of_grabbed_areas()
-                    #  Проверка, выполнена ли задача
-                    if len(self.time_of_solutions) < len(percentages_of_grabbed_areas_list) and \
-                            percentages_of_grabbed_areas_list[len(self.time_of_solutions)] >= \
-                            self.min_percent_for_solve:
-                        # Если выполнена, то текущее модельное время - время выполнения записывается в список времени
-                        #   решений self.time_of_solutions
-                        self.time_of_solutions.append(self.satellites_group.simulation_time)
+                #   При адаптивном шаге или окнах доступа определяется, сколько шагов можно пропустить, так как ни один
+                #       спутник за это время не окажется вблизи полигонов
+                if self.adaptive_step or self.access_windows_are_used:
+                    count_of_skipped_steps = self.to_calculate_count_of_skipped_steps(report_time_sec -
+                                                                                      time_from_report_last)
+                else:
+                    count_of_skipped_steps = 0
+                if count_of_skipped_steps > 0:
+                    #   Спутники переносятся через count_of_skipped_steps шагов без моделирования съемки
+                    self.satellites_group.to_skip_to_time(self.satellites_group.simulation_time +
+                                                          timedelta(seconds=count_of_skipped_steps * self.step))
+                    #   Изменение времени от последнего отчета
+                    time_from_report_last += count_of_skipped_steps * self.step
+                elif self.pass_level_scanning:
+                    #   Моделирование съемки сразу целыми пролетами на блоке шагов модельного времени, спутники
+                    #       переносятся в конец блока
+                    count_of_steps = self.to_scan_passes(report_time_sec - time_from_report_last)
+                    #   Изменение времени от последнего отчета
+                    time_from_report_last += count_of_steps * self.step
+                else:
+                    #   Определяется следущее модельное время для спутников self.SatelliteGroup через шаг времени
+                    #       self.step
+                    next_simulation_time = self.satellites_group.simulation_time + timedelta(seconds=self.step)
+                    #   Моделирование работы спутников из self.SatelliteGroup на следующие self.step секунд.
+                    #       Возвращается площадь (кв. м) просканированной площади self.PolygonsGroup, меняется текущее
+                    #       модельное время на next_simulation_time
+                    scanned_area = self.satellites_group.to_act(next_simulation_time)
+                    #   Изменение времени от последнего отчета
+                    time_from_report_last += self.step
+                    #   Запись просканированной площади и проверка, выполнена ли задача
+                    self.to_record_scanned_area(scanned_area, self.satellites_group.simulation_time)
                 # Определение, настало ли время для нового отчета
                 if time_from_report_last >= report_time_sec:
                     # Если да, то подается новый отчет
@@ -484,6 +533,30 @@ class Task:
         """
         self.to_consider_partial_cloudiness = to_consider_partial_cloudiness
 
+    def to_set_random_seed(self, random_seed):
+        """
+        @Описание:
+            Задаёт начальное значение генератора случайных чисел, по которому разыгрываются балл облачности и
+                частичная облачность, и заново создает генератор. При одинаковом начальном значении моделирование
+                воспроизводится.
+        :param random_seed: начальное значение генератора случайных чисел (int). Допустимо None.
+        :return: в поле self.random_seed записывается random_seed, в поле self.random_generator - новый генератор
+                 numpy.random.Generator
+        """
+        self.random_seed = random_seed
+        self.random_generator = numpy.random.default_rng(random_seed)
+
+    def to_set_random_state(self, random_state):
+        """
+        @Описание:
+            Задаёт состояние генератора случайных чисел self.random_generator, например, сохраненное ранее из
+                self.random_generator.bit_generator.state, чтобы продолжить моделирование с того же места потока
+                случайных чисел.
+        :param random_state: состояние генератора (dict) в виде self.random_generator.bit_generator.state.
+        :return: состояние генератора self.random_generator заменяется на random_state
+        """
+        self.random_generator.bit_generator.state = random_state
+
     def to_set_border_of_simulation_time(self, initial_simulation_time, final_simulation_time):
         """
         @Описание:
@@ -505,6 +578,148 @@ class Task:
         """
         self.step = step
 
+    def to_set_adaptive_step(self, adaptive_step=True):
+        """
+        @Описание:
+            Задаёт, пропускать ли большими шагами модельное время, в течение которого ни один спутник не может
+                оказаться вблизи полигонов. Большие шаги кратны self.step, поэтому результаты моделирования не
+                отличаются от моделирования с постоянным шагом, а время вычислений определяется временем пролетов над
+                полигонами, а не всем модельным временем.
+        :param adaptive_step: логическое значение, которое устанавливается (boolean). По умолчанию True.
+        :return: в поле self.adaptive_step записывается adaptive_step
+        """
+        self.adaptive_step = adaptive_step
+
+    def to_set_access_windows(self, access_windows_are_used=True):
+        """
+        @Описание:
+            Задаёт, вычислять ли перед моделированием окна доступа каждого спутника к каждому полигону, то есть
+                интервалы модельного времени, вне которых полигон не может оказаться достаточно близко к спутнику, и
+                пропускать ли время между окнами доступа. Пропуски кратны self.step, поэтому результаты моделирования не
+                отличаются от моделирования с постоянным шагом.
+        :param access_windows_are_used: логическое значение, которое устанавливается (boolean). По умолчанию True.
+        :return: в поле self.access_windows_are_used записывается access_windows_are_used
+        """
+        self.access_windows_are_used = access_windows_are_used
+
+    def to_calculate_count_of_skipped_steps(self, time_to_report):
+        """
+        @Описание:
+            Метод вычисляет, сколько шагов модельного времени self.step, начиная с текущего модельного времени
+                спутниковой группировки, можно пропустить, не меняя результатов моделирования. Пропускаются шаги, в
+                конце которых ни один спутник не может оказаться вблизи полигонов. Кроме того, пропуск не выходит за
+                шаг, на котором закончится моделирование, на котором должен быть подан отчет, и за шаг, на котором
+                начнется следующий день (так как на каждом шаге проверяется, входит ли день в годовой период
+                наблюдения).
+        :param time_to_report: время до следующего отчета (секунды). Допустимо math.inf.
+        :return: количество шагов, которые можно пропустить (int)
+        """
+        # Если на последнем шаге велось сканирование, то какой-либо полигон уже близок к спутнику
+        if self.satellites_group.time_of_scanning > 0:
+            return 0
+        time_without_close_polygons = self.satellites_group.to_calculate_time_without_close_polygons()
+        if time_without_close_polygons <= self.step:
+            return 0
+        current_time = self.satellites_group.simulation_time
+        # Шаги, в конце которых модельное время меньше time_without_close_polygons
+        count_of_skipped_steps = math.ceil(time_without_close_polygons / self.step) - 1
+        # Шаг, на котором заканчивается моделирование
+        time_to_final = (self.final_simulation_time - current_time).total_seconds()
+        count_of_skipped_steps = min(count_of_skipped_steps, math.ceil(time_to_final / self.step))
+        # Шаг, на котором подается отчет
+        if time_to_report < math.inf:
+            count_of_skipped_steps = min(count_of_skipped_steps, math.ceil(time_to_report / self.step))
+        # Шаг, на котором начинается следующий день
+        time_to_next_day = (datetime(current_time.year, current_time.month, current_time.day) + timedelta(days=1) -
+                            current_time).total_seconds()
+        count_of_skipped_steps = min(count_of_skipped_steps, math.ceil(time_to_next_day / self.step))
+        return max(count_of_skipped_steps, 0)
+
+    def to_set_pass_level_scanning(self, pass_level_scanning=True):
+        """
+        @Описание:
+            Задаёт, моделировать ли съемку сразу целыми пролетами спутников над полигонами (см.
+                SatellitesGroup.to_scan_pass) вместо моделирования на каждом шаге модельного времени. Сегмент, попавший
+                в полосу захвата, считается просканированным один раз за пролет, а не на каждом шаге, поэтому
+                количество захватов сегментов меньше, чем при моделировании по шагам. Пролет, продолжающийся за
+                границей блока шагов (self.to_calculate_count_of_steps_in_passes_block), моделируется как два пролета.
+        :param pass_level_scanning: логическое значение, которое устанавливается (boolean). По умолчанию True.
+        :return: в поле self.pass_level_scanning записывается pass_level_scanning
+        """
+        self.pass_level_scanning = pass_level_scanning
+
+    def to_calculate_count_of_steps_in_passes_block(self, time_to_report):
+        """
+        @Описание:
+            Метод вычисляет, сколько шагов модельного времени self.step, начиная с текущего модельного времени
+                спутниковой группировки, моделируется одним блоком при моделировании съемки целыми пролетами. Блок не
+                длиннее блока эфемерид группировки (SatellitesGroup.EPHEMERIS_BLOCK_SIZE шагов) и, как и пропуск шагов
+                в методе self.to_calculate_count_of_skipped_steps, не выходит за шаг, на котором закончится
+                моделирование, на котором должен быть подан отчет, и за шаг, на котором начнется следующий день.
+        :param time_to_report: время до следующего отчета (секунды). Допустимо math.inf.
+        :return: количество шагов в блоке (int), не меньше 1
+        """
+        current_time = self.satellites_group.simulation_time
+        count_of_steps = self.satellites_group.EPHEMERIS_BLOCK_SIZE
+        # Шаг, на котором заканчивается моделирование
+        time_to_final = (self.final_simulation_time - current_time).total_seconds()
+        count_of_steps = min(count_of_steps, math.ceil(time_to_final / self.step))
+        # Шаг, на котором подается отчет
+        if time_to_report < math.inf:
+            count_of_steps = min(count_of_steps, math.ceil(time_to_report / self.step))
+        # Шаг, на котором начинается следующий день
+        time_to_next_day = (datetime(current_time.year, current_time.month, current_time.day) + timedelta(days=1) -
+                            current_time).total_seconds()
+        count_of_steps = min(count_of_steps, math.ceil(time_to_next_day / self.step))
+        return max(count_of_steps, 1)
+
+    def to_scan_passes(self, time_to_report):
+        """
+        @Описание:
+            Метод моделирует съемку сразу целыми пролетами на блоке шагов модельного времени, начиная с текущего
+                модельного времени спутниковой группировки (размер блока определяется методом
+                self.to_calculate_count_of_steps_in_passes_block). Пролеты всех спутников моделируются в порядке их
+                начала, после каждого записывается просканированная площадь (временем съемки считается конец последнего
+                шага пролета, на котором были просканированы сегменты) и проверяется, выполнена ли задача. Затем
+                спутники переносятся в конец блока.
+        :param time_to_report: время до следующего отчета (секунды). Допустимо math.inf.
+        :return: количество смоделированных шагов модельного времени (int)
+        """
+        initial_time = self.satellites_group.simulation_time
+        count_of_steps = self.to_calculate_count_of_steps_in_passes_block(time_to_report)
+        for satellite_pass in self.satellites_group.to_determine_passes(initial_time, self.step, count_of_steps):
+            scanned_area, index_of_scanning = self.satellites_group.to_scan_pass(satellite_pass)
+            if index_of_scanning is not None:
+                self.to_record_scanned_area(scanned_area,
+                                            initial_time + timedelta(seconds=index_of_scanning * self.step))
+        self.satellites_group.to_skip_to_time(initial_time + timedelta(seconds=count_of_steps * self.step))
+        return count_of_steps
+
+    def to_record_scanned_area(self, scanned_area, time_of_scanning):
+        """
+        @Описание:
+            Метод записывает ненулевую просканированную площадь и время съемки в списки self.growth_of_information и
+                self.time_of_growth_of_information и проверяет, выполнена ли задача. Если выполнена, то время съемки
+                записывается в список времени решений self.time_of_solutions.
+        :param scanned_area: просканированная площадь (кв. м).
+        :param time_of_scanning: модельное время съемки (datetime).
+        :return: дополняет списки self.growth_of_information, self.time_of_growth_of_information и
+            self.time_of_solutions
+        """
+        # Если просканированная площадь не нулевая, то
+        if scanned_area > 0:
+            #   записываются в спискок площадей просконированной территории и список времени сканирования
+            #   просканированная площадь scanned_area площадь и время съемки, соответственно
+            self.growth_of_information.append(scanned_area)
+            self.time_of_growth_of_information.append(time_of_scanning)
+            percentages_of_grabbed_areas_list = self.polygons_group.to_calc_percentages_of_grabbed_areas()
+            #  Проверка, выполнена ли задача
+            if len(self.time_of_solutions) < len(percentages_of_grabbed_areas_list) and \
+                    percentages_of_grabbed_areas_list[len(self.time_of_solutions)] >= self.min_percent_for_solve:
+                # Если выполнена, то время съемки - время выполнения записывается в список времени решений
+                #   self.time_of_solutions
+                self.time_of_solutions.append(time_of_scanning)
+
     def to_set_max_zenith_angle(self, max_zenith_angle):
         """
         @Описание:
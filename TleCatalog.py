@@ -0,0 +1,107 @@
+from pyorbital import tlefile
+
+
+class TleCatalog:
+    """
+    @Описание:
+        Класс моделирует каталог данных TLE - файл с данными TLE многих спутников, который читается один раз и
+            индексируется по названиям спутников и их номерам в каталоге NORAD. Используется для добавления в
+            спутниковую группировку сразу многих спутников без повторного чтения файла для каждого спутника.
+
+    @Аргументы:
+        tle_address - адрес файла с данными TLE (String). Допускаются записи из трех строк (название спутника и две
+            строки TLE) и из двух строк TLE без названия.
+
+    @Поля:
+        tle_address - адрес файла с данными TLE. Задается аргументом tle_address при инициализации.
+        tle_lines_by_name - словарь, ключи которого - названия спутников в верхнем регистре (String), значения - пары
+            строк TLE (String). Заполняется при инициализации.
+        tle_lines_by_number - словарь, ключи которого - номера спутников в каталоге NORAD (String, без ведущих нулей для
+            числовых номеров и как есть для номеров в формате Alpha-5, например, "A0001"), значения - тройки из
+            названия спутника и пары строк TLE (String). Заполняется при инициализации.
+
+    @Методы:
+        to_read_file(self) - читает файл self.tle_address и заполняет словари записей TLE.
+        to_get_tle(self, sat_name_or_number) - возвращает объект Tle из pyorbital для спутника с заданным названием или
+            номером NORAD.
+        to_make_number_key(number) - приводит номер спутника в каталоге NORAD к виду ключа словаря
+            self.tle_lines_by_number.
+    """
+    def __init__(self, tle_address):
+        self.tle_address = tle_address
+        self.tle_lines_by_name = {}
+        self.tle_lines_by_number = {}
+        self.to_read_file()
+
+    def to_read_file(self):
+        """
+        @Описание:
+            Метод читает файл self.tle_address один раз и заполняет словари self.tle_lines_by_name и
+                self.tle_lines_by_number. Если в файле несколько записей для одного спутника, то, как и в pyorbital,
+                используется первая.
+        :return: заполняет словари self.tle_lines_by_name и self.tle_lines_by_number
+        """
+        with open(self.tle_address) as tle_file:
+            lines = [line.strip() for line in tle_file]
+        lines = [line for line in lines if line != '']
+        i = 0
+        while i < len(lines) - 1:
+            # Запись TLE - две строки, начинающиеся с "1 " и "2 ", возможно, после строки с названием спутника
+            if lines[i].startswith('1 ') and lines[i + 1].startswith('2 '):
+                name = None
+                line1, line2 = lines[i], lines[i + 1]
+                i += 2
+            elif (i < len(lines) - 2) and lines[i + 1].startswith('1 ') and lines[i + 2].startswith('2 '):
+                name = lines[i].upper()
+                line1, line2 = lines[i + 1], lines[i + 2]
+                i += 3
+            else:
+                i += 1
+                continue
+            number = self.to_make_number_key(line1[2:7])
+            if name is None:
+                name = number
+            if name not in self.tle_lines_by_name:
+                self.tle_lines_by_name[name] = (line1, line2)
+            if number not in self.tle_lines_by_number:
+                self.tle_lines_by_number[number] = (name, line1, line2)
+
+    def to_get_tle(self, sat_name_or_number):
+        """
+        @Описание:
+            Метод возвращает данные TLE спутника с заданным названием или номером в каталоге NORAD из прочитанного
+                файла без повторного чтения.
+        :param sat_name_or_number: название спутника (String) или его номер в каталоге NORAD (int или String, в том
+            числе в формате Alpha-5).
+        :return: объект Tle из pyorbital. Если спутника нет в каталоге, вызывается исключение KeyError
+        """
+        if isinstance(sat_name_or_number, int):
+            number = self.to_make_number_key(str(sat_name_or_number))
+            if number not in self.tle_lines_by_number:
+                raise KeyError("".join(["В каталоге ", self.tle_address, " нет спутника с номером ", number]))
+            name, line1, line2 = self.tle_lines_by_number[number]
+        elif (sat_name_or_number.strip().upper() not in self.tle_lines_by_name) and \
+                (self.to_make_number_key(sat_name_or_number) in self.tle_lines_by_number):
+            # Строка, не совпадающая ни с одним названием, ищется среди номеров NORAD
+            name, line1, line2 = self.tle_lines_by_number[self.to_make_number_key(sat_name_or_number)]
+        else:
+            name = sat_name_or_number.strip().upper()
+            if name not in self.tle_lines_by_name:
+                raise KeyError("".join(["В каталоге ", self.tle_address, " нет спутника ", name]))
+            line1, line2 = self.tle_lines_by_name[name]
+        return tlefile.read(name, line1=line1, line2=line2)
+
+    @staticmethod
+    def to_make_number_key(number):
+        """
+        @Описание:
+            Метод приводит номер спутника в каталоге NORAD к виду ключа словаря self.tle_lines_by_number: пробелы по
+                краям отбрасываются, у числовых номеров отбрасываются ведущие нули, номера в формате Alpha-5 (первый
+                символ - буква, например, "A0001") сохраняются как есть в верхнем регистре.
+        :param number: номер спутника в каталоге NORAD (String).
+        :return: ключ словаря self.tle_lines_by_number (String)
+        """
+        number = number.strip().upper()
+        if number.isdigit():
+            number = str(int(number))
+        return number